@@ -0,0 +1,139 @@
+"""End-to-end latency and throughput benchmark.
+
+Starts :mod:`benchmarks.server` in a child process, drives it with
+``--sessions`` concurrent clients and writes one JSON document combining the
+client and server measurements, tagged with the git commit so runs can be
+compared::
+
+    python -m benchmarks.e2e --sessions 20 --turns 3 --output results/e2e.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .fakes import load_wav_fixture, speech_fixture
+from .loadgen import run_load
+from .server import add_backend_arguments
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        )
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, proc: subprocess.Popen, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("benchmark server exited during start-up")
+        try:
+            with socket.create_connection(("localhost", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("benchmark server did not start listening")
+
+
+def server_argv(args: argparse.Namespace, port: int, stats: str) -> List[str]:
+    return [
+        sys.executable, "-m", "benchmarks.server",
+        "--port", str(port),
+        "--stats", stats,
+        "--stt-cost", str(args.stt_cost),
+        "--decode-workers", str(args.decode_workers),
+        "--agent-first-token", str(args.agent_first_token),
+        "--agent-token", str(args.agent_token),
+        "--reply-sentences", str(args.reply_sentences),
+        "--tts-speed", str(args.tts_speed),
+        "--tts-chunk-ms", str(args.tts_chunk_ms),
+        "--tts-max-concurrent", str(args.tts_max_concurrent),
+    ]
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    speech = load_wav_fixture(args.wav) if args.wav else speech_fixture(args.speech_ms)
+    config = {k: v for k, v in vars(args).items() if k != "output"}
+    results: Dict[str, Any] = {
+        "benchmark": "e2e",
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": config,
+    }
+
+    if args.url:
+        results["client"] = asyncio.run(
+            run_load(args.url, speech, args.sessions, args.turns, args.frame_ms, args.speed)
+        )
+        return results
+
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        stats_path = os.path.join(tmp, "server.json")
+        proc = subprocess.Popen(server_argv(args, port, stats_path), cwd=ROOT)
+        try:
+            wait_for_port(port, proc)
+            url = f"ws://localhost:{port}"
+            results["client"] = asyncio.run(
+                run_load(url, speech, args.sessions, args.turns, args.frame_ms, args.speed)
+            )
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=30)
+        if os.path.exists(stats_path):
+            with open(stats_path, encoding="utf-8") as fh:
+                results["server"] = json.load(fh)
+    return results
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="End-to-end voice pipeline benchmark")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=3, help="Utterances per session")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Audio pace as a multiple of real time (0: unpaced)")
+    parser.add_argument("--frame-ms", type=int, default=20)
+    parser.add_argument("--speech-ms", type=int, default=1500,
+                        help="Length of the synthetic utterance")
+    parser.add_argument("--wav", help="16 kHz mono WAV file to speak instead")
+    parser.add_argument("--url", help="Benchmark a running server instead")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    add_backend_arguments(parser)
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    text = json.dumps(run(args), indent=2)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":  # pragma: no cover - entry point
+    main()
@@ -0,0 +1,164 @@
+"""Model-free STT, agent and TTS stand-ins with configurable costs."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import AsyncIterator, List
+
+from src.backend.agent.base import Agent
+from src.backend.audio import wav_to_pcm
+from src.backend.stt.vad import frame_stats
+from src.backend.tts.simple import ConsoleTTS, tone
+from src.backend.tts.text import split_sentences
+
+SAMPLE_RATE = 16000
+
+
+class FakeRecognizer:
+    """Scripted recognizer with the ``vosk.KaldiRecognizer`` interface.
+
+    Every ``word_ms`` of loud audio adds a word to the utterance; once
+    ``endpoint_ms`` of quiet follows, :meth:`AcceptWaveform` reports the
+    utterance as final. Each call sleeps ``cost`` seconds per second of
+    audio to stand in for decoding, which (like Vosk) releases the GIL.
+    """
+
+    def __init__(
+        self,
+        samplerate: int = SAMPLE_RATE,
+        cost: float = 0.05,
+        word_ms: int = 300,
+        endpoint_ms: int = 500,
+        threshold: float = 250.0,
+    ) -> None:
+        self.samplerate = samplerate
+        self.cost = cost
+        self.word_bytes = samplerate * word_ms // 1000 * 2
+        self.endpoint_bytes = samplerate * endpoint_ms // 1000 * 2
+        self.threshold = threshold
+        self.calls = 0
+        self._voiced = 0
+        self._quiet = 0
+        self._words: List[str] = []
+        self._final = ""
+
+    def _loud(self, data: bytes) -> bool:
+        usable = len(data) - len(data) % 2
+        if usable < 4:
+            return False
+        levels, _ = frame_stats(data[:usable], usable)
+        return levels[0] >= self.threshold
+
+    def _take_text(self) -> str:
+        text = " ".join(self._words)
+        self._words = []
+        self._voiced = self._quiet = 0
+        return text
+
+    def AcceptWaveform(self, data: bytes) -> bool:
+        self.calls += 1
+        if self.cost:
+            time.sleep(self.cost * len(data) / (2 * self.samplerate))
+        if self._loud(data):
+            self._voiced += len(data)
+            self._quiet = 0
+            while len(self._words) < self._voiced // self.word_bytes:
+                self._words.append(f"word{len(self._words) + 1}")
+            return False
+        self._quiet += len(data)
+        if self._voiced and self._quiet >= self.endpoint_bytes:
+            self._final = self._take_text()
+            return True
+        return False
+
+    def Result(self) -> str:
+        text, self._final = self._final, ""
+        return json.dumps({"text": text})
+
+    def PartialResult(self) -> str:
+        return json.dumps({"partial": " ".join(self._words)})
+
+    def FinalResult(self) -> str:
+        return json.dumps({"text": self._take_text()})
+
+
+class FakeAgent(Agent):
+    """Agent that echoes the prompt in a canned multi-sentence reply.
+
+    ``first_token_delay`` seconds pass before the first word and
+    ``token_delay`` between the following ones.
+    """
+
+    def __init__(
+        self, sentences: int = 2, first_token_delay: float = 0.2, token_delay: float = 0.02
+    ) -> None:
+        self.sentences = sentences
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+
+    def reply(self, text: str) -> str:
+        filler = " ".join("That is a fine thing to say." for _ in range(self.sentences - 1))
+        return f"You said {text}. {filler}".strip()
+
+    async def process(self, text: str) -> str:
+        return "".join([delta async for delta in self.stream(text)])
+
+    async def stream(self, text: str) -> AsyncIterator[str]:
+        await asyncio.sleep(self.first_token_delay)
+        for index, word in enumerate(self.reply(text).split(" ")):
+            if index:
+                await asyncio.sleep(self.token_delay)
+            yield word if index == 0 else " " + word
+
+
+def burn_cpu(seconds: float) -> None:
+    """Spin for ``seconds`` of this thread's CPU time, holding the GIL."""
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+
+class CpuTTS(ConsoleTTS):
+    """Tone TTS that spends ``cost`` CPU seconds per second of audio.
+
+    The work is pure Python, so concurrent syntheses in one process contend
+    for the GIL like a Python-driven neural engine. As with a batched model,
+    :meth:`synthesize_batch` costs as much as its longest text.
+    :meth:`stream` runs each sentence on a thread, like ``OrpheusStyleTTS``.
+    """
+
+    def __init__(self, cost: float = 0.1, sample_rate: int = SAMPLE_RATE) -> None:
+        super().__init__(sample_rate)
+        self.cost = cost
+
+    def synthesize_batch(self, texts: List[str]) -> List[bytes]:
+        pcms = [self._render(text) for text in texts]
+        if pcms:
+            burn_cpu(self.cost * max(map(len, pcms)) / (2 * self.sample_rate))
+        return pcms
+
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        for sentence in split_sentences(text):
+            (pcm,) = await asyncio.to_thread(self.synthesize_batch, [sentence])
+            yield pcm
+
+
+def make_tts(speed: float = 10.0, chunk_ms: int = 200) -> ConsoleTTS:
+    """Return a tone TTS producing ``speed`` seconds of audio per second."""
+    return ConsoleTTS(SAMPLE_RATE, chunk_ms=chunk_ms, speed=speed)
+
+
+def speech_fixture(speech_ms: int = 1500) -> bytes:
+    """Return ``speech_ms`` of loud tone standing in for an utterance."""
+    return tone(SAMPLE_RATE, 220, SAMPLE_RATE * speech_ms // 1000)
+
+
+def load_wav_fixture(path: str) -> bytes:
+    """Return the PCM of a 16 kHz mono 16-bit WAV file."""
+    with open(path, "rb") as fh:
+        pcm, samplerate = wav_to_pcm(fh.read())
+    if samplerate != SAMPLE_RATE:
+        raise ValueError(f"{path}: expected {SAMPLE_RATE} Hz audio, got {samplerate}")
+    return pcm
@@ -0,0 +1,224 @@
+"""WebSocket load generator and measurement helpers."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+from src.backend.core.latency import percentile
+
+
+def summarize(values: Sequence[float]) -> Dict[str, float]:
+    """Return count, mean and p50/p95/p99/max of ``values``."""
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "p50": round(percentile(ordered, 50), 3),
+        "p95": round(percentile(ordered, 95), 3),
+        "p99": round(percentile(ordered, 99), 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def max_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process in MiB, if known."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(rss / 1024 / (1024 if rss > 1 << 32 else 1), 1)
+
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes up a sleeping task."""
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.lags: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append((time.perf_counter() - start - self.interval) * 1000)
+
+    def summary(self) -> Dict[str, float]:
+        return summarize(self.lags)
+
+
+@dataclass
+class TurnResult:
+    """Client-side timestamps of one turn, in seconds since the session began."""
+
+    speech_end: float
+    final: Optional[float] = None
+    first_audio: Optional[float] = None
+    done: Optional[float] = None
+    audio_bytes: int = 0
+
+
+@dataclass
+class SessionResult:
+    turns: List[TurnResult] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    audio_sent_seconds: float = 0.0
+
+
+async def run_session(
+    url: str,
+    speech: bytes,
+    turns: int,
+    frame_ms: int = 20,
+    speed: float = 1.0,
+    reply_timeout: float = 30.0,
+    samplerate: int = 16000,
+) -> SessionResult:
+    """Speak ``turns`` utterances to the server at ``url`` and time the replies.
+
+    Audio is sent in ``frame_ms`` frames paced at ``speed`` times real time
+    (0 sends as fast as possible). After each utterance silence is streamed
+    until the agent's reply has been received, like a user waiting for an
+    answer.
+    """
+    import websockets  # type: ignore
+
+    result = SessionResult()
+    frame = samplerate * frame_ms // 1000 * 2
+    silence = bytes(frame)
+    delay = frame_ms / 1000 / speed if speed > 0 else 0.0
+    start = time.monotonic()
+    reply_done = asyncio.Event()
+    current: Optional[TurnResult] = None
+
+    def now() -> float:
+        return time.monotonic() - start
+
+    async def send(ws: Any, data: bytes) -> None:
+        await ws.send(data)
+        result.audio_sent_seconds += len(data) / (2 * samplerate)
+        await asyncio.sleep(delay)
+
+    async def receive(ws: Any) -> None:
+        async for message in ws:
+            turn = current
+            if turn is None:
+                continue
+            if isinstance(message, bytes):
+                if turn.first_audio is None:
+                    turn.first_audio = now()
+                turn.audio_bytes += len(message)
+                continue
+            payload = json.loads(message)
+            if payload.get("agent"):
+                turn.done = now()
+                reply_done.set()
+            elif payload.get("final") and payload.get("text") and turn.final is None:
+                turn.final = now()
+
+    async with websockets.connect(url, max_size=None) as ws:
+        receiver = asyncio.create_task(receive(ws))
+        try:
+            for _ in range(turns):
+                reply_done.clear()
+                for offset in range(0, len(speech), frame):
+                    await send(ws, speech[offset : offset + frame])
+                current = TurnResult(speech_end=now())
+                result.turns.append(current)
+                deadline = time.monotonic() + reply_timeout
+                while not reply_done.is_set():
+                    if time.monotonic() > deadline:
+                        result.errors.append("reply timeout")
+                        break
+                    await send(ws, silence)
+                    if delay == 0:
+                        # Do not flood the server while waiting
+                        await asyncio.sleep(frame_ms / 1000)
+        finally:
+            receiver.cancel()
+            try:
+                await receiver
+            except (asyncio.CancelledError, Exception):
+                pass
+    return result
+
+
+async def run_load(
+    url: str,
+    speech: bytes,
+    sessions: int,
+    turns: int,
+    frame_ms: int = 20,
+    speed: float = 1.0,
+    ramp: float = 0.05,
+) -> Dict[str, Any]:
+    """Run ``sessions`` concurrent sessions and return aggregated results."""
+
+    async def one(index: int) -> SessionResult:
+        await asyncio.sleep(index * ramp)
+        try:
+            return await run_session(url, speech, turns, frame_ms, speed)
+        except Exception as exc:  # pragma: no cover - reported in results
+            failed = SessionResult()
+            failed.errors.append(f"{type(exc).__name__}: {exc}")
+            return failed
+
+    monitor = LoopLagMonitor()
+    monitor.start()
+    started = time.monotonic()
+    results = await asyncio.gather(*(one(i) for i in range(sessions)))
+    elapsed = time.monotonic() - started
+    await monitor.stop()
+
+    turns_done = [t for r in results for t in r.turns if t.done is not None]
+    ms = 1000
+
+    def spans(end: str, begin: str = "speech_end") -> List[float]:
+        values = []
+        for turn in turns_done:
+            a, b = getattr(turn, begin), getattr(turn, end)
+            if a is not None and b is not None:
+                values.append((b - a) * ms)
+        return values
+
+    audio_sent = sum(r.audio_sent_seconds for r in results)
+    return {
+        "sessions": sessions,
+        "turns_completed": len(turns_done),
+        "errors": [e for r in results for e in r.errors],
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput": {
+            "turns_per_second": round(len(turns_done) / elapsed, 3),
+            "audio_seconds_sent_per_second": round(audio_sent / elapsed, 3),
+            "reply_audio_bytes": sum(t.audio_bytes for t in turns_done),
+        },
+        "latency_ms": {
+            "endpoint": summarize(spans("final")),
+            "first_audio": summarize(spans("first_audio")),
+            "reply_done": summarize(spans("done")),
+        },
+        "client_loop_lag_ms": monitor.summary(),
+        "client_max_rss_mb": max_rss_mb(),
+    }
@@ -0,0 +1,100 @@
+"""Run the WebSocket server on fake backends and report its own measurements.
+
+Started by :mod:`benchmarks.e2e` as a separate process so the load generator
+does not share its event loop. On SIGTERM or SIGINT the server shuts down and
+writes its statistics as JSON to ``--stats``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import json
+import signal
+from typing import Iterable, Optional
+
+from src.backend.config import STTConfig
+from src.backend.core.websocket_server import AudioWebSocketServer
+
+from .fakes import FakeAgent, FakeRecognizer, make_tts
+from .loadgen import LoopLagMonitor, max_rss_mb
+
+
+def add_backend_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the fake backend cost options shared with :mod:`benchmarks.e2e`."""
+    parser.add_argument("--stt-cost", type=float, default=0.05,
+                        help="Decode seconds per second of audio")
+    parser.add_argument("--decode-workers", type=int, default=2)
+    parser.add_argument("--agent-first-token", type=float, default=0.2,
+                        help="Seconds before the agent's first word")
+    parser.add_argument("--agent-token", type=float, default=0.02,
+                        help="Seconds between the agent's words")
+    parser.add_argument("--reply-sentences", type=int, default=2)
+    parser.add_argument("--tts-speed", type=float, default=10.0,
+                        help="Seconds of audio synthesized per second (0: instant)")
+    parser.add_argument("--tts-chunk-ms", type=int, default=200)
+    parser.add_argument("--tts-max-concurrent", type=int, default=0,
+                        help="Sentences synthesized at once (0: no limit)")
+
+
+def build_server(args: argparse.Namespace) -> AudioWebSocketServer:
+    return AudioWebSocketServer(
+        "fake",
+        host=args.host,
+        port=args.port,
+        transcript_log=None,
+        agent=FakeAgent(args.reply_sentences, args.agent_first_token, args.agent_token),
+        tts=make_tts(args.tts_speed, args.tts_chunk_ms),
+        stt_config=STTConfig(decode_workers=args.decode_workers),
+        recognizer_factory=functools.partial(FakeRecognizer, cost=args.stt_cost),
+        tts_max_concurrent=args.tts_max_concurrent,
+    )
+
+
+async def serve(args: argparse.Namespace) -> dict:
+    server = build_server(args)
+    monitor = LoopLagMonitor()
+    monitor.start()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    task = asyncio.create_task(server.run())
+    await stop.wait()
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    await monitor.stop()
+    return {
+        "loop_lag_ms": monitor.summary(),
+        "max_rss_mb": max_rss_mb(),
+        "turn_latency_ms": server.latency.summary(),
+        "stt": server.sessions.stats(),
+        "tts_scheduler": server.tts_scheduler.stats(),
+        "audio_bytes_received": server.bytes_received,
+        "audio_bytes_sent": server.bytes_sent,
+    }
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark server on fake backends")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--stats", help="Write server statistics to this file")
+    add_backend_arguments(parser)
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    stats = asyncio.run(serve(args))
+    text = json.dumps(stats, indent=2)
+    if args.stats:
+        with open(args.stats, "w", encoding="utf-8") as fh:
+            fh.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":  # pragma: no cover - entry point
+    main()
@@ -0,0 +1,180 @@
+"""Microbenchmark of the STT result path: ``feed_audio`` → ``stream``.
+
+A scripted recognizer with no decoding cost returns results in Vosk's own
+JSON layout, so the numbers reflect only the Python overhead around the
+recognizer: queueing, thread hops, JSON parsing and ``Transcript``
+allocation::
+
+    python -m benchmarks.stt_hotpath --frames 50000
+
+``--coalesce-ms 100`` matches the server defaults and ``--vad`` adds the
+optional VAD, so audio goes through the ingest ring and the VAD before
+reaching the recognizer, and
+``--trace-memory`` adds the peak Python heap use of each run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.backend.stt import DecodePool, VoiceActivityDetector, VoskStream
+from src.backend.stt import streaming
+
+from .e2e import git_commit
+from .fakes import speech_fixture
+
+
+class ScriptedRecognizer:
+    """Return a new word every ``repeat`` frames and a final every ``final_every``.
+
+    Like Vosk, the partial result is repeated unchanged until a new word is
+    recognized.
+    """
+
+    def __init__(self, repeat: int = 5, final_every: int = 100) -> None:
+        self.repeat = repeat
+        self.final_every = final_every
+        self.frames = 0
+        self._words: List[str] = []
+
+    def AcceptWaveform(self, data: bytes) -> bool:
+        self.frames += 1
+        if self.frames % self.final_every == 0:
+            return True
+        if self.frames % self.repeat == 0:
+            self._words.append(f"word{len(self._words) + 1}")
+        return False
+
+    def Result(self) -> str:
+        text, self._words = " ".join(self._words), []
+        return '{\n  "text" : "%s"\n}' % text
+
+    def PartialResult(self) -> str:
+        return '{\n  "partial" : "%s"\n}' % " ".join(self._words)
+
+    def FinalResult(self) -> str:
+        return self.Result()
+
+
+def bench_decode(frames: int, frame: bytes, repeat: int) -> Dict[str, Any]:
+    """Time ``VoskStream._decode`` called directly on the current thread."""
+    stream = VoskStream("unused", recognizer=ScriptedRecognizer(repeat))
+    emitted = 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        if stream._decode(frame) is not None:
+            emitted += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "frames": frames,
+        "seconds": round(elapsed, 4),
+        "frames_per_second": round(frames / elapsed),
+        "transcripts": emitted,
+        "partials_skipped": stream.partials_skipped,
+    }
+
+
+def frames_for(args: argparse.Namespace) -> List[bytes]:
+    """Return the frames to feed: silence, or alternating speech and silence."""
+    size = 16000 * args.frame_ms // 1000 * 2
+    silence = bytes(size)
+    if not args.vad:
+        return [silence]
+    # One second of tone followed by one second of silence
+    per_second = 1000 // args.frame_ms
+    speech = speech_fixture(1000)
+    tone = [speech[i : i + size] for i in range(0, per_second * size, size)]
+    return tone + [silence] * per_second
+
+
+async def bench_stream(args: argparse.Namespace, frames: List[bytes]) -> Dict[str, Any]:
+    """Time frames fed with ``feed_audio`` until ``stream`` has decoded them all."""
+    pool = DecodePool(1)
+    rec = ScriptedRecognizer(args.repeat)
+    stream = VoskStream(
+        "unused", recognizer=rec, decoder=pool, max_buffer_ms=0,
+        overflow="drop_oldest", coalesce_ms=args.coalesce_ms,
+        vad=VoiceActivityDetector() if args.vad else None,
+    )
+    emitted = 0
+
+    async def consume() -> None:
+        nonlocal emitted
+        async for _ in stream.stream():
+            emitted += 1
+
+    consumer = asyncio.create_task(consume())
+    if args.trace_memory:
+        tracemalloc.start()
+    # When coalescing, yield often enough for chunks to form at their size
+    step = 1 if args.coalesce_ms else 64
+    start = time.perf_counter()
+    for index in range(args.frames):
+        stream.feed_audio(frames[index % len(frames)])
+        if index % step == 0:
+            await asyncio.sleep(0)
+    while stream.buffer.depth:
+        await asyncio.sleep(0.001)
+    # The last chunk was handed to the worker; wait until it is decoded
+    await stream._worker.run(lambda: None)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if args.trace_memory else None
+    tracemalloc.stop()
+    consumer.cancel()
+    try:
+        await consumer
+    except asyncio.CancelledError:
+        pass
+    stream.close()
+    pool.shutdown()
+    result: Dict[str, Any] = {
+        "frames": args.frames,
+        "seconds": round(elapsed, 4),
+        "frames_per_second": round(args.frames / elapsed),
+        "recognizer_calls": rec.frames,
+        "transcripts": emitted,
+        "partials_skipped": stream.partials_skipped,
+    }
+    if peak is not None:
+        result["peak_kib"] = round(peak / 1024, 1)
+    return result
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="STT hot path microbenchmark")
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--frame-ms", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Frames between new words in the partial result")
+    parser.add_argument("--coalesce-ms", type=int, default=0,
+                        help="Merge frames into chunks of this length")
+    parser.add_argument("--vad", action="store_true",
+                        help="Filter audio with the VAD; speech alternates with silence")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Report peak Python heap use (slows the run)")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    frame = bytes(16000 * args.frame_ms // 1000 * 2)
+    results = {
+        "benchmark": "stt_hotpath",
+        "commit": git_commit(),
+        "json": streaming.json_loads.__module__,
+        "config": vars(args),
+        "decode": bench_decode(args.frames, frame, args.repeat),
+        "stream": asyncio.run(bench_stream(args, frames_for(args))),
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":  # pragma: no cover - entry point
+    main()
@@ -0,0 +1,114 @@
+"""TTS throughput under concurrency: in-process threads vs worker processes.
+
+``--sessions`` replies of ``--sentences`` sentences each are streamed at once
+through a CPU-bound fake engine (:class:`~benchmarks.fakes.CpuTTS`), first
+synthesized on threads of the calling process, the way ``OrpheusStyleTTS``
+does, and then through :class:`~src.backend.tts.service.ProcessPoolTTS`::
+
+    python -m benchmarks.tts_throughput --sessions 16 --processes 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import functools
+import json
+import statistics
+import time
+from typing import Any, Dict, Iterable, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore
+
+from src.backend.tts.base import TTS
+from src.backend.tts.service import ProcessPoolTTS
+
+from .e2e import git_commit
+from .fakes import CpuTTS
+from .loadgen import max_rss_mb
+
+
+def children_rss_mb() -> Optional[float]:
+    """Peak resident memory of the largest finished child process in MiB."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(rss / 1024 / (1024 if rss > 1 << 32 else 1), 1)
+
+
+def reply(index: int, sentences: int) -> str:
+    return " ".join(f"This is sentence {n} of reply {index}." for n in range(sentences))
+
+
+async def run_replies(tts: TTS, args: argparse.Namespace) -> Dict[str, Any]:
+    first: Dict[int, float] = {}
+    audio_bytes = 0
+
+    async def session(index: int) -> None:
+        nonlocal audio_bytes
+        start = time.perf_counter()
+        async for pcm in tts.stream(reply(index, args.sentences)):
+            first.setdefault(index, time.perf_counter() - start)
+            audio_bytes += len(pcm)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(args.sessions)))
+    elapsed = time.perf_counter() - start
+    audio_seconds = audio_bytes / (2 * tts.sample_rate)
+    return {
+        "wall_seconds": round(elapsed, 3),
+        "audio_seconds": round(audio_seconds, 2),
+        "audio_seconds_per_second": round(audio_seconds / elapsed, 2),
+        "first_chunk_ms_p50": round(statistics.median(first.values()) * 1000, 1),
+        "first_chunk_ms_max": round(max(first.values()) * 1000, 1),
+    }
+
+
+async def bench_pool(args: argparse.Namespace) -> Dict[str, Any]:
+    pool = ProcessPoolTTS(
+        functools.partial(CpuTTS, args.cost),
+        processes=args.processes,
+        max_batch=args.max_batch,
+        max_wait_ms=args.batch_wait_ms,
+    )
+    try:
+        result = await run_replies(pool, args)
+        result.update(pool.stats())
+    finally:
+        await pool.close()
+    result["worker_max_rss_mb"] = children_rss_mb()
+    return result
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="TTS throughput benchmark")
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--sentences", type=int, default=3, help="Sentences per reply")
+    parser.add_argument("--cost", type=float, default=0.1,
+                        help="CPU seconds per second of synthesized audio")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--batch-wait-ms", type=int, default=10)
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    results = {
+        "benchmark": "tts_throughput",
+        "commit": git_commit(),
+        "config": vars(args),
+        "in_process": asyncio.run(run_replies(CpuTTS(args.cost), args)),
+        "max_rss_mb": max_rss_mb(),
+        "process_pool": asyncio.run(bench_pool(args)),
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":  # pragma: no cover - entry point
+    main()
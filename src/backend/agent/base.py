@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import abc
+from typing import AsyncIterator
 
 
 class Agent(abc.ABC):
@@ -10,3 +11,12 @@ class Agent(abc.ABC):
     async def process(self, text: str) -> str:
         """Return a response for the given input text."""
         raise NotImplementedError
+
+    async def stream(self, text: str) -> AsyncIterator[str]:
+        """Yield the response for ``text`` as a series of text deltas.
+
+        Agents that generate incrementally (such as LLMs) should override
+        this so speech synthesis can start before the reply is complete. The
+        default implementation yields the result of :meth:`process` in one go.
+        """
+        yield await self.process(text)
@@ -0,0 +1,210 @@
+"""Helpers for moving PCM audio between the STT, TTS and WebSocket layers."""
+
+from __future__ import annotations
+
+import functools
+import io
+import struct
+import sys
+import wave
+from array import array
+from typing import Optional, Tuple, Union
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover - optional dependencies may be missing
+    np = None
+
+
+def wav_header(data_bytes: int, samplerate: int, channels: int = 1) -> bytes:
+    """Return the 44-byte header of a 16-bit PCM WAV holding ``data_bytes``."""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_bytes, b"WAVE",
+        b"fmt ", 16, 1, channels, samplerate, samplerate * channels * 2, channels * 2, 16,
+        b"data", data_bytes,
+    )
+
+
+def wav_bytes(pcm: bytes, samplerate: int, channels: int = 1) -> bytes:
+    """Wrap 16-bit PCM samples in a WAV container.
+
+    ``pcm`` may be any bytes-like object, e.g. a ``memoryview`` slice; it is
+    copied once, into the returned message.
+    """
+    return wav_header(len(pcm), samplerate, channels) + pcm
+
+
+def wav_to_pcm(data: bytes) -> Tuple[bytes, int]:
+    """Return the PCM frames and sample rate of a WAV byte string."""
+    with wave.open(io.BytesIO(data), "rb") as wf:
+        return wf.readframes(wf.getnframes()), wf.getframerate()
+
+
+def wav_data_offset(data: bytes) -> Optional[int]:
+    """Return where the PCM samples start in a (possibly partial) WAV stream.
+
+    Returns ``None`` if ``data`` does not yet contain the whole header. The
+    sizes in the header are ignored because streaming writers cannot fill
+    them in before the audio is complete.
+    """
+    if len(data) < 12:
+        return None
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Not a WAV stream")
+    pos = 12
+    while len(data) >= pos + 8:
+        chunk_id = data[pos : pos + 4]
+        size = struct.unpack_from("<I", data, pos + 4)[0]
+        if chunk_id == b"data":
+            return pos + 8
+        pos += 8 + size + (size & 1)
+    return None
+
+
+_ULAW_BIAS = 0x84
+_ULAW_CLIP = 32635
+
+
+def _ulaw_encode_sample(sample: int) -> int:
+    sign = 0
+    if sample < 0:
+        sample, sign = -sample, 0x80
+    sample = min(sample, _ULAW_CLIP) + _ULAW_BIAS
+    exponent = min(max(sample.bit_length() - 8, 0), 7)
+    mantissa = (sample >> (exponent + 3)) & 0x0F
+    return ~(sign | exponent << 4 | mantissa) & 0xFF
+
+
+def _ulaw_decode_byte(value: int) -> int:
+    value = ~value & 0xFF
+    exponent = (value >> 4) & 0x07
+    sample = (((value & 0x0F) << 3) + _ULAW_BIAS << exponent) - _ULAW_BIAS
+    return -sample if value & 0x80 else sample
+
+
+@functools.lru_cache(maxsize=None)
+def _ulaw_tables() -> Tuple[bytes, Tuple[int, ...]]:
+    # Indexed by the unsigned 16-bit view of a sample, and by a μ-law byte
+    encode = bytes(
+        _ulaw_encode_sample(i - 65536 if i >= 32768 else i) for i in range(65536)
+    )
+    decode = tuple(_ulaw_decode_byte(i) for i in range(256))
+    return encode, decode
+
+
+def ulaw_encode(pcm: bytes) -> bytes:
+    """Compress 16-bit little-endian PCM to 8-bit G.711 μ-law."""
+    encode, _ = _ulaw_tables()
+    if np is not None:
+        indices = np.frombuffer(pcm, dtype="<u2")
+        return np.frombuffer(encode, dtype=np.uint8)[indices].tobytes()
+    samples = array("H")
+    samples.frombytes(pcm)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return bytes(map(encode.__getitem__, samples))
+
+
+def ulaw_decode(data: bytes) -> bytes:
+    """Expand G.711 μ-law bytes to 16-bit little-endian PCM."""
+    _, decode = _ulaw_tables()
+    if np is not None:
+        table = np.array(decode, dtype="<i2")
+        return table[np.frombuffer(data, dtype=np.uint8)].tobytes()
+    samples = array("h", map(decode.__getitem__, data))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples.tobytes()
+
+
+class ByteRing:
+    """FIFO of bytes stored in one reusable ``bytearray``.
+
+    :meth:`write` copies into the ring instead of allocating a new object
+    and :meth:`read` returns a ``memoryview`` slice of it, so audio moves
+    from the socket to the recognizer without intermediate copies. Only a
+    read that wraps around the end of the ring allocates.
+
+    The view returned by :meth:`read` stays valid until the next
+    :meth:`read` or :meth:`release`; the ring never overwrites it before
+    then. Writes that do not fit move the unread bytes to a larger (or, if
+    only the held view is in the way, a fresh) ``bytearray``.
+    """
+
+    def __init__(self, capacity: int = 65536) -> None:
+        self._buf = bytearray(max(capacity, 1))
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._size = 0
+        # Bytes before ``_start`` still referenced by the last read
+        self._held = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buf)
+
+    def _reallocate(self, capacity: int) -> None:
+        buf = bytearray(capacity)
+        first = min(self._size, len(self._buf) - self._start)
+        buf[:first] = self._view[self._start : self._start + first]
+        buf[first : self._size] = self._view[: self._size - first]
+        # Views handed out earlier keep the old buffer alive
+        self._buf, self._view = buf, memoryview(buf)
+        self._start = 0
+        self._held = 0
+
+    def write(self, data: bytes) -> None:
+        """Append the bytes of ``data`` to the ring."""
+        n = len(data)
+        capacity = len(self._buf)
+        if self._held + self._size + n > capacity:
+            needed = self._size + n
+            self._reallocate(max(2 * capacity, needed) if needed > capacity else capacity)
+            capacity = len(self._buf)
+        end = self._start + self._size
+        if end >= capacity:
+            end -= capacity
+        if end + n <= capacity:
+            self._view[end : end + n] = data
+        else:
+            src = memoryview(data)
+            first = capacity - end
+            self._view[end:] = src[:first]
+            self._view[: n - first] = src[first:]
+        self._size += n
+
+    def read(self, n: int) -> Union[memoryview, bytes]:
+        """Remove and return up to ``n`` bytes from the front of the ring."""
+        self.release()
+        n = min(n, self._size)
+        capacity = len(self._buf)
+        first = min(n, capacity - self._start)
+        if first == n:
+            data: Union[memoryview, bytes] = self._view[self._start : self._start + n]
+            self._held = n
+        else:
+            data = b"".join((self._view[self._start :], self._view[: n - first]))
+        self._start = (self._start + n) % capacity
+        self._size -= n
+        return data
+
+    def discard(self, n: int) -> None:
+        """Drop up to ``n`` bytes from the front without reading them."""
+        n = min(n, self._size)
+        self._start = (self._start + n) % len(self._buf)
+        self._size -= n
+        if self._held:
+            # The held view sits before the dropped bytes; both stay reserved
+            self._held += n
+        elif not self._size:
+            self._start = 0
+
+    def release(self) -> None:
+        """Let the ring reuse the memory behind the last :meth:`read`."""
+        self._held = 0
+        if not self._size:
+            self._start = 0
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
+import dataclasses
+import functools
 import json
 from dataclasses import dataclass, field, is_dataclass
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 
 @dataclass
@@ -11,6 +13,17 @@ class STTConfig:
     type: str = "vosk"
     model_path: str = "vosk-model"
     samplerate: int = 16000
+    decode_workers: int = 2
+    max_buffer_ms: int = 5000
+    overflow: str = "block"
+    coalesce_ms: int = 100
+    vad: bool = False
+    vad_threshold: float = 65.0
+    vad_hangover_ms: int = 300
+    vad_preroll_ms: int = 200
+    vad_endpoint_ms: int = 700
+    warmup_ms: int = 0
+    warmup_audio: Optional[str] = None
 
 
 @dataclass
@@ -19,6 +32,22 @@ class TTSConfig:
     model_path: str = "orpheus-3b"
     device: str = "cpu"
     voice: str = "default"
+    cache: bool = True
+    cache_max_mb: int = 32
+    cache_dir: Optional[str] = None
+    command: Optional[List[str]] = None
+    samplerate: int = 16000
+    warm_workers: int = 1
+    max_workers: int = 2
+    chunk_ms: int = 0
+    synthesis_speed: float = 0.0
+    processes: int = 0
+    max_batch: int = 8
+    batch_wait_ms: int = 10
+    max_concurrent: int = 0
+    deadline_ms: int = 0
+    warmup: List[str] = field(default_factory=list)
+    preload: List[str] = field(default_factory=list)
 
 
 @dataclass
@@ -31,6 +60,20 @@ class ServerConfig:
     host: str = "localhost"
     port: int = 8000
     transcript_log: Optional[str] = "transcript.log"
+    transcript_log_max_mb: int = 0
+    transcript_log_daily: bool = False
+    latency_log: Optional[str] = None
+    metrics_port: int = 0
+    metrics_socket: Optional[str] = None
+    partial_max_rate: float = 0.0
+    partial_delta: bool = False
+    audio_chunk_ms: int = 250
+    max_sessions: int = 0
+    turn_policy: str = "queue"
+    max_pending_turns: int = 2
+    barge_in: bool = True
+    workers: int = 1
+    drain_timeout: float = 10.0
 
 
 @dataclass
@@ -66,13 +109,51 @@ def load_config(path: str | None) -> BackendConfig:
         _update(cfg, data)
     except KeyError as e:
         raise ValueError(f"Error in config file '{path}': {e.args[0]}") from e
+    _check_choices(cfg, path)
     return cfg
 
 
+def _check_choices(cfg: BackendConfig, path: str) -> None:
+    """Reject option values that would otherwise fail with the first client."""
+    from .core.pipeline import TURN_POLICIES
+    from .stt.ingest import OVERFLOW_POLICIES
+
+    for name, value, choices in (
+        ("stt.overflow", cfg.stt.overflow, OVERFLOW_POLICIES),
+        ("server.turn_policy", cfg.server.turn_policy, TURN_POLICIES),
+    ):
+        if value not in choices:
+            raise ValueError(
+                f"Error in config file '{path}': '{name}' must be one of"
+                f" {', '.join(choices)}, not {value!r}"
+            )
+
+
+def create_vad(cfg: STTConfig):
+    """Return a voice activity detector for one stream, or ``None``."""
+    if not cfg.vad:
+        return None
+    from .stt import VoiceActivityDetector
+    return VoiceActivityDetector(
+        cfg.samplerate,
+        threshold=cfg.vad_threshold,
+        hangover_ms=cfg.vad_hangover_ms,
+        preroll_ms=cfg.vad_preroll_ms,
+        endpoint_ms=cfg.vad_endpoint_ms,
+    )
+
+
 def create_stt(cfg: STTConfig):
     if cfg.type == "vosk":
         from .stt import VoskStream
-        return VoskStream(cfg.model_path, samplerate=cfg.samplerate)
+        return VoskStream(
+            cfg.model_path,
+            samplerate=cfg.samplerate,
+            max_buffer_ms=cfg.max_buffer_ms,
+            overflow=cfg.overflow,
+            coalesce_ms=cfg.coalesce_ms,
+            vad=create_vad(cfg),
+        )
     raise ValueError(f"Unknown STT type: {cfg.type}")
 
 
@@ -84,13 +165,49 @@ def create_agent(cfg: AgentConfig):
 
 
 def create_tts(cfg: TTSConfig):
+    tts = _create_tts_service(cfg) if cfg.processes > 0 else _create_tts_backend(cfg)
+    if cfg.cache:
+        from .tts.cache import CachedTTS
+        return CachedTTS(
+            tts, max_bytes=cfg.cache_max_mb * 1024 * 1024, cache_dir=cfg.cache_dir
+        )
+    return tts
+
+
+def _create_tts_service(cfg: TTSConfig):
+    """Run the engine in ``cfg.processes`` worker processes."""
+    # The other engines already synthesize in processes of their own
+    if cfg.type not in ("orpheus", "console"):
+        raise ValueError(f"TTS type '{cfg.type}' cannot run in worker processes")
+    from .tts.service import ProcessPoolTTS
+    return ProcessPoolTTS(
+        functools.partial(_create_tts_backend, dataclasses.replace(cfg, processes=0)),
+        processes=cfg.processes,
+        max_batch=cfg.max_batch,
+        max_wait_ms=cfg.batch_wait_ms,
+    )
+
+
+def _create_tts_backend(cfg: TTSConfig):
     if cfg.type == "orpheus":
         from .tts.orpheus import OrpheusStyleTTS
         return OrpheusStyleTTS(cfg.model_path, device=cfg.device, voice=cfg.voice)
     if cfg.type == "macsay":
         from .tts.macsay import MacSayTTS
-        return MacSayTTS()
+        return MacSayTTS(warm=cfg.warm_workers, max_concurrency=cfg.max_workers)
+    if cfg.type == "command":
+        if not cfg.command:
+            raise ValueError("TTS type 'command' needs a 'command' list")
+        from .tts.worker import CommandTTS
+        return CommandTTS(
+            cfg.command,
+            cfg.samplerate,
+            warm=cfg.warm_workers,
+            max_concurrency=cfg.max_workers,
+        )
     if cfg.type == "console":
         from .tts.simple import ConsoleTTS
-        return ConsoleTTS()
+        return ConsoleTTS(
+            cfg.samplerate, chunk_ms=cfg.chunk_ms, speed=cfg.synthesis_speed
+        )
     raise ValueError(f"Unknown TTS type: {cfg.type}")
@@ -1,17 +1,28 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from ..stt import Transcript
 from ..agent.base import Agent
 from ..tts.base import TTS
+from .latency import LatencyTracker, TurnTrace
+from .reply import ReplyStream
 
 
 class ChatBackend:
-    """Wire STT, Agent and TTS together."""
+    """Wire STT, Agent and TTS together.
+
+    Each turn is traced and recorded in ``latency`` if given. The STT stream
+    owns the microphone here, so traces have no ``first_frame`` mark.
+    """
 
-    def __init__(self, stt, agent: Agent, tts: TTS) -> None:
+    def __init__(
+        self, stt, agent: Agent, tts: TTS, latency: Optional[LatencyTracker] = None
+    ) -> None:
         self.stt = stt
         self.agent = agent
         self.tts = tts
+        self.latency = latency
 
     async def run(self, turns: int = -1) -> None:
         """Run the main loop.
@@ -22,10 +33,20 @@ class ChatBackend:
             Stop after this many final transcripts if > 0.
         """
         final_count = 0
+        trace = TurnTrace()
         async for transcript in self.stt.stream():
-            if transcript.is_final:
-                reply = await self.agent.process(transcript.text)
-                await self.tts.speak(reply)
-                final_count += 1
-                if turns > 0 and final_count >= turns:
-                    break
+            if not transcript.is_final:
+                if transcript.text:
+                    trace.mark("first_partial")
+                continue
+            trace.mark("final")
+            trace.turn = final_count + 1
+            # Synthesis starts as soon as the agent finishes a sentence
+            async for _ in ReplyStream(self.agent, self.tts, transcript.text, trace):
+                pass
+            if self.latency is not None:
+                self.latency.record(trace)
+            trace = TurnTrace()
+            final_count += 1
+            if turns > 0 and final_count >= turns:
+                break
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, TextIO
+
+from .metrics import Histogram
+
+# Span name -> (start mark, end mark)
+SPANS = {
+    "stt_first_partial": ("first_frame", "first_partial"),
+    "stt_final": ("first_frame", "final"),
+    "agent_queue": ("final", "agent_start"),
+    "agent": ("agent_start", "agent_end"),
+    "tts_first_byte": ("tts_start", "tts_first_byte"),
+    "response": ("final", "tts_first_byte"),
+    "turn": ("first_frame", "last_byte"),
+}
+
+
+@dataclass
+class TurnTrace:
+    """Monotonic timestamps of the milestones of one conversational turn.
+
+    ``first_frame`` is the first audio frame received since the previous
+    final transcript, so ``stt_final`` includes any silence before the user
+    spoke. Marks that never happened (e.g. no partial before the final) stay
+    ``None`` and the spans depending on them are left out.
+    """
+
+    turn: int = 0
+    first_frame: Optional[float] = None
+    first_partial: Optional[float] = None
+    final: Optional[float] = None
+    agent_start: Optional[float] = None
+    agent_end: Optional[float] = None
+    tts_start: Optional[float] = None
+    tts_first_byte: Optional[float] = None
+    last_byte: Optional[float] = None
+    wall_time: float = field(default_factory=time.time)
+
+    def mark(self, name: str, once: bool = True) -> None:
+        """Record the current time as mark ``name``.
+
+        With ``once`` an existing mark is kept, so callers can mark "first"
+        events unconditionally.
+        """
+        if not once or getattr(self, name) is None:
+            setattr(self, name, time.monotonic())
+
+    def spans(self) -> Dict[str, float]:
+        """Return the duration of every complete span in milliseconds."""
+        result = {}
+        for name, (start, end) in SPANS.items():
+            begin, finish = getattr(self, start), getattr(self, end)
+            if begin is not None and finish is not None:
+                result[name] = (finish - begin) * 1000
+        return result
+
+    def to_json(self) -> str:
+        data: Dict[str, Any] = asdict(self)
+        data["spans_ms"] = {k: round(v, 3) for k, v in self.spans().items()}
+        return json.dumps(data)
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Return the nearest-rank ``q`` percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+class LatencyTracker:
+    """Collect turn traces and keep rolling latency percentiles.
+
+    The last ``window`` durations of each span feed the p50/p95/p99 figures
+    of :meth:`summary`, and the last ``window`` traces are kept for
+    :meth:`dump`. If ``sink`` is given every recorded trace is also passed
+    to it as a JSON line, e.g. ``TranscriptLog.write``, and every span is
+    observed in seconds by ``histogram``, which needs a ``span`` label.
+    """
+
+    def __init__(
+        self,
+        window: int = 1000,
+        sink: Optional[Callable[[str], Any]] = None,
+        histogram: Optional[Histogram] = None,
+    ) -> None:
+        self.window = window
+        self.sink = sink
+        self.histogram = histogram
+        self.turns = 0
+        self.traces: Deque[TurnTrace] = deque(maxlen=window)
+        self._samples: Dict[str, Deque[float]] = {
+            name: deque(maxlen=window) for name in SPANS
+        }
+
+    def record(self, trace: TurnTrace) -> None:
+        self.turns += 1
+        self.traces.append(trace)
+        for name, value in trace.spans().items():
+            self._samples[name].append(value)
+            if self.histogram is not None:
+                self.histogram.labels(name).observe(value / 1000)
+        if self.sink is not None:
+            self.sink(trace.to_json() + "\n")
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return count, p50, p95 and p99 in milliseconds for every span."""
+        result = {}
+        for name, samples in self._samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            result[name] = {
+                "count": len(ordered),
+                "p50": percentile(ordered, 50),
+                "p95": percentile(ordered, 95),
+                "p99": percentile(ordered, 99),
+            }
+        return result
+
+    def dump(self, fp: TextIO) -> int:
+        """Write the retained traces to ``fp`` as JSON lines."""
+        for trace in self.traces:
+            fp.write(trace.to_json() + "\n")
+        return len(self.traces)
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import inspect
+import math
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+Sample = Tuple[str, Dict[str, str], float]
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf
+)
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Metric:
+    """Base class of a metric family with optional labels.
+
+    Without ``labelnames`` the metric's own methods update its single
+    value; otherwise :meth:`labels` returns the child for one label set.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Metric] = {}
+        self._func: Optional[Callable[[], float]] = None
+
+    def labels(self, *values: str) -> "Metric":
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    def set_function(self, func: Callable[[], float]) -> None:
+        """Read the value from ``func`` whenever the metric is collected."""
+        self._func = func
+
+    def _new_child(self) -> "Metric":
+        return type(self)(self.name, self.help)
+
+    def _own_samples(self) -> Iterator[Sample]:
+        raise NotImplementedError
+
+    def samples(self) -> Iterator[Sample]:
+        if not self.labelnames:
+            yield from self._own_samples()
+            return
+        for values, child in sorted(self._children.items()):
+            labels = dict(zip(self.labelnames, values))
+            for name, extra, value in child._own_samples():
+                yield name, {**labels, **extra}, value
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self.value += amount
+
+    def _own_samples(self) -> Iterator[Sample]:
+        yield self.name, {}, self._func() if self._func else self.value
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        bounds = sorted(buckets)
+        if not bounds or bounds[-1] != math.inf:
+            bounds.append(math.inf)
+        self.buckets = tuple(bounds)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def _new_child(self) -> "Metric":
+        return Histogram(self.name, self.help, buckets=self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def _own_samples(self) -> Iterator[Sample]:
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            le = "+Inf" if math.isinf(bound) else repr(float(bound))
+            yield f"{self.name}_bucket", {"le": le}, total
+        yield f"{self.name}_sum", {}, self.sum
+        yield f"{self.name}_count", {}, self.count
+
+
+class MetricsRegistry:
+    """Hold metrics and render them in the Prometheus text format.
+
+    ``collectors`` run before every :meth:`render` so values kept elsewhere
+    (e.g. ``stats()`` dictionaries) can be copied into gauges on demand.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))  # type: ignore[return-value]
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def add_collector(self, func: Callable[[], None]) -> None:
+        self._collectors.append(func)
+
+    def render(self) -> str:
+        for collect in self._collectors:
+            collect()
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                if labels:
+                    text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                    name = f"{name}{{{text}}}"
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serve ``registry`` at ``GET /metrics`` over TCP or a Unix socket.
+
+    This is a deliberately tiny HTTP/1.0 responder, enough for Prometheus
+    scrapes and ``curl`` without pulling in a web framework. ``registry``
+    may be anything with a ``render()`` method, which can be a coroutine
+    when the text has to be gathered from elsewhere.
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        host: str = "localhost",
+        port: int = 0,
+        path: Optional[str] = None,
+    ) -> None:
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.path = path
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        if self.path:
+            self._server = await asyncio.start_unix_server(self._handle, self.path)
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readline(), 5)
+            # Skip the headers; nothing in them matters here
+            while (line := await asyncio.wait_for(reader.readline(), 5)) not in (
+                b"\r\n",
+                b"\n",
+                b"",
+            ):
+                pass
+            parts = request.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status = "200 OK"
+                text = self.registry.render()
+                if inspect.isawaitable(text):
+                    text = await text
+                body = text.encode()
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                status = "404 Not Found"
+                body = b"Not found\n"
+                content_type = "text/plain; charset=utf-8"
+            writer.write(
+                (
+                    f"HTTP/1.0 {status}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: close\r\n\r\n"
+                ).encode()
+                + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
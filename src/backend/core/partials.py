@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import dataclasses
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class PartialPolicy:
+    """How partial transcripts are sent to one client.
+
+    ``max_rate`` caps partial messages per second (0 for no limit). With
+    ``delta`` a partial only carries what changed: the client keeps the first
+    ``keep`` characters of the previous partial and appends ``text``.
+    ``enabled=False`` sends no partials at all.
+    """
+
+    max_rate: float = 0.0
+    delta: bool = False
+    enabled: bool = True
+
+    def updated(self, data: Dict[str, Any]) -> "PartialPolicy":
+        """Return a copy with the options a client asked for applied."""
+        policy = dataclasses.replace(self)
+        if "max_rate" in data:
+            policy.max_rate = max(0.0, float(data["max_rate"]))
+        if "delta" in data:
+            policy.delta = bool(data["delta"])
+        if "enabled" in data:
+            policy.enabled = bool(data["enabled"])
+        return policy
+
+
+class PartialFilter:
+    """Turn partial transcripts into the messages a client should receive.
+
+    Unchanged text is never re-sent. Partials arriving faster than the
+    policy's rate are held back; only the newest is kept and
+    :meth:`flush_delay` tells the caller when it may go out. Final
+    transcripts always pass straight through and reset the state.
+    """
+
+    def __init__(self, policy: Optional[PartialPolicy] = None) -> None:
+        self.policy = policy or PartialPolicy()
+        self.sent = 0
+        self.suppressed = 0
+        self._last_text = ""
+        self._last_sent_at = float("-inf")
+        self._pending: Optional[str] = None
+
+    @property
+    def pending(self) -> bool:
+        return self._pending is not None
+
+    def _interval(self) -> float:
+        return 1.0 / self.policy.max_rate if self.policy.max_rate > 0 else 0.0
+
+    def flush_delay(self, now: Optional[float] = None) -> float:
+        """Seconds until a held-back partial may be sent."""
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._last_sent_at + self._interval() - now)
+
+    def partial(self, text: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return the message for partial ``text``, or ``None`` to send nothing."""
+        if not self.policy.enabled or text == self._last_text:
+            self.suppressed += 1
+            self._pending = None
+            return None
+        now = time.monotonic() if now is None else now
+        if self.flush_delay(now) > 0:
+            if self._pending is not None:
+                self.suppressed += 1
+            self._pending = text
+            return None
+        return self._message(text, now)
+
+    def flush(self, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return the message for the held-back partial, if any."""
+        text, self._pending = self._pending, None
+        if text is None or text == self._last_text:
+            return None
+        return self._message(text, time.monotonic() if now is None else now)
+
+    def final(self, text: str) -> Dict[str, Any]:
+        """Return the message for a final transcript and reset."""
+        if self._pending is not None:
+            self.suppressed += 1
+        self._pending = None
+        self._last_text = ""
+        self._last_sent_at = float("-inf")
+        return {"text": text, "final": True}
+
+    def _message(self, text: str, now: float) -> Dict[str, Any]:
+        previous, self._last_text = self._last_text, text
+        self._last_sent_at = now
+        self._pending = None
+        self.sent += 1
+        if not self.policy.delta:
+            return {"text": text, "final": False}
+        keep = len(os.path.commonprefix([previous, text]))
+        return {"text": text[keep:], "final": False, "keep": keep}
@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import itertools
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..agent.base import Agent
+from ..stt import Transcript
+from ..tts.base import TTS
+from ..tts.text import SentenceAccumulator
+from .latency import LatencyTracker, TurnTrace
+from .partials import PartialFilter, PartialPolicy
+
+TURN_POLICIES = ("queue", "interrupt")
+
+
+@dataclass
+class Turn:
+    """One user utterance and the agent's reply to it."""
+
+    id: int
+    prompt: str
+    reply: str = ""
+    sentences: int = 0
+    cancelled: bool = False
+    speech_failed: bool = False
+    trace: TurnTrace = field(default_factory=TurnTrace)
+
+
+class TurnPipeline:
+    """Per-connection STT → agent → TTS pipeline.
+
+    Three tasks run side by side, joined by bounded queues:
+
+    * the STT stage forwards every transcript to the client as soon as it is
+      decoded and queues final transcripts as new turns,
+    * the agent stage streams the reply for each turn and cuts it into
+      sentences,
+    * the TTS stage synthesizes those sentences and sends the audio.
+
+    Because the STT stage never waits on the other two, partial transcripts
+    keep flowing while earlier turns are still being answered.
+
+    ``policy`` decides what happens when a final transcript arrives while a
+    turn is in flight. ``"queue"`` answers turns in order, keeping at most
+    ``max_pending_turns`` waiting and dropping the oldest beyond that.
+    ``"interrupt"`` abandons the in-flight and pending turns and answers the
+    new one straight away.
+
+    With ``barge_in`` enabled, the first non-empty partial transcript that
+    arrives while the agent is replying (or while its audio is presumably
+    still playing on the client) cancels the reply, see :meth:`barge_in`.
+
+    Every answered turn is traced (see :class:`TurnTrace`) and recorded in
+    ``latency`` if given. Call :meth:`audio_received` for each incoming
+    audio frame so the trace knows when the utterance started.
+    ``on_synthesis`` is called with the seconds spent waiting on TTS for
+    each sentence.
+
+    Partial transcripts go through a :class:`PartialFilter` following
+    ``partial_policy``; final transcripts are always sent at once.
+
+    An exception from the agent or the TTS fails only the turn it happened
+    in: it is logged, the client gets ``{"event": "error", ...}`` and the
+    pipeline carries on with the next turn. A turn whose agent failed is
+    dropped; one whose speech failed is finished without the rest of its
+    audio.
+    """
+
+    def __init__(
+        self,
+        stt: Any,
+        agent: Agent,
+        tts: TTS,
+        send_message: Callable[[Dict[str, Any]], Awaitable[None]],
+        send_audio: Callable[[bytes, int], Awaitable[None]],
+        log: Optional[Callable[[str, str], None]] = None,
+        policy: str = "queue",
+        max_pending_turns: int = 2,
+        max_pending_sentences: int = 4,
+        barge_in: bool = False,
+        latency: Optional[LatencyTracker] = None,
+        on_synthesis: Optional[Callable[[float], None]] = None,
+        partial_policy: Optional[PartialPolicy] = None,
+    ) -> None:
+        if policy not in TURN_POLICIES:
+            raise ValueError(f"Unknown turn policy: {policy}")
+        self.stt = stt
+        self.agent = agent
+        self.tts = tts
+        self.send_message = send_message
+        self.send_audio = send_audio
+        self.log = log
+        self.policy = policy
+        self.barge_in_enabled = barge_in
+        self.latency = latency
+        self.on_synthesis = on_synthesis
+        self.partials = PartialFilter(partial_policy)
+        self._partial_flush: Optional[asyncio.Task] = None
+        self.dropped_turns = 0
+        self.barge_ins = 0
+        self.failed_turns = 0
+        self._playback_until = 0.0
+        self._turns: asyncio.Queue[Optional[Turn]] = asyncio.Queue(max_pending_turns)
+        self._sentences: asyncio.Queue[Optional[Tuple[Turn, Optional[str]]]] = (
+            asyncio.Queue(max_pending_sentences)
+        )
+        self._active: Dict[int, Turn] = {}
+        self._ids = itertools.count(1)
+        self._agent_job: Optional[asyncio.Task] = None
+        self._tts_job: Optional[asyncio.Task] = None
+        self._trace = TurnTrace()
+
+    @property
+    def busy(self) -> bool:
+        """Whether any turn is waiting for or receiving a reply."""
+        return bool(self._active)
+
+    @property
+    def pending_turns(self) -> int:
+        """Number of turns waiting for the agent."""
+        return self._turns.qsize()
+
+    @property
+    def speaking(self) -> bool:
+        """Whether a reply is in flight or its audio is still playing."""
+        return self.busy or time.monotonic() < self._playback_until
+
+    async def run(self) -> None:
+        """Run until the STT stream ends and every queued turn is answered."""
+        tasks = [
+            asyncio.create_task(self._stt_stage()),
+            asyncio.create_task(self._agent_stage()),
+            asyncio.create_task(self._tts_stage()),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            if self._partial_flush is not None:
+                tasks.append(self._partial_flush)
+            for task in tasks:
+                task.cancel()
+            for task in tasks:
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+
+    def audio_received(self) -> None:
+        """Note that an audio frame arrived from the client."""
+        if self._trace.first_frame is None:
+            self._trace.mark("first_frame")
+
+    def interrupt(self) -> bool:
+        """Abandon all in-flight and pending turns.
+
+        Returns ``True`` if there was anything to abandon.
+        """
+        active = [turn for turn in self._active.values() if not turn.cancelled]
+        for turn in active:
+            turn.cancelled = True
+        self._active.clear()
+        for job in (self._agent_job, self._tts_job):
+            if job is not None and not job.done():
+                job.cancel()
+        return bool(active)
+
+    async def barge_in(self) -> bool:
+        """Stop the current reply because the user started speaking.
+
+        Cancels pending agent and TTS work, drops audio that has not been sent
+        yet and tells the client to flush its playback buffer. Returns
+        ``False`` if the agent was not speaking.
+        """
+        if not self.speaking:
+            return False
+        self.interrupt()
+        self._playback_until = 0.0
+        self.barge_ins += 1
+        await self.send_message({"event": "barge_in"})
+        return True
+
+    def _log(self, prefix: str, text: str) -> None:
+        if self.log is not None:
+            self.log(prefix, text)
+
+    def _enqueue(self, turn: Turn) -> None:
+        if self.policy == "interrupt":
+            self.interrupt()
+        while self._turns.full():
+            dropped = self._turns.get_nowait()
+            if dropped is not None:
+                dropped.cancelled = True
+                self._active.pop(dropped.id, None)
+                self.dropped_turns += 1
+        self._active[turn.id] = turn
+        self._turns.put_nowait(turn)
+
+    async def _stt_stage(self) -> None:
+        async for t in self.stt.stream():
+            await self._on_transcript(t)
+        # Let the later stages finish what is already queued
+        await self._turns.put(None)
+
+    async def _on_transcript(self, t: Transcript) -> None:
+        if not t.is_final:
+            if t.text:
+                self._trace.mark("first_partial")
+                if self.barge_in_enabled:
+                    await self.barge_in()
+            message = self.partials.partial(t.text)
+            if message is not None:
+                await self.send_message(message)
+            elif self.partials.pending and self._partial_flush is None:
+                self._partial_flush = asyncio.create_task(self._flush_partial())
+            return
+        if self._partial_flush is not None:
+            self._partial_flush.cancel()
+            self._partial_flush = None
+        await self.send_message(self.partials.final(t.text))
+        trace, self._trace = self._trace, TurnTrace()
+        if t.text:
+            trace.mark("final")
+            self._log("<", t.text)
+            turn_id = next(self._ids)
+            trace.turn = turn_id
+            self._enqueue(Turn(id=turn_id, prompt=t.text, trace=trace))
+
+    async def _flush_partial(self) -> None:
+        """Send the newest held-back partial once the rate limit allows."""
+        await asyncio.sleep(self.partials.flush_delay())
+        self._partial_flush = None
+        message = self.partials.flush()
+        if message is not None:
+            await self.send_message(message)
+
+    async def _run_job(self, coro: Any, attr: str, turn: Turn, stage: str) -> None:
+        """Run ``coro`` for ``turn`` as a job that :meth:`interrupt` can cancel."""
+        job = asyncio.create_task(coro)
+        setattr(self, attr, job)
+        try:
+            await job
+        except asyncio.CancelledError:
+            task = asyncio.current_task()
+            if task is not None and task.cancelling():
+                raise
+        except Exception as exc:
+            await self._fail(turn, stage, exc)
+        finally:
+            setattr(self, attr, None)
+
+    async def _fail(self, turn: Turn, stage: str, exc: Exception) -> None:
+        self.failed_turns += 1
+        print(
+            f"Error: turn {turn.id} failed in {stage}: {type(exc).__name__}: {exc}",
+            file=sys.stderr,
+        )
+        if stage == "agent":
+            # The reply will never be complete; skip what was queued of it
+            turn.cancelled = True
+            self._active.pop(turn.id, None)
+        else:
+            turn.speech_failed = True
+        # The client may be gone already, which is what failed
+        with contextlib.suppress(Exception):
+            await self.send_message(
+                {"event": "error", "turn": turn.id, "stage": stage, "message": str(exc)}
+            )
+
+    async def _agent_stage(self) -> None:
+        while (turn := await self._turns.get()) is not None:
+            if not turn.cancelled:
+                await self._run_job(self._generate(turn), "_agent_job", turn, "agent")
+        await self._sentences.put(None)
+
+    async def _generate(self, turn: Turn) -> None:
+        accumulator = SentenceAccumulator()
+        turn.trace.mark("agent_start")
+        async for delta in self.agent.stream(turn.prompt):
+            turn.reply += delta
+            for sentence in accumulator.push(delta):
+                await self._sentences.put((turn, sentence))
+        for sentence in accumulator.flush():
+            await self._sentences.put((turn, sentence))
+        turn.trace.mark("agent_end")
+        await self._sentences.put((turn, None))
+
+    async def _tts_stage(self) -> None:
+        while (item := await self._sentences.get()) is not None:
+            turn, sentence = item
+            if turn.cancelled:
+                continue
+            if sentence is None:
+                await self._finish(turn)
+            elif not turn.speech_failed:
+                await self._run_job(self._speak(turn, sentence), "_tts_job", turn, "tts")
+
+    async def _speak(self, turn: Turn, sentence: str) -> None:
+        trace = turn.trace
+        trace.mark("tts_start")
+        synthesis = 0.0
+        requested = time.monotonic()
+        # A scheduler puts the first sentence of each reply ahead of the rest
+        stream = self.tts.stream_sentence(sentence, first=turn.sentences == 0)
+        turn.sentences += 1
+        try:
+            async for pcm in stream:
+                now = time.monotonic()
+                synthesis += now - requested
+                if turn.cancelled:
+                    break
+                trace.mark("tts_first_byte")
+                sample_rate = self.tts.sample_rate
+                start = max(now, self._playback_until)
+                self._playback_until = start + len(pcm) / (2 * sample_rate)
+                await self.send_audio(pcm, sample_rate)
+                trace.mark("last_byte", once=False)
+                requested = time.monotonic()
+            else:
+                synthesis += time.monotonic() - requested
+        finally:
+            if self.on_synthesis is not None:
+                self.on_synthesis(synthesis)
+
+    async def _finish(self, turn: Turn) -> None:
+        self._active.pop(turn.id, None)
+        reply = turn.reply.strip()
+        self._log(">", reply)
+        await self.send_message({"text": reply, "final": True, "agent": True})
+        if self.latency is not None:
+            self.latency.record(turn.trace)
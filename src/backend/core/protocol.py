@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from ..audio import ulaw_decode, ulaw_encode, wav_bytes
+
+PROTOCOL_VERSION = 1
+ENCODINGS = ("pcm16", "ulaw")
+# version, kind, stream id, sequence number, timestamp in microseconds
+HEADER = struct.Struct("!BBHIQ")
+KIND_AUDIO = 1
+# Stream ids used by the server for the audio it sends
+TTS_STREAM = 1
+DEFAULT_CHUNK_MS = 250
+MIN_CHUNK_MS = 10
+MAX_CHUNK_MS = 1000
+
+
+class ProtocolError(ValueError):
+    """Raised for malformed frames or a failed handshake."""
+
+
+@dataclass
+class Frame:
+    kind: int
+    stream: int
+    seq: int
+    timestamp_us: int
+    payload: memoryview
+
+
+def pack_frame(kind: int, stream: int, seq: int, timestamp_us: int, payload: bytes) -> bytes:
+    header = HEADER.pack(
+        PROTOCOL_VERSION, kind, stream, seq & 0xFFFFFFFF, timestamp_us & (2**64 - 1)
+    )
+    return header + payload
+
+
+def unpack_frame(data: bytes) -> Frame:
+    if len(data) < HEADER.size:
+        raise ProtocolError("Frame shorter than its header")
+    version, kind, stream, seq, timestamp = HEADER.unpack_from(data)
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Unsupported frame version {version}")
+    return Frame(kind, stream, seq, timestamp, memoryview(data)[HEADER.size :])
+
+
+def encode_audio(pcm: bytes, encoding: str) -> bytes:
+    return ulaw_encode(pcm) if encoding == "ulaw" else pcm
+
+
+def decode_audio(data: bytes, encoding: str) -> bytes:
+    return ulaw_decode(data) if encoding == "ulaw" else data
+
+
+def _check_pcm(pcm: bytes) -> None:
+    if len(pcm) % 2:
+        raise ProtocolError(f"PCM of odd length {len(pcm)}")
+
+
+@dataclass
+class StreamStats:
+    """Loss and interarrival jitter of one inbound stream (RFC 3550 style)."""
+
+    received: int = 0
+    lost: int = 0
+    late: int = 0
+    jitter_ms: float = 0.0
+    _next_seq: Optional[int] = None
+    _transit: Optional[float] = None
+
+    def observe(self, seq: int, timestamp_us: int, arrival: float) -> bool:
+        """Account for a frame; return ``False`` if it is late or a duplicate."""
+        if self._next_seq is not None:
+            gap = (seq - self._next_seq) & 0xFFFFFFFF
+            if gap >= 0x80000000:
+                self.late += 1
+                return False
+            self.lost += gap
+        self._next_seq = (seq + 1) & 0xFFFFFFFF
+        self.received += 1
+        transit = arrival * 1000 - timestamp_us / 1000
+        if self._transit is not None:
+            self.jitter_ms += (abs(transit - self._transit) - self.jitter_ms) / 16
+        self._transit = transit
+        return True
+
+
+@dataclass
+class ClientProtocol:
+    """Per-connection protocol state.
+
+    A connection starts in legacy mode: binary messages are raw 16-bit PCM
+    and audio goes out as WAV chunks. Once the client sends a ``hello``
+    handshake, binary messages in both directions are frames with a
+    :data:`HEADER` and JSON messages carry a ``type``.
+    """
+
+    sample_rate: int = 16000
+    chunk_ms: int = DEFAULT_CHUNK_MS
+    framed: bool = False
+    encoding: str = "pcm16"
+    inbound: Dict[int, StreamStats] = field(default_factory=dict)
+    _out_seq: int = 0
+    _out_samples: int = 0
+    _start: float = field(default_factory=time.monotonic)
+
+    def hello(
+        self,
+        payload: Dict[str, Any],
+        output_sample_rate: int,
+        session: int = 0,
+        encodings: Sequence[str] = ENCODINGS,
+    ) -> Dict[str, Any]:
+        """Negotiate the session parameters and return the ``welcome`` reply.
+
+        The client lists the encodings it supports in order of preference
+        and may ask for an output ``chunk_ms``. It may also state the
+        ``sample_rate`` it will send. The recognizer runs at one fixed rate,
+        so any other rate is refused rather than decoded wrongly.
+        """
+        version = payload.get("version", PROTOCOL_VERSION)
+        if version != PROTOCOL_VERSION:
+            raise ProtocolError(f"Unsupported protocol version {version}")
+        offered = payload.get("encodings") or ["pcm16"]
+        common = [e for e in offered if e in encodings]
+        if not common:
+            raise ProtocolError(f"No common encoding in {offered}")
+        try:
+            chunk_ms = int(payload.get("chunk_ms", self.chunk_ms))
+        except (TypeError, ValueError):
+            raise ProtocolError("chunk_ms must be an integer") from None
+        sample_rate = payload.get("sample_rate", self.sample_rate)
+        if sample_rate != self.sample_rate:
+            raise ProtocolError(
+                f"Unsupported sample_rate {sample_rate}; send {self.sample_rate} Hz audio"
+            )
+        self.encoding = common[0]
+        self.chunk_ms = min(max(chunk_ms, MIN_CHUNK_MS), MAX_CHUNK_MS)
+        self.framed = True
+        return {
+            "type": "welcome",
+            "version": PROTOCOL_VERSION,
+            "session": session,
+            "encoding": self.encoding,
+            "sample_rate": self.sample_rate,
+            "output_sample_rate": output_sample_rate,
+            "chunk_ms": self.chunk_ms,
+        }
+
+    @property
+    def frames_lost(self) -> int:
+        return sum(s.lost for s in self.inbound.values())
+
+    @property
+    def jitter_ms(self) -> float:
+        return max((s.jitter_ms for s in self.inbound.values()), default=0.0)
+
+    def receive(self, data: bytes) -> Optional[bytes]:
+        """Return the PCM carried by a binary message, or ``None`` to drop it.
+
+        Raises :class:`ProtocolError` for a malformed frame or PCM that does
+        not hold whole 16-bit samples.
+        """
+        if not self.framed:
+            _check_pcm(data)
+            return data
+        frame = unpack_frame(data)
+        if frame.kind != KIND_AUDIO:
+            return None
+        stats = self.inbound.setdefault(frame.stream, StreamStats())
+        if not stats.observe(frame.seq, frame.timestamp_us, time.monotonic() - self._start):
+            return None
+        pcm = decode_audio(frame.payload, self.encoding)
+        _check_pcm(pcm)
+        return pcm
+
+    def message(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the message ``type`` in framed mode."""
+        if not self.framed or "type" in payload:
+            return payload
+        if "event" in payload:
+            kind = "event"
+        elif payload.get("agent"):
+            kind = "reply"
+        else:
+            kind = "transcript"
+        return {"type": kind, **payload}
+
+    def audio(self, pcm: bytes, sample_rate: int) -> Iterator[bytes]:
+        """Split ``pcm`` into ``chunk_ms`` messages ready to send."""
+        size = max(2, sample_rate * self.chunk_ms // 1000 * 2)
+        view = memoryview(pcm)
+        for start in range(0, len(pcm), size):
+            # Slices are views; each message is built with a single copy
+            chunk = view[start : start + size]
+            if not self.framed:
+                # Each chunk is a complete WAV so the UI can decode it alone
+                yield wav_bytes(chunk, sample_rate)
+                continue
+            timestamp = self._out_samples * 1_000_000 // sample_rate
+            yield pack_frame(
+                KIND_AUDIO, TTS_STREAM, self._out_seq, timestamp,
+                encode_audio(chunk, self.encoding),
+            )
+            self._out_seq += 1
+            self._out_samples += len(chunk) // 2
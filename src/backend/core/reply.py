@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from typing import AsyncIterator, Optional
+
+from ..agent.base import Agent
+from ..tts.base import TTS
+from ..tts.text import SentenceAccumulator
+from .latency import TurnTrace
+
+
+class ReplyStream:
+    """Pipe an agent's streamed reply into TTS one sentence at a time.
+
+    Iterating over the object yields PCM chunks. The agent runs in a
+    background task that feeds completed sentences to TTS while it is still
+    generating the rest of the reply. :attr:`text` holds the reply text
+    received so far and is complete once iteration finishes.
+
+    If ``trace`` is given the agent and TTS milestones are marked on it.
+    """
+
+    def __init__(
+        self, agent: Agent, tts: TTS, prompt: str, trace: Optional[TurnTrace] = None
+    ) -> None:
+        self.agent = agent
+        self.tts = tts
+        self.prompt = prompt
+        self.trace = trace or TurnTrace()
+        self.text = ""
+
+    async def _produce(self, sentences: asyncio.Queue[Optional[str]]) -> None:
+        accumulator = SentenceAccumulator()
+        self.trace.mark("agent_start")
+        try:
+            async for delta in self.agent.stream(self.prompt):
+                self.text += delta
+                for sentence in accumulator.push(delta):
+                    sentences.put_nowait(sentence)
+            for sentence in accumulator.flush():
+                sentences.put_nowait(sentence)
+            self.trace.mark("agent_end")
+        finally:
+            sentences.put_nowait(None)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        sentences: asyncio.Queue[Optional[str]] = asyncio.Queue()
+        producer = asyncio.create_task(self._produce(sentences))
+        try:
+            while (sentence := await sentences.get()) is not None:
+                self.trace.mark("tts_start")
+                async for pcm in self.tts.stream(sentence):
+                    self.trace.mark("tts_first_byte")
+                    yield pcm
+                    self.trace.mark("last_byte", once=False)
+            # Surface any error raised by the agent
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await producer
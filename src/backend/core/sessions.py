@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config import STTConfig, create_vad
+from ..stt import DecodePool, VoskStream, load_model
+
+
+class SessionLimitError(RuntimeError):
+    """Raised when a new session would exceed the configured cap."""
+
+
+@dataclass
+class Session:
+    """State owned by a single WebSocket connection."""
+
+    id: int
+    stt: VoskStream
+    tasks: List[asyncio.Task] = field(default_factory=list)
+
+
+class SessionManager:
+    """Create per-connection STT sessions backed by one shared Vosk model.
+
+    The model is loaded once, by :meth:`load` or in the background with
+    :meth:`start_loading`; :attr:`state` moves from ``"loading"`` to
+    ``"ready"`` (or ``"failed"``) and :meth:`open` refuses sessions until the
+    model is there. Each call to :meth:`open` only builds a recognizer and
+    queue, which is cheap compared to loading the model. Decoding for all
+    sessions runs on a shared :class:`DecodePool` sized by
+    ``STTConfig.decode_workers``.
+
+    ``recognizer_factory`` builds each session's recognizer from the sample
+    rate instead of Vosk, in which case no model is loaded and the manager
+    is ready at once. So is a manager given an already loaded ``model``,
+    e.g. one loaded before forking worker processes.
+    """
+
+    def __init__(
+        self,
+        cfg: Optional[STTConfig] = None,
+        max_sessions: int = 0,
+        recognizer_factory: Optional[Callable[[int], Any]] = None,
+        model: Any = None,
+    ) -> None:
+        self.cfg = cfg or STTConfig()
+        self.max_sessions = max_sessions
+        self.recognizer_factory = recognizer_factory
+        self.model: Any = model
+        self.state = "ready" if recognizer_factory or model is not None else "loading"
+        self.error: Optional[str] = None
+        self.load_seconds = 0.0
+        self._loading: Optional[asyncio.Task] = None
+        self.decoder = DecodePool(self.cfg.decode_workers)
+        self.sessions: Dict[int, Session] = {}
+        self._ids = itertools.count(1)
+        self._closed_stats: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def load(self) -> None:
+        """Load the model now, blocking the caller."""
+        if self.state != "loading":
+            return
+        start = time.perf_counter()
+        try:
+            self.model = load_model(self.cfg.model_path)
+        except Exception as exc:
+            self.state, self.error = "failed", str(exc)
+            raise
+        self.load_seconds = time.perf_counter() - start
+        self.state = "ready"
+
+    def start_loading(self) -> asyncio.Task:
+        """Load the model on a thread; calling again returns the same task."""
+        if self._loading is None:
+            self._loading = asyncio.create_task(asyncio.to_thread(self.load))
+        return self._loading
+
+    async def wait_ready(self) -> None:
+        """Wait for the model, starting the load if needed.
+
+        Raises whatever the load raised if it failed.
+        """
+        if not self.ready:
+            await asyncio.shield(self.start_loading())
+
+    def _stream(self, vad: bool = True) -> VoskStream:
+        return VoskStream(
+            self.cfg.model_path,
+            samplerate=self.cfg.samplerate,
+            model=self.model,
+            decoder=self.decoder,
+            max_buffer_ms=self.cfg.max_buffer_ms,
+            overflow=self.cfg.overflow,
+            coalesce_ms=self.cfg.coalesce_ms,
+            vad=create_vad(self.cfg) if vad else None,
+            recognizer=(
+                self.recognizer_factory(self.cfg.samplerate)
+                if self.recognizer_factory
+                else None
+            ),
+        )
+
+    def open(self) -> Session:
+        """Return a new session with a dedicated recognizer."""
+        if not self.ready:
+            raise RuntimeError(f"STT model is not ready ({self.state})")
+        if self.max_sessions > 0 and len(self.sessions) >= self.max_sessions:
+            raise SessionLimitError(
+                f"Too many sessions (max {self.max_sessions})"
+            )
+        session = Session(id=next(self._ids), stt=self._stream())
+        self.sessions[session.id] = session
+        return session
+
+    async def warm_up(self, pcm: bytes) -> None:
+        """Decode ``pcm`` once on every decode worker before serving.
+
+        This starts the decode threads and faults in the parts of the model
+        the first utterance would otherwise wait for.
+        """
+        if not self.ready:
+            raise RuntimeError(f"STT model is not ready ({self.state})")
+        # Opened together, the streams are pinned to different workers
+        streams = [self._stream(vad=False) for _ in self.decoder.workers]
+        try:
+            await asyncio.gather(*(stt.warm_up(pcm) for stt in streams))
+        finally:
+            for stt in streams:
+                stt.close()
+
+    async def close(self, session: Session) -> None:
+        """Cancel the session's tasks and forget about it."""
+        self.sessions.pop(session.id, None)
+        for task in session.tasks:
+            task.cancel()
+        # A task that failed has been reported by whoever watched it
+        await asyncio.gather(*session.tasks, return_exceptions=True)
+        session.tasks.clear()
+        session.stt.close()
+        stats = session.stt.stats()
+        # Gauges describe live sessions only
+        stats.pop("ingest_depth_bytes", None)
+        self._closed_stats.update(stats)
+
+    def stats(self) -> Dict[str, float]:
+        """Return STT counters summed over all sessions, past and present."""
+        totals = Counter(self._closed_stats)
+        for session in self.sessions.values():
+            totals.update(session.stt.stats())
+        totals["active_sessions"] = len(self.sessions)
+        return dict(totals)
+
+    async def close_all(self) -> None:
+        for session in list(self.sessions.values()):
+            await self.close(session)
+
+    def shutdown(self) -> None:
+        """Stop the decode workers. Call after :meth:`close_all`."""
+        self.decoder.shutdown()
+
+    def create_task(self, session: Session, coro: Any) -> asyncio.Task:
+        """Start ``coro`` as a task that is cancelled when the session closes."""
+        task = asyncio.create_task(coro)
+        session.tasks.append(task)
+        return task
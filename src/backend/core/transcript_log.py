@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import datetime
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional, TextIO
+
+
+class TranscriptLog:
+    """Append transcript lines to a file without blocking the event loop.
+
+    :meth:`write` only puts the line on a bounded queue; a background task
+    collects up to ``batch_size`` lines, or whatever arrived within
+    ``flush_interval`` seconds of the first one, and writes and flushes them
+    in a worker thread. If the queue is full the line is dropped and counted
+    rather than stalling the caller.
+
+    The file is rotated once it grows past ``max_bytes`` (keeping
+    ``backup_count`` numbered copies, like :mod:`logging.handlers`) and, with
+    ``daily`` set, whenever the date changes, in which case the old file is
+    renamed with its date as suffix.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_queue: int = 1000,
+        batch_size: int = 64,
+        flush_interval: float = 0.25,
+        max_bytes: int = 0,
+        daily: bool = False,
+        backup_count: int = 5,
+    ) -> None:
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.daily = daily
+        self.backup_count = backup_count
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.errors = 0
+        self._queue: Optional[asyncio.Queue[Optional[str]]] = None
+        self._max_queue = max_queue
+        self._writer: Optional[asyncio.Task] = None
+        self._file: Optional[TextIO] = None
+        self._day: Optional[datetime.date] = None
+
+    def write(self, line: str) -> bool:
+        """Queue ``line`` for writing; return ``False`` if it was dropped.
+
+        Must be called from the event loop. The writer task is started on
+        first use.
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(self._max_queue)
+            self._writer = asyncio.create_task(self._run())
+        try:
+            self._queue.put_nowait(line)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        return True
+
+    async def close(self) -> None:
+        """Write out every queued line and close the file.
+
+        A writer task that died is reported rather than waited for.
+        """
+        if self._queue is not None and self._writer is not None:
+            writer = self._writer
+            if not writer.done():
+                # The queue may be full with the writer dying before it drains
+                sentinel = asyncio.ensure_future(self._queue.put(None))
+                await asyncio.wait({sentinel, writer}, return_when=asyncio.FIRST_COMPLETED)
+                if sentinel.done():
+                    await asyncio.wait({writer})
+                else:
+                    sentinel.cancel()
+            if not writer.cancelled() and writer.exception() is not None:
+                self.dropped += self._queue.qsize()
+                print(
+                    f"Transcript log writer failed: {writer.exception()!r}",
+                    file=sys.stderr,
+                )
+            self._queue = None
+            self._writer = None
+        await asyncio.to_thread(self._close_file)
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            line = await self._queue.get()
+            if line is None:
+                break
+            batch = [line]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except OSError:
+                # Losing log lines beats taking the server down with the disk
+                self.errors += 1
+                self.dropped += len(batch)
+
+    def _write_batch(self, lines: List[str]) -> None:
+        data = "".join(lines)
+        self._maybe_rotate(len(data.encode("utf-8")))
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+            self._day = datetime.date.today()
+        self._file.write(data)
+        self._file.flush()
+        self.written += len(lines)
+        self.batches += 1
+
+    def _maybe_rotate(self, incoming: int) -> None:
+        today = datetime.date.today()
+        if self.daily and self._day is not None and today != self._day:
+            self._close_file()
+            target = self.path.with_name(f"{self.path.name}.{self._day.isoformat()}")
+            if self.path.exists():
+                os.replace(self.path, target)
+            return
+        if not self.max_bytes:
+            return
+        try:
+            size = self.path.stat().st_size
+        except OSError:
+            return
+        if size == 0 or size + incoming <= self.max_bytes:
+            return
+        self._close_file()
+        if self.backup_count <= 0:
+            self.path.unlink()
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -1,34 +1,85 @@
 from __future__ import annotations
 
+import time
+
+_import_started = time.perf_counter()
+
 import asyncio
 import contextlib
+import dataclasses
+import functools
 import json
 import datetime
-from typing import Any, Iterable, Optional, TextIO
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
 
 try:
     import websockets  # type: ignore
 except ImportError:  # pragma: no cover - optional dependency
     websockets = None
 
-from ..stt import VoskStream, Transcript
+from ..audio import wav_to_pcm
+from ..stt import VoskStream, Transcript, load_model
+from .latency import LatencyTracker
+from .metrics import MetricsRegistry, MetricsServer
+from .partials import PartialPolicy
+from .protocol import ClientProtocol, ProtocolError
+from .pipeline import TurnPipeline
+from .sessions import Session, SessionLimitError, SessionManager
+from .transcript_log import TranscriptLog
+from .startup import StartupTimer
 from ..agent.base import Agent
 from ..agent.simple import EchoAgent
 from ..tts.base import TTS
-from ..tts.simple import ConsoleTTS
-from ..tts.macsay import MacSayTTS
-from ..tts.orpheus import OrpheusStyleTTS
+from ..tts.cache import CachedTTS
+from ..tts.scheduler import TTSScheduler, default_concurrency
 from ..config import (
     BackendConfig,
+    STTConfig,
     create_agent,
     create_stt,
     create_tts,
     load_config,
 )
 
+# Only the backends a config selects are imported, by the create_* helpers
+_import_seconds = time.perf_counter() - _import_started
+
+
+@dataclasses.dataclass
+class Connection:
+    """A live client connection and the objects serving it."""
+
+    websocket: Any
+    pipeline: TurnPipeline
+    protocol: ClientProtocol
+
 
 class AudioWebSocketServer:
-    """Serve a WebSocket endpoint that streams audio to STT."""
+    """Serve a WebSocket endpoint that streams audio to STT.
+
+    The STT model loads in the background once :meth:`run` has bound the
+    port. Clients that connect earlier get ``{"event": "loading"}`` and then
+    ``{"event": "ready"}``; ``{"type": "status"}`` returns the state and the
+    start-up timings at any time. Without a ``tts`` the tone-only
+    :class:`~src.backend.tts.simple.ConsoleTTS` stand-in is used. A
+    ``model`` that is already loaded is used as is.
+
+    Synthesis for all connections goes through a :class:`TTSScheduler`
+    running at most ``tts_max_concurrent`` jobs at once (0: the backend's
+    ``capacity``, if it declares one) and dropping jobs that wait longer
+    than ``tts_deadline_ms`` (0: never).
+
+    Before reporting ready, :meth:`run` can warm the backends up: the STT
+    decodes ``stt_config.warmup_audio`` (a WAV file) or ``warmup_ms`` of a
+    test tone on every decode worker, the TTS synthesizes the
+    ``tts_warmup`` phrases, and the ``tts_preload`` phrases are put in the
+    audio cache. Clients wait as they do for the model, and the time taken
+    is recorded as start-up phases.
+    """
 
     def __init__(
         self,
@@ -38,34 +89,193 @@ class AudioWebSocketServer:
         transcript_log: Optional[str] = "transcript.log",
         agent: Optional[Agent] = None,
         tts: Optional[TTS] = None,
+        max_sessions: int = 0,
+        stt_config: Optional[STTConfig] = None,
+        turn_policy: str = "queue",
+        max_pending_turns: int = 2,
+        barge_in: bool = True,
+        transcript_log_max_mb: int = 0,
+        transcript_log_daily: bool = False,
+        latency_log: Optional[str] = None,
+        metrics_port: int = 0,
+        metrics_socket: Optional[str] = None,
+        recognizer_factory: Optional[Callable[[int], Any]] = None,
+        partial_policy: Optional[PartialPolicy] = None,
+        audio_chunk_ms: int = 250,
+        startup: Optional[StartupTimer] = None,
+        model: Any = None,
+        tts_max_concurrent: int = 0,
+        tts_deadline_ms: int = 0,
+        tts_warmup: Sequence[str] = (),
+        tts_preload: Sequence[str] = (),
     ) -> None:
         if websockets is None:
             raise RuntimeError("websockets must be installed to run the server")
         self.host = host
         self.port = port
-        self.stt = VoskStream(model_path)
+        stt_config = dataclasses.replace(stt_config or STTConfig(), model_path=model_path)
+        self.sessions = SessionManager(
+            stt_config,
+            max_sessions=max_sessions,
+            recognizer_factory=recognizer_factory,
+            model=model,
+        )
+        self.turn_policy = turn_policy
+        self.max_pending_turns = max_pending_turns
+        self.barge_in = barge_in
+        self.partial_policy = partial_policy or PartialPolicy()
+        self.audio_chunk_ms = audio_chunk_ms
         self.bytes_received = 0
         self.bytes_sent = 0
         self._last_bytes_received = 0
         self._last_bytes_sent = 0
-        self._log_file: Optional[TextIO] = (
-            open(transcript_log, "a", encoding="utf-8") if transcript_log else None
+        self.transcript_log: Optional[TranscriptLog] = (
+            TranscriptLog(
+                transcript_log,
+                max_bytes=transcript_log_max_mb * 1024 * 1024,
+                daily=transcript_log_daily,
+            )
+            if transcript_log
+            else None
+        )
+        self._connections: Dict[int, Connection] = {}
+        self._closed_frames_lost = 0
+        self.metrics = MetricsRegistry()
+        self.metrics_server = (
+            MetricsServer(self.metrics, host, metrics_port, metrics_socket)
+            if metrics_port or metrics_socket
+            else None
+        )
+        self.latency_log = TranscriptLog(latency_log) if latency_log else None
+        self.latency = LatencyTracker(
+            sink=self.latency_log.write if self.latency_log else None,
+            histogram=self.metrics.histogram(
+                "turn_span_seconds", "Duration of each turn latency span", ["span"]
+            ),
         )
         self.agent = agent or EchoAgent()
-        self.tts = tts or self._default_tts()
+        if tts is None:
+            from ..tts.simple import ConsoleTTS
 
-    def _default_tts(self) -> TTS:
-        """Return a TTS instance, preferring Orpheus if available."""
-        import os
+            tts = ConsoleTTS()
+        self.tts = tts
+        self.startup = startup or StartupTimer()
+        self.tts_scheduler = TTSScheduler(
+            tts_max_concurrent or default_concurrency(tts),
+            deadline=tts_deadline_ms / 1000,
+        )
+        self.tts_warmup = list(tts_warmup)
+        self.tts_preload = list(tts_preload)
+        self._warmed = asyncio.Event()
+        if not (
+            stt_config.warmup_ms or stt_config.warmup_audio or tts_warmup or tts_preload
+        ):
+            self._warmed.set()
+        self._setup_metrics()
 
-        model_path = os.environ.get("ORPHEUS_MODEL", "orpheus-3b")
-        try:
-            return OrpheusStyleTTS(model_path)
-        except Exception:
-            try:
-                return MacSayTTS()
-            except Exception:
-                return ConsoleTTS()
+    def _setup_metrics(self) -> None:
+        m = self.metrics
+        m.gauge("sessions_active", "Open WebSocket sessions").set_function(
+            lambda: len(self.sessions)
+        )
+        m.gauge("server_ready", "1 once the STT model is loaded").set_function(
+            lambda: 1 if self.sessions.ready else 0
+        )
+        self.startup_seconds = m.gauge(
+            "startup_phase_seconds", "Duration of each start-up phase", ["phase"]
+        )
+        m.counter("audio_received_bytes_total", "Audio bytes received").set_function(
+            lambda: self.bytes_received
+        )
+        m.counter("audio_sent_bytes_total", "Audio bytes sent").set_function(
+            lambda: self.bytes_sent
+        )
+        self.synthesis_seconds = m.histogram(
+            "tts_synthesis_seconds", "Time spent waiting on TTS per sentence"
+        )
+        queue_wait = m.histogram(
+            "tts_queue_wait_seconds", "Time TTS jobs waited for a slot", ["priority"]
+        )
+        self.tts_scheduler.on_wait = lambda seconds, first: queue_wait.labels(
+            "first" if first else "rest"
+        ).observe(seconds)
+        scheduler = self.tts_scheduler
+        m.gauge("tts_jobs_running", "TTS jobs synthesizing").set_function(
+            lambda: scheduler.running
+        )
+        m.gauge("tts_jobs_waiting", "TTS jobs waiting for a slot").set_function(
+            lambda: scheduler.waiting
+        )
+        m.counter(
+            "tts_jobs_dropped_total", "TTS jobs dropped after their deadline"
+        ).set_function(lambda: scheduler.dropped)
+        pending = m.gauge("turns_pending", "Turns waiting for the agent")
+        send_buffer = m.gauge(
+            "websocket_send_buffer_bytes", "Bytes buffered for sending to clients"
+        )
+        stt = {
+            "ingest_depth_bytes": m.gauge(
+                "stt_ingest_depth_bytes", "Audio buffered ahead of the decoder"
+            ),
+            "ingest_dropped_bytes": m.counter(
+                "stt_ingest_dropped_bytes_total", "Audio dropped by full ingest buffers"
+            ),
+            "decode_seconds": m.counter(
+                "stt_decode_seconds_total", "CPU time spent decoding audio"
+            ),
+            "decoded_audio_seconds": m.counter(
+                "stt_decoded_audio_seconds_total", "Seconds of audio decoded"
+            ),
+            "vad_frames_skipped": m.counter(
+                "stt_vad_frames_skipped_total", "Frames withheld from the decoder by VAD"
+            ),
+            "vad_cpu_saved_seconds": m.counter(
+                "stt_vad_cpu_saved_seconds_total", "Estimated decode time saved by VAD"
+            ),
+            "partials_skipped": m.counter(
+                "stt_partials_skipped_total", "Repeated partial results not sent"
+            ),
+        }
+        rtf = m.gauge("stt_real_time_factor", "Decode time per second of audio")
+        frames_lost = m.counter(
+            "audio_frames_lost_total", "Framed audio lost in transit from clients"
+        )
+        jitter = m.gauge("audio_jitter_ms", "Highest inbound interarrival jitter")
+        # Other backends have stats too, but not cache counters
+        cache_tts = self.tts if isinstance(self.tts, CachedTTS) else None
+        cache = (
+            {
+                name: m.counter(f"tts_cache_{name}_total", f"TTS cache {name}")
+                for name in ("hits", "misses", "evictions")
+            }
+            if cache_tts is not None
+            else {}
+        )
+
+        def collect() -> None:
+            stats = self.sessions.stats()
+            for key, metric in stt.items():
+                metric.value = stats.get(key, 0)
+            audio = stats.get("decoded_audio_seconds", 0)
+            rtf.set(stats.get("decode_seconds", 0) / audio if audio else 0.0)
+            connections = list(self._connections.values())
+            pending.set(sum(c.pipeline.pending_turns for c in connections))
+            buffered = 0
+            for conn in connections:
+                transport = getattr(conn.websocket, "transport", None)
+                if transport is not None:
+                    buffered += transport.get_write_buffer_size()
+            send_buffer.set(buffered)
+            frames_lost.value = self._closed_frames_lost + sum(
+                c.protocol.frames_lost for c in connections
+            )
+            jitter.set(max((c.protocol.jitter_ms for c in connections), default=0.0))
+            if cache_tts is not None:
+                values = cache_tts.stats()
+                for key, metric in cache.items():
+                    metric.value = values.get(key, 0)
+
+        m.add_collector(collect)
 
     def _timestamp(self) -> str:
         """Return the current timestamp with millisecond precision."""
@@ -83,58 +293,387 @@ class AudioWebSocketServer:
                 print(
                     f"Audio bytes received: {self.bytes_received}, sent: {self.bytes_sent}"
                 )
+                stats = self.sessions.stats()
+                if stats.get("vad_frames_total"):
+                    print(
+                        f"VAD skipped {stats['vad_frames_skipped']}"
+                        f"/{stats['vad_frames_total']} frames,"
+                        f" ~{stats['vad_cpu_saved_seconds']:.1f}s decode CPU saved"
+                    )
+                latency = self.latency.summary()
+                if latency:
+                    print(
+                        "Latency p50/p95 ms: "
+                        + ", ".join(
+                            f"{name} {s['p50']:.0f}/{s['p95']:.0f}"
+                            for name, s in latency.items()
+                        )
+                    )
                 self._last_bytes_received = self.bytes_received
                 self._last_bytes_sent = self.bytes_sent
 
-    async def _send_transcripts(self, websocket: Any) -> None:
-        async for t in self.stt.stream():
-            payload = json.dumps({"text": t.text, "final": t.is_final})
-            await websocket.send(payload)
-            if self._log_file and t.is_final and t.text:
-                self._log_file.write(f"{self._timestamp()} < {t.text}\n")
-                self._log_file.flush()
-            if t.is_final and t.text:
-                reply = await self.agent.process(t.text)
-                audio = await self.tts.speak(reply)
-                if audio:
-                    await websocket.send(audio)
-                if self._log_file:
-                    self._log_file.write(f"{self._timestamp()} > {reply}\n")
-                    self._log_file.flush()
-                reply_payload = json.dumps({"text": reply, "final": True, "agent": True})
-                await websocket.send(reply_payload)
+    def _log(self, prefix: str, text: str) -> None:
+        """Queue a timestamped line for the transcript log."""
+        if self.transcript_log is not None:
+            self.transcript_log.write(f"{self._timestamp()} {prefix} {text}\n")
+
+    async def _send_audio(
+        self, websocket: Any, protocol: ClientProtocol, pcm: bytes, sample_rate: int
+    ) -> None:
+        # Small messages let pings and transcripts through between chunks
+        for message in protocol.audio(pcm, sample_rate):
+            self.bytes_sent += len(message)
+            await websocket.send(message)
+
+    def _make_pipeline(
+        self,
+        websocket: Any,
+        stt: VoskStream,
+        protocol: Optional[ClientProtocol] = None,
+        session_id: int = 0,
+    ) -> TurnPipeline:
+        if protocol is None:
+            protocol = ClientProtocol(chunk_ms=self.audio_chunk_ms)
+
+        async def send_message(payload: dict) -> None:
+            await websocket.send(json.dumps(protocol.message(payload)))
+
+        return TurnPipeline(
+            stt,
+            self.agent,
+            self.tts_scheduler.session(self.tts, session_id),
+            send_message=send_message,
+            send_audio=functools.partial(self._send_audio, websocket, protocol),
+            log=self._log,
+            policy=self.turn_policy,
+            max_pending_turns=self.max_pending_turns,
+            barge_in=self.barge_in,
+            latency=self.latency,
+            on_synthesis=self.synthesis_seconds.observe,
+            partial_policy=self.partial_policy,
+        )
+
+    async def _handle_control(self, conn: Connection, session_id: int, message: str) -> None:
+        """Apply a JSON control message sent by the client."""
+        try:
+            payload = json.loads(message)
+        except ValueError:
+            return
+        if not isinstance(payload, dict):
+            return
+        pipeline = conn.pipeline
+        if payload.get("type") == "status":
+            await conn.websocket.send(json.dumps(self.status()))
+        if payload.get("type") == "hello":
+            try:
+                reply = conn.protocol.hello(payload, self.tts.sample_rate, session_id)
+            except ProtocolError as exc:
+                reply = {"type": "error", "error": str(exc)}
+            await conn.websocket.send(json.dumps(reply))
+        if isinstance(payload.get("partials"), dict):
+            try:
+                policy = pipeline.partials.policy.updated(payload["partials"])
+            except (TypeError, ValueError):
+                return
+            pipeline.partials.policy = policy
+
+    def status(self) -> Dict[str, Any]:
+        """Return the readiness state, the process id and start-up timings."""
+        status: Dict[str, Any] = {
+            "type": "status",
+            "state": (
+                "warming"
+                if self.sessions.ready and not self._warmed.is_set()
+                else self.sessions.state
+            ),
+            "pid": os.getpid(),
+            "startup": self.startup.to_dict(),
+        }
+        if self.sessions.error:
+            status["error"] = self.sessions.error
+        return status
 
     async def _handler(self, websocket: Any) -> None:
-        send_task = asyncio.create_task(self._send_transcripts(websocket))
+        if not self.sessions.ready or not self._warmed.is_set():
+            await websocket.send(json.dumps({"event": "loading"}))
+            try:
+                await self.sessions.wait_ready()
+            except Exception:
+                # 1011: internal error
+                await websocket.close(1011, "STT model failed to load")
+                return
+            await self._warmed.wait()
+            await websocket.send(json.dumps({"event": "ready"}))
+        try:
+            session = self.sessions.open()
+        except SessionLimitError as exc:
+            # 1013: try again later
+            await websocket.close(1013, str(exc))
+            return
+        protocol = ClientProtocol(
+            sample_rate=self.sessions.cfg.samplerate, chunk_ms=self.audio_chunk_ms
+        )
+        pipeline = self._make_pipeline(websocket, session.stt, protocol, session.id)
+        conn = Connection(websocket, pipeline, protocol)
+        self._connections[session.id] = conn
+        running = self.sessions.create_task(session, pipeline.run())
+        receiving = asyncio.create_task(self._receive(conn, session))
         try:
-            async for message in websocket:
-                if isinstance(message, (bytes, bytearray)):
-                    data = bytes(message)
-                    self.bytes_received += len(data)
-                    self.stt.feed_audio(data)
+            # Nothing reads the audio once the pipeline has failed, so
+            # waiting on the client alone could block forever
+            pending = {receiving, running}
+            while receiving in pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                if running in done and not running.cancelled() and running.exception():
+                    exc = running.exception()
+                    print(
+                        f"Error: session {session.id} pipeline failed:"
+                        f" {type(exc).__name__}: {exc}",
+                        file=sys.stderr,
+                    )
+                    # 1011: internal error
+                    await websocket.close(1011, "Pipeline failed")
+                    break
+            if receiving.done():
+                receiving.result()
         finally:
-            send_task.cancel()
+            receiving.cancel()
             with contextlib.suppress(asyncio.CancelledError):
-                await send_task
+                await receiving
+            self._connections.pop(session.id, None)
+            self.tts_scheduler.forget(session.id)
+            self._closed_frames_lost += protocol.frames_lost
+            await self.sessions.close(session)
+
+    async def _warm_up_stt(self) -> None:
+        cfg = self.sessions.cfg
+        if cfg.warmup_audio:
+            data = await asyncio.to_thread(Path(cfg.warmup_audio).read_bytes)
+            pcm, rate = wav_to_pcm(data)
+            if rate != cfg.samplerate:
+                raise ValueError(
+                    f"{cfg.warmup_audio} is {rate} Hz, expected {cfg.samplerate} Hz"
+                )
+        else:
+            from ..tts.simple import tone
+
+            pcm = tone(cfg.samplerate, 220, cfg.samplerate * cfg.warmup_ms // 1000)
+        await self.sessions.warm_up(pcm)
+
+    async def _warm_up_tts(self) -> None:
+        if self.tts_warmup:
+            with self.startup.phase("tts_warmup"):
+                await self.tts.warm_up(self.tts_warmup)
+        if self.tts_preload:
+            preload = getattr(self.tts, "preload", None)
+            if preload is None:
+                print("Warning: tts.preload needs tts.cache enabled", file=sys.stderr)
+                return
+            with self.startup.phase("tts_preload"):
+                await preload(self.tts_preload)
+
+    async def _warm_up(self) -> None:
+        """Run the configured warm-up; a failure is reported, not fatal."""
+
+        async def run(name: str, coro: Any) -> None:
+            try:
+                await coro
+            except Exception as exc:
+                print(f"Error: {name} warm-up failed: {exc}", file=sys.stderr)
 
-    async def run(self) -> None:
+        async def stt() -> None:
+            with self.startup.phase("stt_warmup"):
+                await self._warm_up_stt()
+
+        jobs = [run("TTS", self._warm_up_tts())]
+        cfg = self.sessions.cfg
+        if cfg.warmup_ms or cfg.warmup_audio:
+            jobs.append(run("STT", stt()))
+        # Decoding runs on the decode threads, so the two overlap
+        await asyncio.gather(*jobs)
+
+    async def _receive(self, conn: Connection, session: Session) -> None:
+        """Feed the client's audio to the session until it disconnects."""
+        async for message in conn.websocket:
+            if isinstance(message, (bytes, bytearray)):
+                self.bytes_received += len(message)
+                try:
+                    pcm = conn.protocol.receive(message)
+                except ProtocolError:
+                    continue
+                if pcm:
+                    conn.pipeline.audio_received()
+                    await session.stt.put_audio(pcm)
+            elif isinstance(message, str):
+                await self._handle_control(conn, session.id, message)
+
+    async def _wait_for_model(self) -> bool:
+        """Wait for the model load and the warm-up; report start-up timings."""
+        try:
+            await self.sessions.wait_ready()
+        except Exception as exc:
+            print(f"Error: could not load STT model: {exc}", file=sys.stderr)
+            return False
+        if self.sessions.load_seconds:
+            self.startup.add("stt_model", self.sessions.load_seconds)
+        if not self._warmed.is_set():
+            await self._warm_up()
+            self._warmed.set()
+        self.startup.mark("ready")
+        for name, seconds in self.startup.phases.items():
+            self.startup_seconds.labels(name).set(seconds)
+        print(f"Startup: {self.startup.report()}")
+        return True
+
+    async def _drain(self, server: Any, timeout: float) -> None:
+        """Stop accepting and give open connections ``timeout`` seconds to end."""
+        if timeout <= 0 or not self._connections:
+            return
+        # Closing only the listener leaves the open connections alone
+        server.server.close()
+        print(f"Draining {len(self._connections)} connection(s)")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._connections and loop.time() < deadline:
+            await asyncio.sleep(0.1)
+
+    async def run(
+        self,
+        sock: Optional[socket.socket] = None,
+        on_ready: Optional[Callable[[], None]] = None,
+        drain_timeout: float = 0.0,
+    ) -> None:
+        """Serve until cancelled.
+
+        ``sock`` is a bound socket to accept on instead of ``host:port``,
+        e.g. one of several sharing a port between worker processes.
+        ``on_ready`` is called once the model has loaded and the backends
+        are warm. On cancellation
+        the server stops accepting at once and lets open connections finish
+        for up to ``drain_timeout`` seconds before closing them.
+        """
+        # The model loads on a thread while the sockets bind
+        self.sessions.start_loading()
         log_task = asyncio.create_task(self._log_bytes())
         try:
-            async with websockets.serve(self._handler, self.host, self.port):
-                await asyncio.Future()  # run forever
+            bind_started = time.perf_counter()
+            if self.metrics_server is not None:
+                await self.metrics_server.start()
+            serve = (
+                websockets.serve(self._handler, self.host, self.port)
+                if sock is None
+                else websockets.serve(self._handler, sock=sock)
+            )
+            async with serve as server:
+                self.startup.add("bind", time.perf_counter() - bind_started)
+                self.startup.mark("listening")
+                if await self._wait_for_model():
+                    if on_ready is not None:
+                        on_ready()
+                    try:
+                        await asyncio.Future()  # run forever
+                    except asyncio.CancelledError:
+                        await self._drain(server, drain_timeout)
+                        raise
         finally:
             log_task.cancel()
             with contextlib.suppress(asyncio.CancelledError):
                 await log_task
-            if self._log_file:
-                self._log_file.close()
+            if self.metrics_server is not None:
+                await self.metrics_server.close()
+            await self.sessions.close_all()
+            self.sessions.shutdown()
+            close_tts = getattr(self.tts, "close", None)
+            if close_tts is not None:
+                await close_tts()
+            for log in (self.transcript_log, self.latency_log):
+                if log is not None:
+                    await log.close()
+
+
+def _server_options(cfg: BackendConfig) -> Dict[str, Any]:
+    """Return the :class:`AudioWebSocketServer` keyword arguments set by ``cfg``."""
+    return dict(
+        host=cfg.server.host,
+        port=cfg.server.port,
+        transcript_log=cfg.server.transcript_log,
+        max_sessions=cfg.server.max_sessions,
+        stt_config=cfg.stt,
+        turn_policy=cfg.server.turn_policy,
+        max_pending_turns=cfg.server.max_pending_turns,
+        barge_in=cfg.server.barge_in,
+        transcript_log_max_mb=cfg.server.transcript_log_max_mb,
+        transcript_log_daily=cfg.server.transcript_log_daily,
+        latency_log=cfg.server.latency_log,
+        metrics_port=cfg.server.metrics_port,
+        metrics_socket=cfg.server.metrics_socket,
+        partial_policy=PartialPolicy(
+            max_rate=cfg.server.partial_max_rate, delta=cfg.server.partial_delta
+        ),
+        audio_chunk_ms=cfg.server.audio_chunk_ms,
+        tts_max_concurrent=cfg.tts.max_concurrent,
+        tts_deadline_ms=cfg.tts.deadline_ms,
+        tts_warmup=cfg.tts.warmup,
+        tts_preload=cfg.tts.preload,
+    )
+
+
+def _run_workers(cfg: BackendConfig, startup: StartupTimer) -> None:
+    """Serve with ``cfg.server.workers`` processes sharing one port."""
+    from .workers import WorkerSupervisor, worker_log_path
+
+    try:
+        # Loaded once before forking so every worker shares its pages
+        with startup.phase("stt_model"):
+            model = load_model(cfg.stt.model_path)
+    except RuntimeError as exc:  # Missing optional dependency
+        print(f"Error: {exc}", file=sys.stderr)
+        return
+
+    def build(index: int, metrics_socket: Optional[str]) -> AudioWebSocketServer:
+        # Agents and TTS engines may hold threads or GPU state that does not
+        # survive a fork, so each worker creates its own
+        options = _server_options(cfg)
+        options.update(
+            transcript_log=worker_log_path(cfg.server.transcript_log, index),
+            latency_log=worker_log_path(cfg.server.latency_log, index),
+            metrics_port=0,
+            metrics_socket=metrics_socket,
+        )
+        return AudioWebSocketServer(
+            cfg.stt.model_path,
+            agent=create_agent(cfg.agent),
+            tts=create_tts(cfg.tts),
+            startup=startup,
+            model=model,
+            **options,
+        )
+
+    supervisor = WorkerSupervisor(
+        build,
+        cfg.server.workers,
+        host=cfg.server.host,
+        port=cfg.server.port,
+        metrics_port=cfg.server.metrics_port,
+        metrics_socket=cfg.server.metrics_socket,
+        drain_timeout=cfg.server.drain_timeout,
+    )
+    print(
+        f"Listening on ws://{cfg.server.host}:{cfg.server.port}"
+        f" with {cfg.server.workers} workers"
+    )
+    asyncio.run(supervisor.run())
+    print("Server stopped")
 
 
 def main(argv: Optional[Iterable[str]] = None) -> None:
     """CLI entry point to start the WebSocket server."""
     import argparse
-    import sys
 
+    startup = StartupTimer(_import_started)
+    startup.add("imports", _import_seconds)
     parser = argparse.ArgumentParser(description="Run the audio WebSocket server")
     parser.add_argument("model", nargs="?", help="Path to Vosk model")
     parser.add_argument("--host", help="Host to bind")
@@ -144,9 +683,11 @@ def main(argv: Optional[Iterable[str]] = None) -> None:
         help="File to write final transcripts",
     )
     parser.add_argument("--config", help="Path to JSON config file")
+    parser.add_argument("--workers", type=int, help="Number of server processes")
     args = parser.parse_args(list(argv) if argv is not None else None)
 
-    cfg = load_config(args.config)
+    with startup.phase("config"):
+        cfg = load_config(args.config)
     if args.model:
         cfg.stt.model_path = args.model
     if args.host:
@@ -155,15 +696,23 @@ def main(argv: Optional[Iterable[str]] = None) -> None:
         cfg.server.port = args.port
     if args.transcript_log:
         cfg.server.transcript_log = args.transcript_log
+    if args.workers:
+        cfg.server.workers = args.workers
+    if cfg.server.workers > 1:
+        _run_workers(cfg, startup)
+        return
 
     try:
+        with startup.phase("agent"):
+            agent = create_agent(cfg.agent)
+        with startup.phase("tts"):
+            tts = create_tts(cfg.tts)
         server = AudioWebSocketServer(
             cfg.stt.model_path,
-            host=cfg.server.host,
-            port=cfg.server.port,
-            transcript_log=cfg.server.transcript_log,
-            agent=create_agent(cfg.agent),
-            tts=create_tts(cfg.tts),
+            agent=agent,
+            tts=tts,
+            startup=startup,
+            **_server_options(cfg),
         )
     except RuntimeError as exc:  # Missing optional dependency
         print(f"Error: {exc}", file=sys.stderr)
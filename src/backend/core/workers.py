@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import gc
+import itertools
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .metrics import MetricsRegistry, MetricsServer
+
+# Linux spreads connections evenly over sockets sharing a port; elsewhere
+# SO_REUSEPORT either does not exist or hands every connection to one socket
+REUSE_PORT = hasattr(socket, "SO_REUSEPORT") and sys.platform.startswith("linux")
+
+
+def listen_socket(
+    host: str, port: int, reuse_port: bool = REUSE_PORT, listen: bool = True
+) -> socket.socket:
+    """Return a non-blocking TCP socket bound to ``host:port``.
+
+    With ``reuse_port`` other processes can bind the same port and the kernel
+    balances new connections across all the listening sockets. A socket that
+    is bound but not listening holds the port without receiving connections.
+    """
+    infos = socket.getaddrinfo(
+        host, port, type=socket.SOCK_STREAM, flags=socket.AI_PASSIVE
+    )
+    # Prefer IPv4 so "localhost" means what clients usually expect
+    family, kind, proto, _, address = min(infos, key=lambda i: i[0] != socket.AF_INET)
+    sock = socket.socket(family, kind, proto)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(address)
+        if listen:
+            sock.listen(1024)
+        sock.setblocking(False)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def worker_log_path(path: Optional[str], index: int) -> Optional[str]:
+    """Return the log file of worker ``index``: ``transcript.log`` → ``transcript-1.log``."""
+    if not path:
+        return path
+    p = Path(path)
+    return str(p.with_name(f"{p.stem}-{index}{p.suffix}"))
+
+
+def _add_label(sample: str, label: str) -> str:
+    name, _, value = sample.rpartition(" ")
+    if name.endswith("}"):
+        return f"{name[:-1]},{label}}} {value}"
+    return f"{name}{{{label}}} {value}"
+
+
+def aggregate_metrics(texts: Dict[str, str]) -> str:
+    """Merge the Prometheus text of several workers into one exposition.
+
+    Every sample gains a ``worker`` label and the samples of each metric are
+    grouped under a single ``HELP``/``TYPE`` header, as the format requires.
+    """
+    families: Dict[str, Tuple[List[str], List[str]]] = {}
+    for worker, text in texts.items():
+        header: List[str] = []
+        samples: List[str] = []
+        for line in text.splitlines():
+            if line.startswith(("# HELP ", "# TYPE ")):
+                header, samples = families.setdefault(line.split()[2], ([], []))
+                if line not in header:
+                    header.append(line)
+            elif line and not line.startswith("#"):
+                samples.append(_add_label(line, f'worker="{worker}"'))
+    lines = [line for header, samples in families.values() for line in header + samples]
+    return "\n".join(lines) + "\n"
+
+
+async def fetch_metrics(path: str, timeout: float = 2.0) -> str:
+    """Scrape the :class:`MetricsServer` listening on Unix socket ``path``."""
+    reader, writer = await asyncio.wait_for(asyncio.open_unix_connection(path), timeout)
+    try:
+        writer.write(b"GET /metrics HTTP/1.0\r\n\r\n")
+        data = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    head, _, body = data.partition(b"\r\n\r\n")
+    if not head.startswith(b"HTTP/1.0 200"):
+        raise ConnectionError(f"Bad metrics response from {path}")
+    return body.decode()
+
+
+def _serve_worker(
+    build: Callable[[int, Optional[str]], Any],
+    index: int,
+    sock: Optional[socket.socket],
+    host: str,
+    port: int,
+    metrics_path: Optional[str],
+    ready: Any,
+    drain_timeout: float,
+) -> None:
+    """Entry point of a worker process, run right after the fork."""
+    # The supervisor's signal handling came along with the fork; undo it so
+    # signals sent to this worker are not reported to the supervisor's loop
+    signal.set_wakeup_fd(-1)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C goes to the supervisor
+    signal.signal(signal.SIGHUP, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if sock is None:
+        sock = listen_socket(host, port, reuse_port=True)
+
+    async def serve() -> None:
+        server = build(index, metrics_path)
+        task = asyncio.current_task()
+        assert task is not None
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+        await server.run(sock=sock, on_ready=ready.set, drain_timeout=drain_timeout)
+
+    with contextlib.suppress(asyncio.CancelledError):
+        asyncio.run(serve())
+
+
+@dataclass
+class Worker:
+    """One forked server process."""
+
+    index: int
+    process: Any
+    ready: Any
+    metrics_path: Optional[str] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+
+class WorkerStartError(RuntimeError):
+    """Raised when a worker process exits before it is ready."""
+
+
+class WorkerSupervisor:
+    """Run ``workers`` forked copies of the server on one port.
+
+    ``build(index, metrics_socket)`` creates a worker's
+    :class:`~src.backend.core.websocket_server.AudioWebSocketServer`; it runs
+    in the worker process, after the fork, so anything it creates is private
+    to that worker while anything loaded beforehand (the Vosk model) is
+    shared copy-on-write. On Linux every worker listens on its own
+    ``SO_REUSEPORT`` socket and the kernel spreads connections evenly;
+    elsewhere the workers accept from one inherited socket.
+
+    Workers that die are replaced. A replacement that dies again before it
+    is ready is retried after ``restart_backoff`` seconds, doubling up to
+    ``max_restart_backoff``, while the other workers keep serving; only the
+    initial start-up fails fast. SIGHUP (or :meth:`restart`) replaces them
+    one at a time: the new worker is ready before the old one stops
+    accepting, and the old one gets ``drain_timeout`` seconds to finish its
+    conversations. With ``metrics_port`` or ``metrics_socket`` the
+    supervisor serves every worker's metrics, labelled by ``worker``, along
+    with its own ``workers_alive`` and ``worker_restarts_total``.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[int, Optional[str]], Any],
+        workers: int,
+        host: str = "localhost",
+        port: int = 8000,
+        metrics_port: int = 0,
+        metrics_socket: Optional[str] = None,
+        drain_timeout: float = 10.0,
+        reuse_port: bool = REUSE_PORT,
+        ready_timeout: float = 120.0,
+        restart_backoff: float = 1.0,
+        max_restart_backoff: float = 30.0,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.build = build
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.drain_timeout = drain_timeout
+        self.reuse_port = reuse_port
+        self.ready_timeout = ready_timeout
+        self.restart_backoff = restart_backoff
+        self.max_restart_backoff = max_restart_backoff
+        self.slots: Dict[int, Worker] = {}
+        self.metrics = MetricsRegistry()
+        self.metrics.gauge("workers_alive", "Worker processes running").set_function(
+            lambda: sum(1 for w in self.slots.values() if w.alive)
+        )
+        self.restarts = self.metrics.counter(
+            "worker_restarts_total", "Worker processes replaced", ["reason"]
+        )
+        self.metrics_server = (
+            MetricsServer(self, host, metrics_port, metrics_socket)
+            if metrics_port or metrics_socket
+            else None
+        )
+        self._context = multiprocessing.get_context("fork")
+        self._socket: Optional[socket.socket] = None
+        self._metrics_dir: Optional[str] = None
+        self._generation = itertools.count()
+        self._restart_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        # Per slot: replacements that failed in a row, and when to try again
+        self._failures: Dict[int, int] = {}
+        self._retry_at: Dict[int, float] = {}
+
+    def _spawn(self, index: int) -> Worker:
+        metrics_path = (
+            os.path.join(self._metrics_dir, f"worker{index}-{next(self._generation)}.sock")
+            if self._metrics_dir
+            else None
+        )
+        ready = self._context.Event()
+        sock = None if self.reuse_port else self._socket
+        process = self._context.Process(
+            target=_serve_worker,
+            args=(
+                self.build, index, sock, self.host, self.port,
+                metrics_path, ready, self.drain_timeout,
+            ),
+            name=f"server-worker-{index}",
+        )
+        process.start()
+        return Worker(index, process, ready, metrics_path)
+
+    async def _wait_ready(self, worker: Worker) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.ready_timeout
+        while not worker.ready.is_set():
+            if not worker.alive:
+                raise WorkerStartError(
+                    f"Worker {worker.index} exited during start-up"
+                    f" (exit code {worker.process.exitcode})"
+                )
+            if loop.time() > deadline:
+                await self._stop(worker)
+                raise WorkerStartError(f"Worker {worker.index} did not become ready")
+            await asyncio.sleep(0.05)
+
+    async def _stop(self, worker: Worker) -> None:
+        """SIGTERM ``worker`` and wait for it to drain, killing it if it hangs."""
+        if worker.alive:
+            worker.process.terminate()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.drain_timeout + 5
+        while worker.alive:
+            if loop.time() > deadline:
+                worker.process.kill()
+            await asyncio.sleep(0.05)
+        worker.process.join()
+
+    async def _replace_dead(self) -> None:
+        loop = asyncio.get_running_loop()
+        for index, worker in list(self.slots.items()):
+            if worker.alive or self._stopping or loop.time() < self._retry_at.get(index, 0):
+                continue
+            print(
+                f"Worker {index} exited with code {worker.process.exitcode}; restarting",
+                file=sys.stderr,
+            )
+            worker.process.join()
+            self.slots[index] = new = self._spawn(index)
+            self.restarts.labels("exit").inc()
+            try:
+                await self._wait_ready(new)
+            except WorkerStartError as exc:
+                failures = self._failures[index] = self._failures.get(index, 0) + 1
+                delay = min(
+                    self.restart_backoff * 2 ** (failures - 1), self.max_restart_backoff
+                )
+                print(f"{exc}; retrying in {delay:g} s", file=sys.stderr)
+                self._retry_at[index] = loop.time() + delay
+            else:
+                self._failures.pop(index, None)
+                self._retry_at.pop(index, None)
+
+    async def restart(self) -> None:
+        """Replace the workers one by one without refusing connections."""
+        for index in list(self.slots):
+            new = self._spawn(index)
+            try:
+                await self._wait_ready(new)
+            except WorkerStartError as exc:
+                # Keep the old workers rather than serve with fewer
+                print(f"Restart abandoned: {exc}", file=sys.stderr)
+                await self._stop(new)
+                return
+            old, self.slots[index] = self.slots[index], new
+            self.restarts.labels("restart").inc()
+            await self._stop(old)
+        print(f"Restarted {len(self.slots)} workers")
+
+    def request_restart(self) -> None:
+        if self._restart_task is None or self._restart_task.done():
+            self._restart_task = asyncio.create_task(self.restart())
+
+    async def render(self) -> str:
+        """Return the supervisor's metrics followed by every worker's."""
+        workers = [w for w in self.slots.values() if w.metrics_path]
+        texts = await asyncio.gather(
+            *(fetch_metrics(w.metrics_path) for w in workers), return_exceptions=True
+        )
+        merged = {
+            str(w.index): text for w, text in zip(workers, texts) if isinstance(text, str)
+        }
+        return self.metrics.render() + aggregate_metrics(merged)
+
+    async def run(self) -> None:
+        """Start the workers and supervise them until SIGINT or SIGTERM."""
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        loop.add_signal_handler(signal.SIGHUP, self.request_restart)
+        # With SO_REUSEPORT this only reserves the port (resolving port 0);
+        # the workers accept on sockets of their own
+        self._socket = listen_socket(
+            self.host, self.port, self.reuse_port, listen=not self.reuse_port
+        )
+        self.port = self._socket.getsockname()[1]
+        with tempfile.TemporaryDirectory(prefix="backend-workers-") as tmp:
+            if self.metrics_server is not None:
+                self._metrics_dir = tmp
+                await self.metrics_server.start()
+            # Objects that exist now are never collected, so the collector
+            # does not touch (and un-share) their pages in the workers
+            gc.freeze()
+            try:
+                for index in range(self.workers):
+                    self.slots[index] = self._spawn(index)
+                await asyncio.gather(*(self._wait_ready(w) for w in self.slots.values()))
+                print(f"{self.workers} workers ready on port {self.port}")
+                while not stop.is_set():
+                    await self._replace_dead()
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(stop.wait(), 0.5)
+            finally:
+                self._stopping = True
+                if self._restart_task is not None:
+                    self._restart_task.cancel()
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await self._restart_task
+                await asyncio.gather(*(self._stop(w) for w in self.slots.values()))
+                if self.metrics_server is not None:
+                    await self.metrics_server.close()
+                self._socket.close()
+                gc.unfreeze()
+                for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+                    loop.remove_signal_handler(sig)
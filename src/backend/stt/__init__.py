@@ -1,6 +1,16 @@
 """Speech-to-text streaming utilities."""
 
-from .streaming import Transcript, VoskStream
+from .decoder import DecodePool
+from .ingest import AudioIngestBuffer
+from .streaming import Transcript, VoskStream, load_model
+from .vad import VoiceActivityDetector
 
-__all__ = ["Transcript", "VoskStream"]
+__all__ = [
+    "AudioIngestBuffer",
+    "DecodePool",
+    "Transcript",
+    "VoiceActivityDetector",
+    "VoskStream",
+    "load_model",
+]
 
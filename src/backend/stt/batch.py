@@ -0,0 +1,324 @@
+"""Transcribe recorded audio offline, e.g. an archive of calls for QA.
+
+Files are spread over worker processes that each load the model once, and
+every result is appended to a JSONL file as soon as it is ready::
+
+    python -m src.backend.stt.batch calls/ --output calls.jsonl --processes 4
+
+Running the same command again skips the files the output already has a
+result for, so an interrupted job picks up where it stopped.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import wave
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .streaming import load_model
+
+try:
+    import vosk  # type: ignore
+except ImportError:  # pragma: no cover - optional dependencies may be missing
+    vosk = None
+
+#: Files picked up when a directory is given; other suffixes are ignored.
+AUDIO_SUFFIXES = (".wav", ".pcm", ".raw")
+
+
+def find_audio(paths: Iterable[str]) -> List[str]:
+    """Expand ``paths`` into audio files, searching directories recursively.
+
+    Files named explicitly are kept whatever their suffix.
+    """
+    files: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            found = (
+                str(p)
+                for p in Path(path).rglob("*")
+                if p.suffix.lower() in AUDIO_SUFFIXES and p.is_file()
+            )
+            files.extend(sorted(found))
+        else:
+            files.append(path)
+    return files
+
+
+@contextlib.contextmanager
+def open_audio(path: str, samplerate: int) -> Iterator[Tuple[int, Callable[[int], bytes]]]:
+    """Yield the sample rate of ``path`` and a function reading ``n`` samples.
+
+    WAV files must hold 16-bit mono audio; anything else is read as raw
+    16-bit mono PCM at ``samplerate``.
+    """
+    if path.lower().endswith(".wav"):
+        with wave.open(path, "rb") as wf:
+            if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+                raise ValueError(
+                    f"expected 16-bit mono audio, got {wf.getnchannels()} channel(s)"
+                    f" of {8 * wf.getsampwidth()}-bit samples"
+                )
+            yield wf.getframerate(), wf.readframes
+    else:
+        with open(path, "rb") as fh:
+            yield samplerate, lambda n: fh.read(2 * n)
+
+
+class FileTranscriber:
+    """Transcribe whole files with one loaded model.
+
+    Audio is read and decoded ``chunk_ms`` at a time. Large chunks mean
+    fewer calls into the recognizer; there is no live partial to keep
+    fresh. ``recognizer_factory`` builds a recognizer from the sample rate
+    instead of Vosk, as for :class:`~.streaming.VoskStream`.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        samplerate: int = 16000,
+        chunk_ms: int = 2000,
+        recognizer_factory: Optional[Callable[[int], Any]] = None,
+    ) -> None:
+        self.samplerate = samplerate
+        self.chunk_ms = chunk_ms
+        self.recognizer_factory = recognizer_factory
+        self.model = None if recognizer_factory else load_model(model_path)
+
+    def _recognizer(self, samplerate: int) -> Any:
+        if self.recognizer_factory is not None:
+            rec = self.recognizer_factory(samplerate)
+        else:
+            # Vosk resamples files that do not match the model's rate
+            rec = vosk.KaldiRecognizer(self.model, samplerate)
+        set_words = getattr(rec, "SetWords", None)
+        if set_words is not None:
+            set_words(True)
+        return rec
+
+    def transcribe(self, path: str) -> Dict[str, Any]:
+        """Return the result record for ``path``, or one with an ``error``."""
+        start = time.perf_counter()
+        texts: List[str] = []
+        words: List[Dict[str, Any]] = []
+        samples = 0
+
+        def collect(raw: str) -> None:
+            result = json.loads(raw)
+            if result.get("text"):
+                texts.append(result["text"])
+            words.extend(result.get("result", ()))
+
+        try:
+            with open_audio(path, self.samplerate) as (rate, read):
+                rec = self._recognizer(rate)
+                step = max(1, rate * self.chunk_ms // 1000)
+                while chunk := read(step):
+                    samples += len(chunk) // 2
+                    if rec.AcceptWaveform(chunk):
+                        collect(rec.Result())
+                collect(rec.FinalResult())
+        except (OSError, EOFError, ValueError, wave.Error) as exc:
+            return {"file": path, "error": f"{type(exc).__name__}: {exc}"}
+        elapsed = time.perf_counter() - start
+        duration = samples / rate
+        return {
+            "file": path,
+            "text": " ".join(texts),
+            "words": words,
+            "duration": round(duration, 3),
+            "decode_seconds": round(elapsed, 3),
+            "rtf": round(elapsed / duration, 4) if duration else 0.0,
+        }
+
+
+# Set in each worker process by _init_worker
+_transcriber: Optional[FileTranscriber] = None
+
+
+def _init_worker(*args: Any) -> None:
+    global _transcriber
+    _transcriber = FileTranscriber(*args)
+
+
+def _transcribe(path: str) -> Dict[str, Any]:
+    assert _transcriber is not None
+    return _transcriber.transcribe(path)
+
+
+def completed(output: str) -> Set[str]:
+    """Return the files ``output`` already holds a result for.
+
+    Files that failed are left out so they are tried again, as is a last
+    line cut short by an interruption or any line that is not a record.
+    """
+    done: Set[str] = set()
+    try:
+        with open(output, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if (
+                    isinstance(record, dict)
+                    and isinstance(record.get("file"), str)
+                    and "error" not in record
+                ):
+                    done.add(record["file"])
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def _ends_mid_line(path: str) -> bool:
+    """Whether an interrupted run left half a line at the end of ``path``."""
+    with open(path, "rb") as fh:
+        if fh.seek(0, os.SEEK_END) == 0:
+            return False
+        fh.seek(-1, os.SEEK_END)
+        return fh.read(1) != b"\n"
+
+
+def transcribe_files(
+    files: List[str],
+    output: str,
+    model_path: str,
+    samplerate: int = 16000,
+    chunk_ms: int = 2000,
+    processes: int = 1,
+    recognizer_factory: Optional[Callable[[int], Any]] = None,
+) -> Dict[str, float]:
+    """Append a JSONL record per file in ``files`` to ``output``.
+
+    Files already in ``output`` are skipped. With ``processes`` 0 the files
+    are transcribed in this process, otherwise on a pool of that many
+    workers, each loading the model once; ``recognizer_factory`` must then
+    be picklable. A file whose worker fails or dies gets an error record,
+    so the next run tries it again. Returns totals for the run.
+    """
+    if recognizer_factory is None and vosk is None:
+        # Fail here rather than as a broken pool
+        raise RuntimeError("Vosk must be installed to transcribe files")
+    start = time.perf_counter()
+    done = completed(output)
+    unique = list(dict.fromkeys(files))
+    todo = [path for path in unique if path not in done]
+    # Longest first, so one big file does not finish alone at the end
+    todo.sort(key=lambda p: os.path.getsize(p) if os.path.isfile(p) else 0, reverse=True)
+    stats: Dict[str, float] = {
+        "files": 0,
+        "skipped": len(unique) - len(todo),
+        "failed": 0,
+        "audio_seconds": 0.0,
+        "decode_seconds": 0.0,
+    }
+    args = (model_path, samplerate, chunk_ms, recognizer_factory)
+
+    with open(output, "a", encoding="utf-8") as out:
+        if _ends_mid_line(output):
+            out.write("\n")
+
+        def write(record: Dict[str, Any]) -> None:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            if "error" in record:
+                stats["failed"] += 1
+                print(f"Error: {record['file']}: {record['error']}", file=sys.stderr)
+                return
+            stats["files"] += 1
+            stats["audio_seconds"] += record["duration"]
+            stats["decode_seconds"] += record["decode_seconds"]
+
+        if processes <= 0:
+            transcriber = FileTranscriber(*args)
+            for path in todo:
+                write(transcriber.transcribe(path))
+        elif todo:
+            executor = ProcessPoolExecutor(
+                min(processes, len(todo)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=args,
+            )
+            try:
+                futures: Dict[Future, str] = {
+                    executor.submit(_transcribe, path): path for path in todo
+                }
+                for future in as_completed(futures):
+                    try:
+                        record = future.result()
+                    except Exception as exc:  # Includes BrokenProcessPool
+                        record = {
+                            "file": futures[future],
+                            "error": f"{type(exc).__name__}: {exc}",
+                        }
+                    write(record)
+            finally:
+                executor.shutdown(cancel_futures=True)
+    stats["wall_seconds"] = time.perf_counter() - start
+    return stats
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    """CLI entry point; returns 1 if any file failed."""
+    import argparse
+
+    from ..config import load_config
+
+    parser = argparse.ArgumentParser(description="Transcribe WAV or PCM files to JSONL")
+    parser.add_argument("paths", nargs="+", help="Audio files or directories")
+    parser.add_argument("--output", "-o", required=True, help="JSONL file to append to")
+    parser.add_argument("--config", help="Path to JSON config file")
+    parser.add_argument("--model", help="Path to Vosk model")
+    parser.add_argument("--samplerate", type=int, help="Sample rate of raw PCM files")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (0: transcribe in this process)",
+    )
+    parser.add_argument(
+        "--chunk-ms", type=int, default=2000, help="Audio decoded per recognizer call"
+    )
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    cfg = load_config(args.config).stt
+    if args.model:
+        cfg.model_path = args.model
+    if args.samplerate:
+        cfg.samplerate = args.samplerate
+
+    files = find_audio(args.paths)
+    try:
+        stats = transcribe_files(
+            files,
+            args.output,
+            cfg.model_path,
+            samplerate=cfg.samplerate,
+            chunk_ms=args.chunk_ms,
+            processes=args.processes,
+        )
+    except RuntimeError as exc:  # Missing optional dependency
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    wall = stats["wall_seconds"]
+    print(
+        f"Transcribed {stats['files']} file(s), skipped {stats['skipped']},"
+        f" failed {stats['failed']}: {stats['audio_seconds']:.1f} s of audio"
+        f" in {wall:.1f} s ({stats['audio_seconds'] / wall if wall else 0:.1f}x real time)",
+        file=sys.stderr,
+    )
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - entry point
+    sys.exit(main())
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, TypeVar
+
+T = TypeVar("T")
+
+
+class DecodeWorker:
+    """A single decode thread.
+
+    Every call submitted to a worker runs on the same thread in submission
+    order, so a stream pinned to one worker never has its frames reordered.
+    """
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.streams = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"stt-decode-{index}"
+        )
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class DecodePool:
+    """Fixed pool of decode threads shared by all recognizer streams.
+
+    Kaldi decoding is CPU bound C++ that releases the GIL, so running it on
+    worker threads keeps the event loop free for WebSocket I/O. Streams are
+    pinned to the least busy worker when they are created.
+    """
+
+    def __init__(self, workers: int = 2) -> None:
+        if workers < 1:
+            raise ValueError("DecodePool needs at least one worker")
+        self.workers: List[DecodeWorker] = [DecodeWorker(i) for i in range(workers)]
+        self._lock = threading.Lock()
+
+    def acquire(self) -> DecodeWorker:
+        """Pin a new stream to the worker serving the fewest streams."""
+        with self._lock:
+            worker = min(self.workers, key=lambda w: w.streams)
+            worker.streams += 1
+            return worker
+
+    def release(self, worker: DecodeWorker) -> None:
+        with self._lock:
+            worker.streams = max(0, worker.streams - 1)
+
+    def shutdown(self) -> None:
+        for worker in self.workers:
+            worker.shutdown()
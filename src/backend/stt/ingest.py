@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Union
+
+from ..audio import ByteRing
+
+OVERFLOW_POLICIES = ("block", "drop_oldest")
+
+
+class AudioIngestBuffer:
+    """Bounded buffer of PCM frames waiting to be decoded.
+
+    Frames are appended by the WebSocket reader and taken by the decoder. When
+    more than ``max_bytes`` are waiting the ``overflow`` policy decides what
+    happens: ``"block"`` makes :meth:`put` wait for the decoder to catch up and
+    ``"drop_oldest"`` discards the oldest frames to make room.
+
+    If ``chunk_bytes`` is set, :meth:`get` coalesces small frames and only
+    returns once that many bytes are buffered or ``max_wait`` seconds have
+    passed since the oldest buffered frame arrived.
+
+    Frames are copied into a :class:`ByteRing` and :meth:`get` returns a
+    ``memoryview`` into it, which is only valid until the next :meth:`get`.
+    The consumer must be done with one chunk (or copy it) before asking for
+    the next.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 0,
+        overflow: str = "block",
+        chunk_bytes: int = 0,
+        max_wait: float = 0.0,
+    ) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.max_bytes = max_bytes
+        self.overflow = overflow
+        self.chunk_bytes = chunk_bytes
+        self.max_wait = max_wait
+        self.dropped_bytes = 0
+        self.frames_in = 0
+        self.chunks_out = 0
+        # Lengths of the frames waiting in the ring
+        self._frames: Deque[int] = deque()
+        self._ring = ByteRing(max_bytes or 65536)
+        self._first_at = 0.0
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+
+    @property
+    def depth(self) -> int:
+        """Number of bytes waiting to be decoded."""
+        return len(self._ring)
+
+    def _full(self, incoming: int) -> bool:
+        # A frame larger than the whole buffer is accepted when it is empty.
+        return self.max_bytes > 0 and self.depth > 0 and self.depth + incoming > self.max_bytes
+
+    def put_nowait(self, data: bytes) -> bool:
+        """Append ``data`` without waiting.
+
+        Returns ``False`` if the frame was dropped because the buffer is full
+        and the policy is ``"block"``.
+        """
+        if self._full(len(data)):
+            if self.overflow == "block":
+                self.dropped_bytes += len(data)
+                return False
+            while self._frames and self._full(len(data)):
+                old = self._frames.popleft()
+                self._ring.discard(old)
+                self.dropped_bytes += old
+        if not self._frames:
+            self._first_at = time.monotonic()
+        self._ring.write(data)
+        self._frames.append(len(data))
+        self.frames_in += 1
+        self._readable.set()
+        return True
+
+    async def put(self, data: bytes) -> None:
+        """Append ``data``, waiting for space under the ``"block"`` policy."""
+        while self.overflow == "block" and self._full(len(data)):
+            self._writable.clear()
+            await self._writable.wait()
+        self.put_nowait(data)
+
+    async def get(self) -> Union[memoryview, bytes]:
+        """Return the next frame, or all buffered audio when coalescing."""
+        while not self.depth:
+            self._readable.clear()
+            await self._readable.wait()
+        if self.chunk_bytes and self.depth < self.chunk_bytes:
+            deadline = self._first_at + self.max_wait
+            while self.depth < self.chunk_bytes:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._readable.clear()
+                try:
+                    await asyncio.wait_for(self._readable.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+        if not self.chunk_bytes:
+            size = self._frames.popleft()
+        else:
+            size = self.depth
+            self._frames.clear()
+        data = self._ring.read(size)
+        self.chunks_out += 1
+        self._writable.set()
+        return data
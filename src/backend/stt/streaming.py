@@ -2,16 +2,26 @@ from __future__ import annotations
 
 import asyncio
 import json
+import time
 from dataclasses import dataclass
-from typing import AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Dict, Optional, Union
+
+from .decoder import DecodePool
+from .ingest import AudioIngestBuffer
+from .vad import VoiceActivityDetector
 
 try:
     import vosk  # type: ignore
 except ImportError:  # pragma: no cover - optional dependencies may be missing
     vosk = None
 
+try:
+    from orjson import loads as json_loads  # type: ignore
+except ImportError:  # pragma: no cover - optional dependencies may be missing
+    json_loads = json.loads
+
 
-@dataclass
+@dataclass(slots=True)
 class Transcript:
     """Represents a chunk of transcribed text."""
 
@@ -19,38 +29,195 @@ class Transcript:
     is_final: bool = False
 
 
+def load_model(model_path: str) -> Any:
+    """Load a Vosk model from ``model_path``.
+
+    Models are large and immutable once loaded, so callers should load them
+    once and share the instance between recognizers.
+    """
+
+    if vosk is None:
+        raise RuntimeError("Vosk must be installed to use VoskStream")
+    return vosk.Model(model_path)
+
+
 class VoskStream:
     """Streaming STT implementation using the Vosk library.
 
     Audio frames are pushed from the UI via :meth:`feed_audio` and processed
     asynchronously by :meth:`stream` which yields partial and final transcripts.
+
+    Pass a preloaded ``model`` to share it between several streams; each stream
+    still gets its own recognizer and queue. Recognizer calls run off the event
+    loop, on a worker pinned from ``decoder`` or on the default executor when no
+    pool is given.
+
+    Incoming audio waits in a bounded :class:`AudioIngestBuffer` holding at most
+    ``max_buffer_ms`` of audio; ``overflow`` picks what happens when it is full.
+    With ``coalesce_ms`` set, small frames are merged into chunks of that length
+    before they reach the recognizer.
+
+    An optional ``vad`` drops non-speech audio before it is decoded and
+    finalizes the utterance via ``FinalResult`` when it detects an endpoint.
+
+    ``recognizer`` replaces the Vosk recognizer with any object offering the
+    same ``AcceptWaveform``/``Result``/``PartialResult``/``FinalResult``
+    methods, e.g. a scripted fake in benchmarks; Vosk is then not needed.
     """
 
-    def __init__(self, model_path: str, samplerate: int = 16000) -> None:
-        if vosk is None:
-            raise RuntimeError("Vosk must be installed to use VoskStream")
+    def __init__(
+        self,
+        model_path: str,
+        samplerate: int = 16000,
+        model: Optional[Any] = None,
+        decoder: Optional[DecodePool] = None,
+        max_buffer_ms: int = 5000,
+        overflow: str = "block",
+        coalesce_ms: int = 0,
+        vad: Optional[VoiceActivityDetector] = None,
+        recognizer: Optional[Any] = None,
+    ) -> None:
+        if recognizer is not None:
+            self.model = model
+            self.rec = recognizer
+        else:
+            if vosk is None:
+                raise RuntimeError("Vosk must be installed to use VoskStream")
+            self.model = model if model is not None else load_model(model_path)
+            self.rec = vosk.KaldiRecognizer(self.model, samplerate)
+        self.samplerate = samplerate
+        self.vad = vad
+        self.decode_seconds = 0.0
+        self.decoded_audio_seconds = 0.0
+        self.partials_skipped = 0
+        self._last_partial = ""
+        bytes_per_ms = samplerate * 2 // 1000
+        self.buffer = AudioIngestBuffer(
+            max_bytes=max_buffer_ms * bytes_per_ms,
+            overflow=overflow,
+            chunk_bytes=coalesce_ms * bytes_per_ms,
+            max_wait=coalesce_ms / 1000,
+        )
+        self._decoder = decoder
+        self._worker = decoder.acquire() if decoder is not None else None
 
-        self.model = vosk.Model(model_path)
-        self.rec = vosk.KaldiRecognizer(self.model, samplerate)
-        self.queue: asyncio.Queue[bytes] = asyncio.Queue()
+    def close(self) -> None:
+        """Release the decode worker this stream is pinned to."""
+        if self._decoder is not None and self._worker is not None:
+            self._decoder.release(self._worker)
+            self._worker = None
 
     def feed_audio(self, data: bytes) -> None:
-        """Push raw PCM audio into the recognizer."""
+        """Push raw PCM audio into the recognizer without waiting.
 
-        self.queue.put_nowait(data)
+        If the buffer is full under the ``"block"`` policy the frame is
+        dropped; use :meth:`put_audio` to wait for space instead.
+        """
+
+        self.buffer.put_nowait(data)
+
+    async def put_audio(self, data: bytes) -> None:
+        """Push raw PCM audio, waiting while the buffer is full."""
+
+        await self.buffer.put(data)
 
     async def stream(self) -> AsyncGenerator[Transcript, None]:
         """Yield transcripts as they become available."""
 
         while True:
-            data = await self.queue.get()
-            if self.rec.AcceptWaveform(data):
-                result = json.loads(self.rec.Result())
-                text = result.get("text", "")
-                if text:
-                    yield Transcript(text=text, is_final=True)
+            data = await self.buffer.get()
+            if self._worker is not None:
+                transcript = await self._worker.run(self._decode, data)
             else:
-                partial = json.loads(self.rec.PartialResult()).get("partial", "")
-                if partial:
-                    yield Transcript(text=partial, is_final=False)
+                transcript = await asyncio.to_thread(self._decode, data)
+            if transcript is not None:
+                yield transcript
+
+    async def warm_up(self, pcm: bytes) -> None:
+        """Decode ``pcm`` on this stream's worker and discard the result.
+
+        The audio skips the ingest buffer and the VAD, so it reaches the
+        recognizer even if it is silence. Meant for a throwaway stream
+        opened before serving; the decode counters are not updated.
+        """
+
+        def run() -> None:
+            step = self.samplerate // 10 * 2  # 100 ms
+            view = memoryview(pcm)
+            for start in range(0, len(view), step):
+                self.rec.AcceptWaveform(bytes(view[start : start + step]))
+            self.rec.FinalResult()
+
+        if self._worker is not None:
+            await self._worker.run(run)
+        else:
+            await asyncio.to_thread(run)
+
+    @property
+    def real_time_factor(self) -> float:
+        """Decode time per second of decoded audio."""
+        if not self.decoded_audio_seconds:
+            return 0.0
+        return self.decode_seconds / self.decoded_audio_seconds
+
+    @property
+    def cpu_saved_seconds(self) -> float:
+        """Estimated decode time saved by the VAD skipping silence."""
+        if self.vad is None:
+            return 0.0
+        return self.vad.skipped_seconds * self.real_time_factor
+
+    def stats(self) -> Dict[str, float]:
+        """Return counters describing this stream's ingest and decoding."""
+        vad = self.vad
+        return {
+            "ingest_depth_bytes": self.buffer.depth,
+            "ingest_dropped_bytes": self.buffer.dropped_bytes,
+            "decode_seconds": self.decode_seconds,
+            "decoded_audio_seconds": self.decoded_audio_seconds,
+            "vad_frames_total": vad.frames_total if vad else 0,
+            "vad_frames_skipped": vad.frames_skipped if vad else 0,
+            "vad_cpu_saved_seconds": self.cpu_saved_seconds,
+            "partials_skipped": self.partials_skipped,
+        }
+
+    def _decode(self, data: Union[memoryview, bytes]) -> Optional[Transcript]:
+        """Run the recognizer on ``data``. Called on a decode thread.
+
+        ``data`` is usually a view into the ingest ring; it is copied once,
+        into the ``bytes`` the recognizer's C API requires.
+        """
+
+        endpoint = False
+        if self.vad is not None:
+            data, endpoint = self.vad.process(data)
+        transcript = None
+        if data:
+            start = time.perf_counter()
+            transcript = self._accept(data)
+            self.decode_seconds += time.perf_counter() - start
+            self.decoded_audio_seconds += len(data) / (2 * self.samplerate)
+        if endpoint and (transcript is None or not transcript.is_final):
+            self._last_partial = ""
+            text = json_loads(self.rec.FinalResult()).get("text", "")
+            transcript = Transcript(text=text, is_final=True) if text else None
+        return transcript
 
+    def _accept(self, data: Union[memoryview, bytes]) -> Optional[Transcript]:
+        if self.rec.AcceptWaveform(bytes(data)):
+            self._last_partial = ""
+            text = json_loads(self.rec.Result()).get("text", "")
+            if text:
+                return Transcript(text=text, is_final=True)
+            return None
+        # The recognizer repeats its partial until it hears a new word; the
+        # raw JSON is compared so repeats are neither parsed nor emitted
+        raw = self.rec.PartialResult()
+        if raw == self._last_partial:
+            self.partials_skipped += 1
+            return None
+        self._last_partial = raw
+        partial = json_loads(raw).get("partial", "")
+        if partial:
+            return Transcript(text=partial, is_final=False)
+        return None
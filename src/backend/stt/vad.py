@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import math
+import operator
+import sys
+from array import array
+from collections import deque
+from typing import Deque, List, Tuple, Union
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover - optional dependencies may be missing
+    np = None
+
+_SIGN_BITS = bytes(i >> 7 for i in range(256))
+
+
+def frame_stats(pcm: bytes, frame_bytes: int) -> Tuple[List[float], List[float]]:
+    """Return the RMS level and zero-crossing rate of each frame in ``pcm``.
+
+    ``pcm`` holds 16-bit little-endian samples and its length must be a
+    multiple of ``frame_bytes``. RMS values are on the int16 scale (0-32767);
+    the zero-crossing rate is the fraction of adjacent sample pairs that
+    change sign. With numpy installed (optional) all frames are analysed in
+    one vectorized pass; otherwise the :mod:`array` module is used per
+    frame, on views of ``pcm`` rather than copies.
+    """
+    width = frame_bytes // 2
+    if not pcm or width < 2:
+        return [], []
+    if np is not None:
+        samples = np.frombuffer(pcm, dtype="<i2").reshape(-1, width)
+        as_float = samples.astype(np.float32)
+        rms = np.sqrt(np.einsum("ij,ij->i", as_float, as_float) / width)
+        signs = np.signbit(samples)
+        crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1)
+        return rms.tolist(), (crossings / (width - 1)).tolist()
+    all_samples = array("h")
+    all_samples.frombytes(pcm)
+    if sys.byteorder == "big":
+        all_samples.byteswap()
+    view = memoryview(all_samples)
+    # One byte per sample, 1 where it is negative: the high byte's top bit
+    signs = bytes(memoryview(pcm)[1::2]).translate(_SIGN_BITS)
+    levels: List[float] = []
+    rates: List[float] = []
+    for start in range(0, len(all_samples), width):
+        frame = view[start : start + width]
+        levels.append(math.sqrt(sum(map(operator.mul, frame, frame)) / width))
+        # Sign changes are 0→1 and 1→0 pairs, which never overlap
+        end = start + width
+        crossings = signs.count(b"\x00\x01", start, end) + signs.count(b"\x01\x00", start, end)
+        rates.append(crossings / (width - 1))
+    return levels, rates
+
+
+class VoiceActivityDetector:
+    """Energy and zero-crossing based voice activity detection.
+
+    Audio is analysed in ``frame_ms`` frames. A frame counts as speech when
+    its RMS level reaches ``threshold``, or half of it with a zero-crossing
+    rate of at least ``zcr_threshold`` (quiet fricatives such as "s" and
+    "f"). After speech stops, ``hangover_ms`` more audio is let through so
+    word endings are not clipped, and the ``preroll_ms`` of audio before
+    speech starts is replayed so onsets are not lost either.
+
+    The default threshold matches the UI's silence gate of 0.002 on the
+    -1..1 float scale, about 65 on the int16 scale.
+
+    Once ``endpoint_ms`` of silence follows speech, :meth:`process` reports an
+    endpoint so the caller can finalize the utterance without waiting for the
+    recognizer to see the silence itself.
+    """
+
+    def __init__(
+        self,
+        samplerate: int = 16000,
+        frame_ms: int = 20,
+        threshold: float = 65.0,
+        zcr_threshold: float = 0.25,
+        hangover_ms: int = 300,
+        preroll_ms: int = 200,
+        endpoint_ms: int = 700,
+    ) -> None:
+        self.samplerate = samplerate
+        self.frame_bytes = samplerate * frame_ms // 1000 * 2
+        self.threshold = threshold
+        self.zcr_threshold = zcr_threshold
+        self.hangover_frames = hangover_ms // frame_ms
+        self.endpoint_frames = endpoint_ms // frame_ms
+        self.frames_total = 0
+        self.frames_skipped = 0
+        self.endpoints = 0
+        self._preroll: Deque[Union[memoryview, bytes]] = deque(maxlen=preroll_ms // frame_ms)
+        self._remainder = b""
+        self._silent_frames = 0
+        self._in_speech = False
+
+    @property
+    def skipped_seconds(self) -> float:
+        """Seconds of audio withheld from the recognizer."""
+        return self.frames_skipped * self.frame_bytes / (2 * self.samplerate)
+
+    def speech_flags(self, pcm: bytes) -> List[bool]:
+        """Classify each frame of ``pcm`` as speech or not."""
+        levels, rates = frame_stats(pcm, self.frame_bytes)
+        half = self.threshold / 2
+        return [
+            rms >= self.threshold or (rms >= half and zcr >= self.zcr_threshold)
+            for rms, zcr in zip(levels, rates)
+        ]
+
+    def process(self, pcm: bytes) -> Tuple[Union[memoryview, bytes], bool]:
+        """Filter ``pcm`` down to the audio the recognizer should see.
+
+        Returns the audio to decode (possibly empty) and whether an endpoint
+        was reached. Audio that does not fill a whole frame is kept for the
+        next call. When every frame of ``pcm`` is passed on, the result is a
+        ``memoryview`` of ``pcm`` rather than a copy.
+        """
+        data = self._remainder + pcm if self._remainder else pcm
+        usable = len(data) - len(data) % self.frame_bytes
+        self._remainder = bytes(data[usable:])
+        view = memoryview(data)
+        out: List[Union[memoryview, bytes]] = []
+        endpoint = False
+        emitted = 0
+        replayed = False
+        flags = self.speech_flags(view[:usable])
+        for index, speech in enumerate(flags):
+            start = index * self.frame_bytes
+            frame = view[start : start + self.frame_bytes]
+            self.frames_total += 1
+            if speech:
+                if not self._in_speech and self._preroll:
+                    out.extend(self._preroll)
+                    self._preroll.clear()
+                    replayed = True
+                self._in_speech = True
+                self._silent_frames = 0
+                out.append(frame)
+                emitted += 1
+                continue
+            self._silent_frames += 1
+            if self._in_speech and self._silent_frames >= self.endpoint_frames:
+                self._in_speech = False
+                self.endpoints += 1
+                endpoint = True
+            if self._in_speech and self._silent_frames <= self.hangover_frames:
+                out.append(frame)
+                emitted += 1
+                continue
+            if len(self._preroll) == self._preroll.maxlen:
+                # The oldest pre-roll frame (or this one) is never decoded
+                self.frames_skipped += 1
+            self._preroll.append(frame)
+        if any(isinstance(f, memoryview) for f in self._preroll):
+            # Only the frames kept for the next call are copied out of ``pcm``
+            self._preroll = deque(map(bytes, self._preroll), maxlen=self._preroll.maxlen)
+        if flags and emitted == len(flags) and not replayed:
+            # Nothing was dropped or replayed: pass the input through
+            return view[:usable], endpoint
+        return b"".join(out), endpoint
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
 import abc
+from typing import AsyncIterator, Sequence
+
+from ..audio import wav_to_pcm
+from .text import split_sentences
 
 
 class TTS(abc.ABC):
     """Abstract text-to-speech interface."""
 
+    #: Sample rate of the PCM chunks yielded by :meth:`stream`.
+    sample_rate: int = 16000
+
     @abc.abstractmethod
     async def speak(self, text: str) -> bytes:
         """Generate speech audio for the given text.
@@ -14,3 +21,35 @@ class TTS(abc.ABC):
         stream it elsewhere.
         """
         raise NotImplementedError
+
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        """Yield speech for ``text`` as it is synthesized.
+
+        The text is split at sentence and clause boundaries and each piece is
+        synthesized on its own, so the first chunk is ready long before the
+        whole reply. Chunks are raw 16-bit mono PCM at :attr:`sample_rate`.
+        The default implementation calls :meth:`speak` once per sentence.
+        """
+        for sentence in split_sentences(text):
+            pcm, _ = wav_to_pcm(await self.speak(sentence))
+            if pcm:
+                yield pcm
+
+    def stream_sentence(self, sentence: str, first: bool = False) -> AsyncIterator[bytes]:
+        """Yield the audio for one sentence of a reply.
+
+        ``first`` marks the opening sentence, which backends that schedule
+        synthesis may put ahead of others. The default ignores it.
+        """
+        return self.stream(sentence)
+
+    async def warm_up(self, texts: Sequence[str]) -> None:
+        """Synthesize ``texts`` and discard the audio.
+
+        Run before serving so the first reply does not pay for cold model
+        caches, lazily started threads or processes. Backends with several
+        workers should warm each of them.
+        """
+        for text in texts:
+            async for _ in self.stream(text):
+                pass
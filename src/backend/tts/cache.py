@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import os
+import re
+import sys
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional, Sequence, Set
+
+from .base import TTS
+from .text import split_sentences
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and case so trivially different texts share audio."""
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+class CachedTTS(TTS):
+    """Cache the audio produced by another :class:`TTS` backend.
+
+    Entries are keyed on the normalized text plus the backend type, voice and
+    sample rate, so switching any of them never returns stale audio. A
+    memory LRU holds up to ``max_bytes`` of audio; if ``cache_dir`` is given
+    entries are also written there as content-addressed files and survive
+    restarts. Disk errors are counted and otherwise ignored: the audio is
+    still returned, it is just not persisted.
+
+    :meth:`stream` caches each sentence separately, so a short confirmation
+    at the start of an otherwise new reply still hits the cache.
+    """
+
+    def __init__(
+        self,
+        tts: TTS,
+        max_bytes: int = 32 * 1024 * 1024,
+        cache_dir: Optional[str] = None,
+    ) -> None:
+        self.tts = tts
+        self.max_bytes = max_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+        self.disk_errors = 0
+        self._writing: Set[str] = set()
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+
+    @property
+    def sample_rate(self) -> int:  # type: ignore[override]
+        return self.tts.sample_rate
+
+    @property
+    def size(self) -> int:
+        """Bytes of audio held in memory."""
+        return self._size
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "disk_errors": self.disk_errors,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._size,
+        }
+
+    def key(self, text: str, kind: str) -> str:
+        """Return the cache key for ``text`` rendered as ``kind`` audio."""
+        parts = [
+            kind,
+            getattr(self.tts, "engine", type(self.tts).__name__),
+            str(getattr(self.tts, "voice", "")),
+            str(self.sample_rate),
+            normalize_text(text),
+        ]
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return Path(self.cache_dir or ".") / key[:2] / key
+
+    def _remember(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = audio
+        self._size += len(audio)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self.evictions += 1
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as exc:
+            self._disk_error("read", exc)
+            return None
+
+    def _write_disk(self, key: str, audio: bytes) -> None:
+        path = self._path(key)
+        tmp_name = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # A unique name per write; other processes may share the directory
+            with tempfile.NamedTemporaryFile(
+                dir=path.parent, prefix=f"{path.name}.", suffix=".tmp", delete=False
+            ) as tmp:
+                tmp_name = tmp.name
+                tmp.write(audio)
+            os.replace(tmp_name, path)
+        except OSError as exc:
+            self._disk_error("write", exc)
+            if tmp_name is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp_name)
+
+    def _disk_error(self, action: str, exc: OSError) -> None:
+        self.disk_errors += 1
+        print(f"Warning: could not {action} TTS cache entry: {exc}", file=sys.stderr)
+
+    def cached(self, text: str) -> bool:
+        """Whether :meth:`stream` can serve ``text`` from memory alone."""
+        return all(
+            self.key(sentence, "pcm") in self._entries
+            for sentence in split_sentences(text)
+        )
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return cached audio for ``key``, counting the hit or miss."""
+        audio = self._entries.get(key)
+        if audio is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return audio
+        if self.cache_dir is not None:
+            audio = await asyncio.to_thread(self._read_disk, key)
+            if audio is not None:
+                self._remember(key, audio)
+                self.hits += 1
+                self.disk_hits += 1
+                return audio
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, audio: bytes) -> None:
+        self._remember(key, audio)
+        # Sessions missing on the same sentence at once write it only once
+        if self.cache_dir is None or key in self._writing:
+            return
+        self._writing.add(key)
+        try:
+            await asyncio.to_thread(self._write_disk, key, audio)
+        finally:
+            self._writing.discard(key)
+
+    async def speak(self, text: str) -> bytes:
+        key = self.key(text, "wav")
+        audio = await self.get(key)
+        if audio is None:
+            audio = await self.tts.speak(text)
+            if audio:
+                await self.put(key, audio)
+        return audio
+
+    async def warm_up(self, texts: Sequence[str]) -> None:
+        # Past the cache, or a warm cache would leave the engine cold
+        await self.tts.warm_up(texts)
+
+    async def preload(self, texts: Sequence[str]) -> None:
+        """Put the audio of ``texts`` in memory, synthesizing what is not on disk."""
+        for text in texts:
+            async for _ in self.stream(text):
+                pass
+
+    async def close(self) -> None:
+        close = getattr(self.tts, "close", None)
+        if close is not None:
+            await close()
+
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        for sentence in split_sentences(text):
+            key = self.key(sentence, "pcm")
+            audio = await self.get(key)
+            if audio is not None:
+                yield audio
+                continue
+            chunks = []
+            async for pcm in self.tts.stream(sentence):
+                chunks.append(pcm)
+                yield pcm
+            if chunks:
+                await self.put(key, b"".join(chunks))
@@ -1,38 +1,54 @@
 from __future__ import annotations
 
 import asyncio
-import subprocess
+import contextlib
+import os
 import shutil
 import tempfile
-from pathlib import Path
 
-from .base import TTS
+from .worker import CommandTTS
 
+# ``say`` writes audio files through AudioFile, which needs a seekable file,
+# so it renders to a WAV named after the wrapper's PID that is then streamed
+# to stdout
+_SAY_TO_STDOUT = (
+    'out="$2/$$.wav"; '
+    'say -v "$1" -f - -o "$out" --file-format=WAVE --data-format=LEI16@16000 '
+    '&& exec cat "$out"'
+)
 
-class MacSayTTS(TTS):
-    """TTS using the macOS ``say`` command."""
 
-    def __init__(self, voice: str = "Samantha") -> None:
+class MacSayTTS(CommandTTS):
+    """TTS using the macOS ``say`` command.
+
+    Unlike the other command line engines, ``say`` cannot write audio to a
+    pipe, so this still goes through a temporary file: a small shell wrapper
+    has ``say`` render a 16 kHz WAV into a directory owned by this object
+    and copies it to stdout. Each file is removed once its process has
+    exited, and the directory on :meth:`close`. The wrapper has only been
+    tested with a stand-in for ``say``, not on macOS itself.
+
+    The processes are started ahead of time and consumed through a pool (see
+    :class:`~.worker.SynthesisWorkerPool`).
+    """
+
+    def __init__(
+        self, voice: str = "Samantha", warm: int = 1, max_concurrency: int = 2
+    ) -> None:
         if shutil.which("say") is None:
             raise RuntimeError("'say' command not found")
         self.voice = voice
+        self.tmpdir = tempfile.mkdtemp(prefix="macsay-")
+        argv = ["/bin/sh", "-c", _SAY_TO_STDOUT, "say", voice, self.tmpdir]
+        super().__init__(argv, 16000, warm=warm, max_concurrency=max_concurrency)
+        # The directory differs per run, so the argv cannot key the cache
+        self.engine = f"{type(self).__name__}:{voice}"
+        self.pool.cleanup = self._remove_output
+
+    def _remove_output(self, proc: asyncio.subprocess.Process) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(os.path.join(self.tmpdir, f"{proc.pid}.wav"))
 
-    async def speak(self, text: str) -> bytes:
-        def _run() -> bytes:
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-                path = Path(tmp.name)
-            cmd = [
-                "say",
-                "-v",
-                self.voice,
-                text,
-                "-o",
-                str(path),
-                "--data-format=LEI16@16000",
-            ]
-            subprocess.run(cmd, check=True)
-            data = path.read_bytes()
-            path.unlink(missing_ok=True)
-            return data
-
-        return await asyncio.to_thread(_run)
+    async def close(self) -> None:
+        await super().close()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
@@ -2,13 +2,20 @@ from __future__ import annotations
 
 import asyncio
 from pathlib import Path
+from typing import Any, AsyncIterator, List
 
+from ..audio import wav_to_pcm
 from .base import TTS
+from .text import split_sentences
 
 
 class OrpheusStyleTTS(TTS):
     """TTS using the Orpheus 3B / StyleTTS 2 model."""
 
+    sample_rate = 24000
+    #: One model instance; concurrent syntheses only slow each other down
+    capacity = 1
+
     def __init__(self, model_path: str, device: str = "cpu", voice: str = "default") -> None:
         try:
             from orpheus_speech import Synthesizer  # type: ignore
@@ -16,6 +23,10 @@ class OrpheusStyleTTS(TTS):
             raise RuntimeError("orpheus-speech is required for OrpheusStyleTTS") from exc
 
         self._synth = Synthesizer(str(Path(model_path)), device=device, voice=voice)
+        self.voice = voice
+        sample_rate = getattr(self._synth, "sample_rate", None)
+        if isinstance(sample_rate, int):
+            self.sample_rate = sample_rate
 
     async def speak(self, text: str) -> bytes:
         def _run() -> bytes:
@@ -25,3 +36,37 @@ class OrpheusStyleTTS(TTS):
             return getattr(wav, "tobytes", lambda: bytes())()
 
         return await asyncio.to_thread(_run)
+
+    @property
+    def batching(self) -> bool:
+        """Whether the synthesizer can render several texts in one call."""
+        return callable(getattr(self._synth, "tts_batch", None))
+
+    def synthesize_batch(self, texts: List[str]) -> List[bytes]:
+        """Return each of ``texts`` as 16-bit PCM, in one call if the engine batches."""
+        if self.batching:
+            return [self._to_pcm(wav) for wav in self._synth.tts_batch(texts)]
+        return [self._synth_pcm(text) for text in texts]
+
+    def _synth_pcm(self, text: str) -> bytes:
+        """Synthesize ``text`` and return it as 16-bit PCM."""
+        return self._to_pcm(self._synth.tts(text))
+
+    @staticmethod
+    def _to_pcm(wav: Any) -> bytes:
+        if isinstance(wav, bytes):
+            return wav_to_pcm(wav)[0] if wav[:4] == b"RIFF" else wav
+        dtype = getattr(wav, "dtype", None)
+        if dtype is not None and dtype.kind == "f":
+            wav = (wav.clip(-1.0, 1.0) * 32767).astype("<i2")
+        try:
+            # Hand the array's own memory on instead of copying it
+            return memoryview(wav).cast("B")
+        except TypeError:
+            return getattr(wav, "tobytes", lambda: bytes())()
+
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        for sentence in split_sentences(text):
+            pcm = await asyncio.to_thread(self._synth_pcm, sentence)
+            if pcm:
+                yield pcm
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import itertools
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional, Union
+
+from .base import TTS
+
+
+def default_concurrency(tts: TTS) -> int:
+    """Return how many syntheses ``tts`` can usefully run at once, 0 if unknown.
+
+    Backends limited by a model or a pool report it as ``capacity``;
+    wrappers such as :class:`~.cache.CachedTTS` are looked through via
+    ``tts``.
+    """
+    while tts is not None:
+        capacity = getattr(tts, "capacity", None)
+        if capacity:
+            return capacity
+        tts = getattr(tts, "tts", None)
+    return 0
+
+
+class JobExpired(Exception):
+    """Raised when a job waited longer than the scheduler's deadline."""
+
+
+@dataclass
+class _Job:
+    session: int
+    first: bool
+    queued: float
+    seq: int
+    future: asyncio.Future = field(repr=False)
+
+
+class TTSScheduler:
+    """Decide which session's sentence is synthesized next.
+
+    At most ``max_concurrent`` jobs (0 for no limit) run at once across all
+    sessions. When a slot frees up the waiting jobs are ranked by:
+
+    1. the first sentence of a reply before later ones, since it decides
+       how long the user waits for an answer,
+    2. the session with the fewest jobs running, then the one served least
+       recently, so one long reply cannot starve other sessions,
+    3. arrival order.
+
+    A job that waits more than ``deadline`` seconds (0 for no limit) is
+    dropped with :class:`JobExpired`. ``on_wait`` is called with the queue
+    wait of every job that gets a slot and whether it was a first sentence.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 2,
+        deadline: float = 0.0,
+        on_wait: Optional[Callable[[float, bool], None]] = None,
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self.deadline = deadline
+        self.on_wait = on_wait
+        self.running = 0
+        self.started = 0
+        self.dropped = 0
+        self.wait_seconds = 0.0
+        self._waiting: Dict[int, Deque[_Job]] = {}
+        self._running: Counter = Counter()
+        self._served: Dict[int, int] = {}
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(jobs) for jobs in self._waiting.values())
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "running": self.running,
+            "waiting": self.waiting,
+            "started": self.started,
+            "dropped": self.dropped,
+            "wait_seconds": self.wait_seconds,
+        }
+
+    def _free(self) -> bool:
+        return self.max_concurrent <= 0 or self.running < self.max_concurrent
+
+    def _rank(self, job: _Job) -> tuple:
+        return (
+            not job.first,
+            self._running[job.session],
+            self._served.get(job.session, -1),
+            job.seq,
+        )
+
+    def _start(self, job: _Job, now: float) -> None:
+        self.running += 1
+        self.started += 1
+        self._running[job.session] += 1
+        self._served[job.session] = job.seq
+        wait = now - job.queued
+        self.wait_seconds += wait
+        if self.on_wait is not None:
+            self.on_wait(wait, job.first)
+        job.future.set_result(None)
+
+    def _dispatch(self) -> None:
+        now = asyncio.get_running_loop().time()
+        while self._waiting and self._free():
+            heads = (jobs[0] for jobs in self._waiting.values())
+            job = min(heads, key=self._rank)
+            self._remove(job)
+            self._start(job, now)
+
+    def _remove(self, job: _Job) -> None:
+        jobs = self._waiting.get(job.session)
+        if jobs is None or job not in jobs:
+            return
+        jobs.remove(job)
+        if not jobs:
+            del self._waiting[job.session]
+
+    async def acquire(self, session: int, first: bool = False) -> None:
+        """Wait for a slot; pair every successful call with :meth:`release`."""
+        loop = asyncio.get_running_loop()
+        job = _Job(session, first, loop.time(), next(self._seq), loop.create_future())
+        if self._free() and not self._waiting:
+            self._start(job, job.queued)
+            return
+        self._waiting.setdefault(session, deque()).append(job)
+        try:
+            await asyncio.wait_for(asyncio.shield(job.future), self.deadline or None)
+        except asyncio.TimeoutError:
+            if job.future.done():
+                return  # Granted just as the deadline passed
+            self._remove(job)
+            self.dropped += 1
+            raise JobExpired(f"TTS job waited more than {self.deadline:.1f}s") from None
+        except asyncio.CancelledError:
+            if job.future.done():
+                self.release(session)
+            else:
+                self._remove(job)
+            raise
+
+    def release(self, session: int) -> None:
+        self.running -= 1
+        self._running[session] -= 1
+        if self._running[session] <= 0:
+            del self._running[session]
+        self._dispatch()
+
+    def forget(self, session: int) -> None:
+        """Drop the bookkeeping of a closed session."""
+        self._served.pop(session, None)
+
+    def session(self, tts: TTS, session: int) -> "SessionTTS":
+        return SessionTTS(tts, self, session)
+
+
+class SessionTTS(TTS):
+    """One session's view of ``tts`` with synthesis admitted by ``scheduler``.
+
+    Sentences already in the memory cache are returned without queueing.
+    The slot is held while the backend synthesizes, not while the caller
+    sends the audio on.
+    """
+
+    def __init__(self, tts: TTS, scheduler: TTSScheduler, session: int) -> None:
+        self.tts = tts
+        self.scheduler = scheduler
+        self.session = session
+
+    @property
+    def sample_rate(self) -> int:  # type: ignore[override]
+        return self.tts.sample_rate
+
+    def _cached(self, text: str) -> bool:
+        cached = getattr(self.tts, "cached", None)
+        return cached is not None and cached(text)
+
+    async def speak(self, text: str) -> bytes:
+        if self._cached(text):
+            return await self.tts.speak(text)
+        await self.scheduler.acquire(self.session, first=True)
+        try:
+            return await self.tts.speak(text)
+        finally:
+            self.scheduler.release(self.session)
+
+    def stream_sentence(self, sentence: str, first: bool = False) -> AsyncIterator[bytes]:
+        return self.stream(sentence, first)
+
+    async def stream(self, text: str, first: bool = False) -> AsyncIterator[bytes]:
+        """Yield the audio for ``text``; ``first`` marks the start of a reply.
+
+        Yields nothing if the job expired in the queue.
+        """
+        if self._cached(text):
+            async for pcm in self.tts.stream(text):
+                yield pcm
+            return
+        try:
+            await self.scheduler.acquire(self.session, first)
+        except JobExpired:
+            return
+        chunks: asyncio.Queue[Union[bytes, BaseException, None]] = asyncio.Queue()
+        held = True
+
+        def release(_: Any = None) -> None:
+            nonlocal held
+            if held:
+                held = False
+                self.scheduler.release(self.session)
+
+        async def produce() -> None:
+            try:
+                async for pcm in self.tts.stream(text):
+                    chunks.put_nowait(pcm)
+            except Exception as exc:
+                chunks.put_nowait(exc)
+            finally:
+                release()
+            chunks.put_nowait(None)
+
+        producer = asyncio.create_task(produce())
+        # In case the task is cancelled before it starts
+        producer.add_done_callback(release)
+        try:
+            while (item := await chunks.get()) is not None:
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            producer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await producer
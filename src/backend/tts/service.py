@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import multiprocessing
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..audio import wav_bytes
+from .base import TTS
+from .text import split_sentences
+
+
+def _serve(conn: Any, factory: Callable[[], Any]) -> None:
+    """Worker process: build the engine, then synthesize batches until closed."""
+    try:
+        engine = factory()
+    except Exception as exc:
+        conn.send({"error": f"{type(exc).__name__}: {exc}"})
+        return
+    conn.send(
+        {
+            "engine": type(engine).__name__,
+            "voice": str(getattr(engine, "voice", "")),
+            "sample_rate": engine.sample_rate,
+            "batching": bool(getattr(engine, "batching", False)),
+        }
+    )
+    while True:
+        try:
+            texts = conn.recv()
+        except EOFError:  # The server closed the pool
+            return
+        try:
+            # memoryviews cannot be pickled
+            conn.send((None, [bytes(pcm) for pcm in engine.synthesize_batch(texts)]))
+        except Exception as exc:
+            conn.send((f"{type(exc).__name__}: {exc}", None))
+
+
+@dataclass
+class _Request:
+    text: str
+    future: asyncio.Future
+    queued: float = field(default_factory=time.perf_counter)
+
+
+@dataclass
+class _Worker:
+    process: Any
+    conn: Any
+    batching: bool = False
+
+
+class ProcessPoolTTS(TTS):
+    """Synthesize speech in ``processes`` worker processes that own the model.
+
+    ``factory`` builds the engine inside each worker, so it must be picklable
+    (a module-level function or a ``functools.partial`` of one). The engine
+    needs a ``synthesize_batch(texts)`` method returning 16-bit PCM per text
+    and may set ``batching`` if one call for several texts is cheaper than
+    one call each.
+
+    Sentences from every session share one queue. An idle worker takes the
+    oldest; if its engine batches, it also takes up to ``max_batch - 1``
+    more that arrive within ``max_wait_ms``. Only the workers hold a model,
+    so memory does not grow with the number of concurrent replies, and
+    synthesis does not compete with the server for its GIL.
+
+    The constructor returns once every worker has loaded its engine. A
+    worker that dies is replaced and the sentences it held are sent to the
+    replacement; they fail only if that one dies too. If no replacement can
+    be started and no worker is left, queued and new sentences fail at once.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        processes: int = 1,
+        max_batch: int = 8,
+        max_wait_ms: float = 10.0,
+        start_method: str = "spawn",
+        start_timeout: float = 300.0,
+    ) -> None:
+        if processes < 1:
+            raise ValueError("processes must be at least 1")
+        self.factory = factory
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self.start_timeout = start_timeout
+        self.requests = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.queue_wait_seconds = 0.0
+        self.restarts = 0
+        self._context = multiprocessing.get_context(start_method)
+        self._workers: List[_Worker] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Start them all before waiting so the engines load in parallel
+        pending = [self._spawn() for _ in range(processes)]
+        try:
+            info = [self._handshake(worker) for worker in pending]
+        except Exception:
+            for worker in pending:
+                self._terminate(worker)
+            raise
+        self._workers = pending
+        self.engine = info[0]["engine"]
+        self.voice = info[0]["voice"]
+        self.sample_rate = info[0]["sample_rate"]
+
+    def _spawn(self) -> _Worker:
+        parent, child = self._context.Pipe()
+        process = self._context.Process(
+            target=_serve, args=(child, self.factory), name="tts-worker", daemon=True
+        )
+        process.start()
+        child.close()
+        return _Worker(process, parent)
+
+    def _handshake(self, worker: _Worker) -> Dict[str, Any]:
+        if not worker.conn.poll(self.start_timeout):
+            raise RuntimeError("TTS worker did not start in time")
+        try:
+            info = worker.conn.recv()
+        except EOFError:
+            raise RuntimeError(
+                f"TTS worker exited during start-up (exit code {worker.process.exitcode})"
+            ) from None
+        if "error" in info:
+            raise RuntimeError(f"TTS worker failed to start: {info['error']}")
+        worker.batching = info["batching"]
+        return info
+
+    def _terminate(self, worker: _Worker, grace: float = 1.0) -> None:
+        # Closing the pipe tells an idle worker to exit
+        with contextlib.suppress(OSError):
+            worker.conn.close()
+        worker.process.join(grace)
+        if worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join(5)
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        self._terminate(worker)
+        new = self._spawn()
+        self._handshake(new)
+        self.restarts += 1
+        return new
+
+    @property
+    def capacity(self) -> int:
+        """Sentences the workers can take at once."""
+        return sum(self.max_batch if w.batching else 1 for w in self._workers)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "batched_requests": self.batched_requests,
+            "queue_wait_seconds": self.queue_wait_seconds,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "worker_restarts": self.restarts,
+        }
+
+    def _start(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._tasks = [
+                asyncio.create_task(self._feed(index)) for index in range(len(self._workers))
+            ]
+        return self._queue
+
+    async def _next_batch(self, batching: bool) -> List[_Request]:
+        queue = self._start()
+        batch: List[_Request] = []
+        while not batch:
+            request = await queue.get()
+            if not request.future.done():
+                batch.append(request)
+        if not batching:
+            return batch
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            if queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                request = queue.get_nowait()
+            if not request.future.done():
+                batch.append(request)
+        return batch
+
+    async def _feed(self, index: int) -> None:
+        """Hand batches to worker ``index`` for as long as the pool is open."""
+        try:
+            while True:
+                batch = await self._next_batch(self._workers[index].batching)
+                now = time.perf_counter()
+                self.queue_wait_seconds += sum(now - request.queued for request in batch)
+                self.batches += 1
+                if len(batch) > 1:
+                    self.batched_requests += len(batch)
+                texts = [request.text for request in batch]
+                try:
+                    error, pcms = await self._run(index, texts)
+                except RuntimeError as exc:
+                    print(f"Error: could not restart TTS worker: {exc}", file=sys.stderr)
+                    self._resolve(batch, "TTS worker exited", None)
+                    return
+                self._resolve(batch, error, pcms)
+        finally:
+            if all(task.done() for task in self._tasks if task is not asyncio.current_task()):
+                # Nothing is left to serve what is queued
+                self._fail_queued("No TTS workers are running")
+
+    async def _run(self, index: int, texts: List[str]) -> Tuple[Optional[str], Any]:
+        """Synthesize ``texts`` on worker ``index``.
+
+        A batch whose worker dies is sent once more, to its replacement.
+        Raises :class:`RuntimeError` if no replacement could be started.
+        """
+        for _ in range(2):
+            worker = self._workers[index]
+            try:
+                worker.conn.send(texts)
+                return await asyncio.to_thread(worker.conn.recv)
+            except (EOFError, OSError):
+                self._workers[index] = await asyncio.to_thread(self._replace, worker)
+        return "TTS worker exited", None
+
+    def _fail_queued(self, error: str) -> None:
+        if self._queue is None:
+            return
+        while not self._queue.empty():
+            request = self._queue.get_nowait()
+            if not request.future.done():
+                request.future.set_exception(RuntimeError(error))
+
+    @staticmethod
+    def _resolve(
+        batch: List[_Request], error: Optional[str], pcms: Optional[List[bytes]]
+    ) -> None:
+        for position, request in enumerate(batch):
+            if request.future.done():
+                continue  # The caller gave up, e.g. on barge-in
+            if error is not None or pcms is None:
+                request.future.set_exception(RuntimeError(error))
+            else:
+                request.future.set_result(pcms[position])
+
+    async def synthesize(self, text: str) -> bytes:
+        """Return ``text`` as 16-bit PCM synthesized by one of the workers."""
+        queue = self._start()
+        if all(task.done() for task in self._tasks):
+            raise RuntimeError("No TTS workers are running")
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait(_Request(text, future))
+        self.requests += 1
+        return await future
+
+    async def warm_up(self, texts: Sequence[str]) -> None:
+        """Have every worker synthesize ``texts`` once."""
+        if self._queue is not None:
+            # The feeders own the pipes now
+            await super().warm_up(texts)
+            return
+
+        def run(worker: _Worker) -> None:
+            worker.conn.send(list(texts))
+            error, _ = worker.conn.recv()
+            if error is not None:
+                raise RuntimeError(error)
+
+        await asyncio.gather(*(asyncio.to_thread(run, w) for w in self._workers))
+
+    async def speak(self, text: str) -> bytes:
+        return wav_bytes(await self.synthesize(text), self.sample_rate)
+
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        sentences = split_sentences(text)
+        if not sentences:
+            return
+        job = asyncio.ensure_future(self.synthesize(sentences[0]))
+        try:
+            for index in range(len(sentences)):
+                pcm = await job
+                if index + 1 < len(sentences):
+                    # Queue the next sentence before this one is played
+                    job = asyncio.ensure_future(self.synthesize(sentences[index + 1]))
+                if pcm:
+                    yield pcm
+        finally:
+            job.cancel()
+
+    async def close(self) -> None:
+        """Stop the workers; sentences still queued are abandoned."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks.clear()
+        await asyncio.to_thread(lambda: [self._terminate(w) for w in self._workers])
+        self._workers.clear()
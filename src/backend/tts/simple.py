@@ -1,31 +1,133 @@
 from __future__ import annotations
 
-import io
+import asyncio
 import math
-import struct
-import wave
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from typing import AsyncIterator, List, Tuple
 
+from ..audio import wav_bytes
 from .base import TTS
+from .text import split_sentences
+
+
+@lru_cache(maxsize=None)
+def _tone_cycle(sample_rate: int, freq: int) -> bytes:
+    """Return the shortest whole number of tone periods as 16-bit PCM."""
+    length = sample_rate // math.gcd(sample_rate, freq)
+    step = 2 * math.pi * freq / sample_rate
+    samples = array("h", [int(math.sin(step * i) * 32767) for i in range(length)])
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples.tobytes()
+
+
+#: Bytes of rendered tones kept by :func:`tone`, least recently used first out
+TONE_CACHE_BYTES = 16 * 1024 * 1024
+
+_tones: OrderedDict[Tuple[int, int, int], bytes] = OrderedDict()
+_tones_size = 0
+_tones_lock = threading.Lock()
+
+
+def tone(sample_rate: int, freq: int, samples: int) -> bytes:
+    """Return ``samples`` samples of a ``freq`` Hz sine tone as 16-bit PCM.
+
+    Only one cycle is computed per sample rate and frequency; longer tones
+    are tiled from it with bytes repetition, which runs in C. Recent tones
+    are kept up to :data:`TONE_CACHE_BYTES` in total, so long texts cannot
+    pin an unbounded amount of audio.
+    """
+    global _tones_size
+    key = (sample_rate, freq, samples)
+    with _tones_lock:
+        pcm = _tones.get(key)
+        if pcm is not None:
+            _tones.move_to_end(key)
+            return pcm
+    cycle = _tone_cycle(sample_rate, freq)
+    size = samples * 2
+    pcm = (cycle * (size // len(cycle) + 1))[:size]
+    if size > TONE_CACHE_BYTES:
+        return pcm
+    with _tones_lock:
+        if key not in _tones:
+            _tones[key] = pcm
+            _tones_size += size
+        while _tones_size > TONE_CACHE_BYTES:
+            _, evicted = _tones.popitem(last=False)
+            _tones_size -= len(evicted)
+    return pcm
 
 
 class ConsoleTTS(TTS):
-    """TTS implementation that returns a short beep for any text."""
+    """Synthetic speech stand-in that renders any text as a tone.
+
+    The tone lasts ``seconds_per_char`` per character of text, but at least
+    ``min_seconds``, so load tests see audio of realistic size. With
+    ``chunk_ms`` set, :meth:`stream` yields fixed-size chunks instead of one
+    block per sentence, and ``speed`` simulates a slow engine producing that
+    many seconds of audio per second of wall time (0 means instantly).
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        freq: int = 440,
+        seconds_per_char: float = 0.06,
+        min_seconds: float = 0.3,
+        chunk_ms: int = 0,
+        speed: float = 0.0,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.freq = freq
+        self.seconds_per_char = seconds_per_char
+        self.min_seconds = min_seconds
+        self.chunk_ms = chunk_ms
+        self.speed = speed
+
+    def _render(self, text: str) -> bytes:
+        seconds = max(self.min_seconds, len(text.strip()) * self.seconds_per_char)
+        return tone(self.sample_rate, self.freq, int(self.sample_rate * seconds))
+
+    async def _pace(self, pcm: bytes) -> None:
+        if self.speed > 0:
+            await asyncio.sleep(len(pcm) / (2 * self.sample_rate * self.speed))
+
+    #: :meth:`synthesize_batch` costs no more than its longest text
+    batching = True
+
+    def synthesize_batch(self, texts: List[str]) -> List[bytes]:
+        """Render ``texts`` in one blocking call.
+
+        With ``speed`` set the call lasts as long as the longest text takes,
+        the way a batched neural engine behaves.
+        """
+        pcms = [self._render(text) for text in texts]
+        if self.speed > 0 and pcms:
+            time.sleep(max(map(len, pcms)) / (2 * self.sample_rate * self.speed))
+        return pcms
 
     async def speak(self, text: str) -> bytes:
+        pcm = self._render(text)
+        await self._pace(pcm)
+        return wav_bytes(pcm, self.sample_rate)
 
-        sr = 16000
-        duration = 0.3
-        freq = 440.0
-        frames = []
-        for i in range(int(sr * duration)):
-            sample = int(math.sin(2 * math.pi * freq * i / sr) * 32767)
-            frames.append(struct.pack("<h", sample))
-
-        buffer = io.BytesIO()
-        with wave.open(buffer, "wb") as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)
-            wf.setframerate(sr)
-            wf.writeframes(b"".join(frames))
-
-        return buffer.getvalue()
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        size = self.sample_rate * self.chunk_ms // 1000 * 2
+        for sentence in split_sentences(text):
+            pcm = self._render(sentence)
+            if size <= 0:
+                await self._pace(pcm)
+                yield pcm
+                continue
+            # Chunks are views of the cached tone, not copies
+            view = memoryview(pcm)
+            for start in range(0, len(pcm), size):
+                chunk = view[start : start + size]
+                await self._pace(chunk)
+                yield chunk
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import re
+from typing import List
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+
+
+def split_sentences(text: str, max_chars: int = 120) -> List[str]:
+    """Split ``text`` into chunks that can be synthesized one at a time.
+
+    Text is split after ``.``, ``!`` or ``?`` followed by whitespace. Sentences
+    longer than ``max_chars`` are split again at clause boundaries (``,``,
+    ``;`` or ``:``) so the first audio is not held up by a long sentence.
+    """
+    chunks: List[str] = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        if len(sentence) <= max_chars:
+            chunks.append(sentence)
+            continue
+        current = ""
+        for clause in _CLAUSE_END.split(sentence):
+            if current and len(current) + len(clause) + 1 > max_chars:
+                chunks.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}" if current else clause
+        if current:
+            chunks.append(current)
+    return [c for c in chunks if c]
+
+
+class SentenceAccumulator:
+    """Collect streamed text and hand out complete sentences.
+
+    Feed text deltas (for example LLM tokens) to :meth:`push`; it returns the
+    sentences completed so far. A sentence counts as complete once its final
+    punctuation is followed by whitespace. Call :meth:`flush` at the end of
+    the stream for whatever is left.
+    """
+
+    def __init__(self, max_chars: int = 120) -> None:
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def push(self, delta: str) -> List[str]:
+        self._buffer += delta
+        sentences: List[str] = []
+        while True:
+            match = _SENTENCE_END.search(self._buffer)
+            if match is None and len(self._buffer) > self.max_chars:
+                # No sentence end yet; settle for the last clause boundary
+                clauses = list(_CLAUSE_END.finditer(self._buffer))
+                match = clauses[-1] if clauses else None
+            if match is None:
+                break
+            sentence = self._buffer[: match.start()].strip()
+            self._buffer = self._buffer[match.end():]
+            if sentence:
+                sentences.append(sentence)
+        return sentences
+
+    def flush(self) -> List[str]:
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return split_sentences(rest, self.max_chars) if rest else []
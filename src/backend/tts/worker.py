@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import os
+import signal
+from typing import AsyncIterator, Callable, List, Optional, Sequence
+
+from ..audio import wav_bytes, wav_data_offset
+from .base import TTS
+from .text import split_sentences
+
+CHUNK_SIZE = 4096
+
+
+class SynthesisWorkerPool:
+    """Run a command line TTS engine as a pool of warm worker processes.
+
+    ``argv`` must start a process that reads the text to speak from stdin and
+    writes 16-bit PCM, or a WAV stream, to stdout before exiting. Audio is
+    read straight from the pipe, so no temporary files are involved.
+
+    Up to ``warm`` processes are started ahead of time and sit waiting for
+    their input, which hides the process start-up cost from the first audio
+    of a reply. At most ``max_concurrency`` syntheses run at once; further
+    requests wait for a free slot.
+
+    Each process gets its own process group, and a worker that is stopped
+    early is killed along with anything it started, such as the engine
+    behind a shell wrapper. ``cleanup`` is called with every process once
+    it has exited.
+    """
+
+    def __init__(
+        self,
+        argv: Sequence[str],
+        warm: int = 1,
+        max_concurrency: int = 2,
+        chunk_size: int = CHUNK_SIZE,
+        cleanup: Optional[Callable[[asyncio.subprocess.Process], None]] = None,
+    ) -> None:
+        self.argv = list(argv)
+        self.cleanup = cleanup
+        self.warm = warm
+        self.chunk_size = chunk_size
+        self.max_concurrency = max_concurrency
+        self.spawned = 0
+        self._idle: List[asyncio.subprocess.Process] = []
+        self._refills: List[asyncio.Task] = []
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def _spawn(self) -> asyncio.subprocess.Process:
+        self.spawned += 1
+        return await asyncio.create_subprocess_exec(
+            *self.argv,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+    async def _stop(self, proc: asyncio.subprocess.Process) -> None:
+        """Kill ``proc`` and its children if still running, then reap it."""
+        if proc.returncode is None:
+            if proc.stdin is not None:
+                proc.stdin.close()
+            with contextlib.suppress(ProcessLookupError):
+                os.killpg(proc.pid, signal.SIGKILL)
+        await proc.wait()
+        if self.cleanup is not None:
+            self.cleanup(proc)
+
+    async def _refill(self) -> None:
+        while len(self._idle) < self.warm:
+            self._idle.append(await self._spawn())
+
+    async def start(self) -> None:
+        """Start the warm workers now rather than on first use."""
+        await self._refill()
+
+    async def _acquire(self) -> asyncio.subprocess.Process:
+        while self._idle:
+            proc = self._idle.pop()
+            if proc.returncode is None:
+                break
+            await self._stop(proc)
+        else:
+            proc = await self._spawn()
+        if self.warm and not self._refills:
+            task = asyncio.create_task(self._refill())
+            self._refills.append(task)
+            task.add_done_callback(self._refills.remove)
+        return proc
+
+    async def synthesize(self, text: str) -> AsyncIterator[bytes]:
+        """Yield raw PCM chunks for ``text`` as the engine produces them."""
+        async with self._slots:
+            proc = await self._acquire()
+            assert proc.stdin is not None and proc.stdout is not None
+            try:
+                proc.stdin.write(text.encode())
+                await proc.stdin.drain()
+                proc.stdin.close()
+                async for chunk in self._read_pcm(proc.stdout):
+                    yield chunk
+                if await proc.wait() != 0:
+                    raise RuntimeError(
+                        f"{self.argv[0]} exited with status {proc.returncode}"
+                    )
+            finally:
+                # Kills the worker if the consumer stopped early, e.g. on barge-in
+                await self._stop(proc)
+
+    async def _read_pcm(self, stdout: asyncio.StreamReader) -> AsyncIterator[bytes]:
+        head = b""
+        offset: Optional[int] = None
+        while True:
+            data = await stdout.read(self.chunk_size)
+            if offset is None:
+                # Work out whether the engine writes raw PCM or a WAV stream
+                head += data
+                is_wav = head[:4] == b"RIFF"
+                if data and (len(head) < 4 or (is_wav and wav_data_offset(head) is None)):
+                    continue
+                offset = (wav_data_offset(head) or len(head)) if is_wav else 0
+                data = head[offset:]
+                if not data and not head:
+                    break
+            elif not data:
+                break
+            if data:
+                yield data
+
+    async def close(self) -> None:
+        """Stop the refill tasks and any idle workers."""
+        for task in list(self._refills):
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        for proc in self._idle:
+            await self._stop(proc)
+        self._idle.clear()
+
+
+class CommandTTS(TTS):
+    """TTS backed by any command line engine via :class:`SynthesisWorkerPool`.
+
+    The engine must read text on stdin and write mono 16-bit audio at
+    ``sample_rate`` to stdout, either raw or as a WAV stream. For example,
+    piper can be used with::
+
+        CommandTTS(["piper", "--model", "voice.onnx", "--output-raw"], 22050)
+
+    :attr:`engine` names the command line, so cached audio is not shared
+    between engines or voices that differ only in their arguments.
+    """
+
+    def __init__(
+        self,
+        argv: Sequence[str],
+        sample_rate: int = 16000,
+        warm: int = 1,
+        max_concurrency: int = 2,
+    ) -> None:
+        self.sample_rate = sample_rate
+        digest = hashlib.sha256("\0".join(argv).encode()).hexdigest()[:16]
+        self.engine = f"{type(self).__name__}:{digest}"
+        self.pool = SynthesisWorkerPool(argv, warm=warm, max_concurrency=max_concurrency)
+
+    @property
+    def capacity(self) -> int:
+        return self.pool.max_concurrency
+
+    async def warm_up(self, texts: Sequence[str]) -> None:
+        await self.pool.start()
+        await super().warm_up(texts)
+
+    async def speak(self, text: str) -> bytes:
+        chunks = [chunk async for chunk in self.pool.synthesize(text)]
+        return wav_bytes(b"".join(chunks), self.sample_rate)
+
+    async def stream(self, text: str) -> AsyncIterator[bytes]:
+        for sentence in split_sentences(text):
+            # Keep chunks sample aligned; the pipe can split a sample in two
+            carry = b""
+            async for chunk in self.pool.synthesize(sentence):
+                if carry:
+                    chunk = carry + chunk
+                cut = len(chunk) - len(chunk) % 2
+                carry = chunk[cut:]
+                if cut:
+                    yield chunk if cut == len(chunk) else memoryview(chunk)[:cut]
+
+    async def close(self) -> None:
+        await self.pool.close()
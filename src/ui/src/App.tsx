@@ -19,6 +19,18 @@ export default function App() {
   const analyserRef = useRef<AnalyserNode | null>(null);
   const canvasRef = useRef<HTMLCanvasElement | null>(null);
   const animRef = useRef<number | null>(null);
+  const playTimeRef = useRef(0);
+  const playChainRef = useRef<Promise<void>>(Promise.resolve());
+  const playingRef = useRef<Set<AudioBufferSourceNode>>(new Set());
+  const playGenRef = useRef(0);
+
+  // Stop everything queued for playback, e.g. when the user barges in.
+  const flushPlayback = () => {
+    playGenRef.current += 1;
+    playingRef.current.forEach((s) => s.stop());
+    playingRef.current.clear();
+    playTimeRef.current = 0;
+  };
 
   useEffect(() => {
     if (workletNodeRef.current) {
@@ -86,17 +98,31 @@ export default function App() {
             const buf =
               ev.data instanceof Blob ? await ev.data.arrayBuffer() : ev.data;
             setBytesReceived((b) => b + buf.byteLength);
-            if (audioCtxRef.current) {
-              const audioBuf = await audioCtxRef.current.decodeAudioData(buf);
-              const source = audioCtxRef.current.createBufferSource();
+            // Replies arrive as one WAV chunk per sentence; decode them in
+            // order and queue each one to start when the previous one ends.
+            const gen = playGenRef.current;
+            playChainRef.current = playChainRef.current.then(async () => {
+              const ctx = audioCtxRef.current;
+              if (!ctx || gen !== playGenRef.current) return;
+              const audioBuf = await ctx.decodeAudioData(buf);
+              if (gen !== playGenRef.current) return;
+              const source = ctx.createBufferSource();
               source.buffer = audioBuf;
-              source.connect(audioCtxRef.current.destination);
-              source.start();
-            }
+              source.connect(ctx.destination);
+              playingRef.current.add(source);
+              source.onended = () => playingRef.current.delete(source);
+              const start = Math.max(ctx.currentTime, playTimeRef.current);
+              source.start(start);
+              playTimeRef.current = start + audioBuf.duration;
+            }).catch((err) => console.error('Failed to play audio', err));
             return;
           }
           try {
             const t = JSON.parse(ev.data);
+            if (t.event === 'barge_in') {
+              flushPlayback();
+              return;
+            }
             if (t.final) {
               if (t.agent) {
                 setMessages((m) => [...m, { speaker: 'agent', text: t.text }]);
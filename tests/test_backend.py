@@ -1,15 +1,18 @@
 import asyncio
 import pathlib
 import sys
+import time
 from unittest import mock
 
 # Allow importing the src package
 sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
 
 from src.backend.core.backend import ChatBackend
+from src.backend.core.reply import ReplyStream
 from src.backend.stt import Transcript
 from src.backend.agent.base import Agent
 from src.backend.tts.base import TTS
+from src.backend.tts.text import SentenceAccumulator
 
 
 class DummyAgent(Agent):
@@ -25,6 +28,28 @@ class DummyTTS(TTS):
         self.spoken.append(text)
         return b"audio"
 
+    async def stream(self, text: str):
+        self.spoken.append(text)
+        yield b"audio"
+
+
+class TimedStreamingAgent(Agent):
+    """Emit one word every ``interval`` seconds."""
+
+    def __init__(self, reply: str, interval: float = 0.02) -> None:
+        self.reply = reply
+        self.interval = interval
+        self.finished_at = None
+
+    async def process(self, text: str) -> str:
+        return self.reply
+
+    async def stream(self, text: str):
+        for word in self.reply.split(" "):
+            await asyncio.sleep(self.interval)
+            yield word + " "
+        self.finished_at = time.monotonic()
+
 
 def test_backend_processes_final_transcripts():
     async def gen():
@@ -39,3 +64,38 @@ def test_backend_processes_final_transcripts():
     asyncio.run(backend.run(turns=2))
 
     assert tts.spoken == ["HELLO", "WORLD"]
+
+
+def test_agent_stream_defaults_to_process():
+    async def collect():
+        return [d async for d in DummyAgent().stream("hi")]
+
+    assert asyncio.run(collect()) == ["HI"]
+
+
+def test_sentence_accumulator_emits_complete_sentences():
+    acc = SentenceAccumulator()
+    out = []
+    for delta in ["Hel", "lo there", ". How", " are you", "? Fine"]:
+        out.extend(acc.push(delta))
+    assert out == ["Hello there.", "How are you?"]
+    assert acc.flush() == ["Fine"]
+
+
+def test_reply_stream_starts_speaking_before_agent_finishes():
+    agent = TimedStreamingAgent("Sure thing. Let me think about that for a while.")
+    tts = DummyTTS()
+
+    async def run():
+        reply = ReplyStream(agent, tts, "question")
+        first_audio = None
+        async for _ in reply:
+            if first_audio is None:
+                first_audio = time.monotonic()
+        return reply, first_audio
+
+    reply, first_audio = asyncio.run(run())
+
+    assert first_audio < agent.finished_at
+    assert tts.spoken == ["Sure thing.", "Let me think about that for a while."]
+    assert reply.text.strip() == agent.reply
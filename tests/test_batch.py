@@ -0,0 +1,184 @@
+import json
+import os
+import pathlib
+import sys
+import wave
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from src.backend.stt import batch
+from src.backend.stt.batch import completed, find_audio, transcribe_files
+
+
+class ChunkRecognizer:
+    """Recognizes every chunk it is given as one timed word."""
+
+    def __init__(self, samplerate):
+        self.samplerate = samplerate
+        self.position = 0.0
+        self.words = False
+
+    def SetWords(self, enabled):
+        self.words = enabled
+
+    def AcceptWaveform(self, data):
+        start = self.position
+        self.position += len(data) / (2 * self.samplerate)
+        self.last = {"word": "chunk", "start": start, "end": self.position, "conf": 1.0}
+        return True
+
+    def Result(self):
+        return json.dumps({"text": "chunk", "result": [self.last] if self.words else []})
+
+    def FinalResult(self):
+        return json.dumps({"text": ""})
+
+
+class CrashingRecognizer(ChunkRecognizer):
+    """Kills its worker process on 8 kHz audio and fails on 22.05 kHz."""
+
+    def AcceptWaveform(self, data):
+        if self.samplerate == 8000:
+            os._exit(1)
+        if self.samplerate == 22050:
+            raise RuntimeError("recognizer failed")
+        return super().AcceptWaveform(data)
+
+
+def write_wav(path, seconds, rate=16000, channels=1):
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(b"\0\0" * channels * int(rate * seconds))
+
+
+def test_find_audio_searches_directories(tmp_path):
+    (tmp_path / "calls" / "day1").mkdir(parents=True)
+    for name in ["calls/b.wav", "calls/day1/a.PCM", "calls/notes.txt", "other.bin"]:
+        (tmp_path / name).write_bytes(b"")
+
+    files = find_audio([str(tmp_path / "calls"), str(tmp_path / "other.bin")])
+
+    assert [pathlib.Path(f).relative_to(tmp_path).as_posix() for f in files] == [
+        "calls/b.wav",
+        "calls/day1/a.PCM",
+        "other.bin",
+    ]
+
+
+def test_transcribes_files_and_resumes(tmp_path):
+    write_wav(tmp_path / "long.wav", 2.5, rate=8000)
+    (tmp_path / "raw.pcm").write_bytes(b"\0\0" * 16000)
+    write_wav(tmp_path / "stereo.wav", 1, channels=2)
+    files = find_audio([str(tmp_path)])
+    output = str(tmp_path / "out.jsonl")
+
+    stats = transcribe_files(
+        files, output, "model", chunk_ms=1000, processes=0, recognizer_factory=ChunkRecognizer
+    )
+
+    assert (stats["files"], stats["skipped"], stats["failed"]) == (2, 0, 1)
+    records = {pathlib.Path(r["file"]).name: r for r in map(json.loads, open(output))}
+    long = records["long.wav"]
+    assert long["text"] == "chunk chunk chunk"
+    assert [(w["start"], w["end"]) for w in long["words"]] == [(0, 1), (1, 2), (2, 2.5)]
+    assert long["duration"] == 2.5
+    assert long["rtf"] > 0
+    assert records["raw.pcm"]["duration"] == 1.0
+    assert "16-bit mono" in records["stereo.wav"]["error"]
+
+    # An interrupted run leaves a partial line; only the failed file is redone
+    with open(output, "a") as fh:
+        fh.write('{"file": "cut')
+    stats = transcribe_files(
+        files, output, "model", processes=0, recognizer_factory=ChunkRecognizer
+    )
+    assert (stats["files"], stats["skipped"], stats["failed"]) == (0, 2, 1)
+    assert len(completed(output)) == 2
+    assert open(output).read().count("\n") == 5
+
+
+def test_files_are_spread_over_worker_processes(tmp_path):
+    for index in range(4):
+        write_wav(tmp_path / f"{index}.wav", 0.5)
+    output = str(tmp_path / "out.jsonl")
+
+    stats = transcribe_files(
+        find_audio([str(tmp_path)]),
+        output,
+        "model",
+        processes=2,
+        recognizer_factory=ChunkRecognizer,
+    )
+
+    assert stats["files"] == 4
+    assert all(json.loads(line)["text"] == "chunk" for line in open(output))
+
+
+def test_completed_skips_lines_that_are_not_records(tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text(
+        '1\n["a.wav"]\n{"text": "hi"}\n{"file": "a.wav", "text": "hi"}\n'
+        '{"file": "b.wav", "error": "bad"}\n'
+    )
+
+    assert completed(str(output)) == {"a.wav"}
+
+
+def test_duplicates_are_skipped_once(tmp_path):
+    write_wav(tmp_path / "a.wav", 0.1)
+    path = str(tmp_path / "a.wav")
+    output = str(tmp_path / "out.jsonl")
+
+    stats = transcribe_files(
+        [path, path], output, "model", processes=0, recognizer_factory=ChunkRecognizer
+    )
+    assert (stats["files"], stats["skipped"]) == (1, 0)
+    stats = transcribe_files(
+        [path, path], output, "model", processes=0, recognizer_factory=ChunkRecognizer
+    )
+    assert (stats["files"], stats["skipped"]) == (0, 1)
+
+
+def test_worker_failures_become_error_records(tmp_path):
+    write_wav(tmp_path / "fails.wav", 0.1, rate=22050)
+    output = str(tmp_path / "out.jsonl")
+
+    stats = transcribe_files(
+        [str(tmp_path / "fails.wav")],
+        output,
+        "model",
+        processes=1,
+        recognizer_factory=CrashingRecognizer,
+    )
+    assert stats["failed"] == 1
+    [record] = map(json.loads, open(output))
+    assert record["error"] == "RuntimeError: recognizer failed"
+
+    # A dead worker breaks the pool; every file still gets a record
+    write_wav(tmp_path / "crash.wav", 0.1, rate=8000)
+    write_wav(tmp_path / "ok.wav", 0.1)
+    stats = transcribe_files(
+        [str(tmp_path / "crash.wav"), str(tmp_path / "ok.wav")],
+        output,
+        "model",
+        processes=1,
+        recognizer_factory=CrashingRecognizer,
+    )
+    assert stats["files"] + stats["failed"] == 2
+    records = {pathlib.Path(r["file"]).name: r for r in map(json.loads, open(output))}
+    assert records["crash.wav"]["error"].startswith("BrokenProcessPool")
+
+
+def test_main_reports_missing_vosk(tmp_path, monkeypatch, capsys):
+    write_wav(tmp_path / "a.wav", 0.1)
+
+    monkeypatch.setattr(batch, "vosk", None)
+
+    code = batch.main(
+        [str(tmp_path), "-o", str(tmp_path / "out.jsonl"), "--processes", "0"]
+    )
+
+    assert code == 1
+    assert "Vosk must be installed" in capsys.readouterr().err
@@ -38,9 +38,36 @@ def test_load_config_reports_unknown_key(tmp_path):
     assert "server.foo" in str(exc.value)
 
 
+@pytest.mark.parametrize(
+    "data, name",
+    [
+        ({"stt": {"overflow": "drop"}}, "stt.overflow"),
+        ({"server": {"turn_policy": "barge"}}, "server.turn_policy"),
+    ],
+)
+def test_load_config_rejects_unknown_choices(tmp_path, data, name):
+    cfg_file = tmp_path / "cfg.json"
+    cfg_file.write_text(json.dumps(data))
+
+    with pytest.raises(ValueError, match=f"'{name}' must be one of"):
+        config.load_config(str(cfg_file))
+
+
 def test_load_config_invalid_json(tmp_path):
     cfg_file = tmp_path / "bad.json"
     cfg_file.write_text("{invalid")
 
     with pytest.raises(ValueError):
         config.load_config(str(cfg_file))
+
+
+def test_create_tts_in_worker_processes():
+    with mock.patch("src.backend.tts.service.ProcessPoolTTS") as pool:
+        cfg = config.TTSConfig(type="console", cache=False, processes=2, max_batch=4)
+        assert config.create_tts(cfg) is pool.return_value
+
+    factory = pool.call_args.args[0]
+    assert factory.args[0].processes == 0
+    assert pool.call_args.kwargs == {"processes": 2, "max_batch": 4, "max_wait_ms": 10}
+    with pytest.raises(ValueError):
+        config.create_tts(config.TTSConfig(type="macsay", processes=1))
@@ -0,0 +1,52 @@
+import io
+import json
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from src.backend.core.latency import LatencyTracker, TurnTrace, percentile
+
+
+def make_trace(final: float, first_byte: float) -> TurnTrace:
+    return TurnTrace(first_frame=0.0, final=final, tts_start=final, tts_first_byte=first_byte)
+
+
+def test_percentile_uses_nearest_rank():
+    ordered = list(range(1, 101))
+    assert percentile(ordered, 50) == 50
+    assert percentile(ordered, 95) == 95
+    assert percentile(ordered, 99) == 99
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) == 0.0
+
+
+def test_spans_skip_missing_marks():
+    spans = make_trace(1.0, 1.25).spans()
+    assert spans == {"stt_final": 1000.0, "tts_first_byte": 250.0, "response": 250.0}
+
+
+def test_tracker_keeps_rolling_window():
+    tracker = LatencyTracker(window=10)
+    for i in range(20):
+        tracker.record(make_trace(1.0, 1.0 + i / 1000))
+
+    summary = tracker.summary()["response"]
+    # Only the last ten turns (10-19 ms) are kept
+    assert summary["count"] == 10
+    assert round(summary["p50"]) == 14
+    assert round(summary["p99"]) == 19
+    assert tracker.turns == 20
+
+
+def test_traces_dump_as_json_lines():
+    lines = []
+    tracker = LatencyTracker(sink=lines.append)
+    tracker.record(make_trace(0.5, 0.75))
+
+    out = io.StringIO()
+    assert tracker.dump(out) == 1
+    assert out.getvalue() == lines[0]
+    data = json.loads(lines[0])
+    assert data["spans_ms"]["tts_first_byte"] == 250.0
+    assert data["final"] == 0.5
@@ -0,0 +1,78 @@
+import asyncio
+import pathlib
+import sys
+from unittest import mock
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from src.backend.core.metrics import MetricsRegistry, MetricsServer
+
+
+def test_render_counters_gauges_and_labels():
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests").inc(3)
+    registry.gauge("depth", "Queue depth").set_function(lambda: 1.5)
+    errors = registry.counter("errors_total", "Errors", ["kind"])
+    errors.labels("io").inc()
+    errors.labels('a"b').inc(2)
+
+    assert registry.render() == (
+        "# HELP requests_total Requests\n"
+        "# TYPE requests_total counter\n"
+        "requests_total 3\n"
+        "# HELP depth Queue depth\n"
+        "# TYPE depth gauge\n"
+        "depth 1.5\n"
+        "# HELP errors_total Errors\n"
+        "# TYPE errors_total counter\n"
+        'errors_total{kind="a\\"b"} 2\n'
+        'errors_total{kind="io"} 1\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    hist = registry.histogram("latency_seconds", "Latency", buckets=[0.1, 1.0])
+    for value in (0.05, 0.1, 0.5, 3.0):
+        hist.observe(value)
+
+    lines = registry.render().splitlines()[2:]
+    assert lines == [
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1.0"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 3.65",
+        "latency_seconds_count 4",
+    ]
+
+
+def test_collectors_run_before_render():
+    registry = MetricsRegistry()
+    gauge = registry.gauge("value", "Value")
+    source = mock.Mock(return_value=7)
+    registry.add_collector(lambda: gauge.set(source()))
+    assert registry.render().endswith("value 7\n")
+    source.assert_called_once()
+
+
+def test_metrics_server_serves_registry():
+    registry = MetricsRegistry()
+    registry.counter("hits_total", "Hits").inc()
+
+    async def fetch(path):
+        server = MetricsServer(registry, port=0)
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection("localhost", server.port)
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response.decode()
+        finally:
+            await server.close()
+
+    ok = asyncio.run(fetch("/metrics"))
+    assert ok.startswith("HTTP/1.0 200 OK")
+    assert ok.endswith("hits_total 1\n")
+    assert asyncio.run(fetch("/")).startswith("HTTP/1.0 404")
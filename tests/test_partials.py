@@ -0,0 +1,48 @@
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from src.backend.core.partials import PartialFilter, PartialPolicy
+
+
+def test_unchanged_partials_are_suppressed():
+    f = PartialFilter()
+    assert f.partial("hel", now=0) == {"text": "hel", "final": False}
+    assert f.partial("hel", now=1) is None
+    assert f.partial("hello", now=2) == {"text": "hello", "final": False}
+    assert (f.sent, f.suppressed) == (2, 1)
+
+
+def test_rate_limit_keeps_only_newest_partial():
+    f = PartialFilter(PartialPolicy(max_rate=2))
+    assert f.partial("a", now=0.0) is not None
+    assert f.partial("ab", now=0.1) is None
+    assert f.partial("abc", now=0.2) is None
+    assert f.pending
+    assert f.flush_delay(now=0.2) == 0.3
+    assert f.flush(now=0.5) == {"text": "abc", "final": False}
+    assert f.suppressed == 1
+
+
+def test_final_passes_immediately_and_resets():
+    f = PartialFilter(PartialPolicy(max_rate=1))
+    f.partial("a", now=0.0)
+    f.partial("ab", now=0.1)
+    assert f.final("ab c") == {"text": "ab c", "final": True}
+    assert not f.pending
+    # A new utterance may start with the same words
+    assert f.partial("a", now=0.2) == {"text": "a", "final": False}
+
+
+def test_delta_encoding_sends_changed_suffix():
+    f = PartialFilter(PartialPolicy(delta=True))
+    assert f.partial("hello", now=0) == {"text": "hello", "final": False, "keep": 0}
+    assert f.partial("hello world", now=1) == {"text": " world", "final": False, "keep": 5}
+    assert f.partial("hello wire", now=2) == {"text": "ire", "final": False, "keep": 7}
+
+
+def test_policy_update_from_client():
+    policy = PartialPolicy(max_rate=5).updated({"delta": True})
+    assert policy == PartialPolicy(max_rate=5, delta=True)
+    assert PartialPolicy().updated({"enabled": False}).enabled is False
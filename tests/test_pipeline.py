@@ -0,0 +1,295 @@
+import asyncio
+import pathlib
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from src.backend.agent.base import Agent
+from src.backend.core.latency import LatencyTracker
+from src.backend.core.partials import PartialPolicy
+from src.backend.core.pipeline import TurnPipeline
+from src.backend.stt import Transcript
+from src.backend.tts.base import TTS
+
+
+class UpperAgent(Agent):
+    async def process(self, text: str) -> str:
+        return text.upper()
+
+
+class GatedTTS(TTS):
+    """TTS that waits for ``release`` before producing audio."""
+
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.started = asyncio.Event()
+        self.spoken = []
+
+    async def speak(self, text: str) -> bytes:
+        raise NotImplementedError
+
+    async def stream(self, text: str):
+        self.spoken.append(text)
+        self.started.set()
+        await self.release.wait()
+        yield text.encode()
+
+
+class ScriptedSTT:
+    def __init__(self) -> None:
+        self.queue = asyncio.Queue()
+
+    async def stream(self):
+        while (t := await self.queue.get()) is not None:
+            yield t
+
+
+def make_pipeline(stt, tts, **kwargs):
+    sent = []
+
+    async def send_message(payload):
+        sent.append(payload)
+
+    async def send_audio(pcm, sample_rate):
+        sent.append(pcm)
+
+    pipeline = TurnPipeline(stt, UpperAgent(), tts, send_message, send_audio, **kwargs)
+    return pipeline, sent
+
+
+def test_partials_flow_while_reply_is_synthesized():
+    async def run():
+        stt, tts = ScriptedSTT(), GatedTTS()
+        pipeline, sent = make_pipeline(stt, tts)
+        task = asyncio.create_task(pipeline.run())
+
+        stt.queue.put_nowait(Transcript("hello", is_final=True))
+        await tts.started.wait()
+        stt.queue.put_nowait(Transcript("and", is_final=False))
+        stt.queue.put_nowait(Transcript("and more", is_final=False))
+        for _ in range(10):
+            await asyncio.sleep(0)
+        during = list(sent)
+        assert pipeline.busy
+
+        tts.release.set()
+        stt.queue.put_nowait(None)
+        await task
+        return during, sent
+
+    during, sent = asyncio.run(run())
+
+    assert during == [
+        {"text": "hello", "final": True},
+        {"text": "and", "final": False},
+        {"text": "and more", "final": False},
+    ]
+    assert sent[3:] == [b"HELLO", {"text": "HELLO", "final": True, "agent": True}]
+
+
+def test_interrupt_policy_abandons_in_flight_turn():
+    async def run():
+        stt, tts = ScriptedSTT(), GatedTTS()
+        pipeline, sent = make_pipeline(stt, tts, policy="interrupt")
+        task = asyncio.create_task(pipeline.run())
+
+        stt.queue.put_nowait(Transcript("first", is_final=True))
+        await tts.started.wait()
+        stt.queue.put_nowait(Transcript("second", is_final=True))
+        stt.queue.put_nowait(None)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        tts.release.set()
+        await task
+        return tts, sent
+
+    tts, sent = asyncio.run(run())
+
+    assert tts.spoken == ["FIRST", "SECOND"]
+    assert b"FIRST" not in sent
+    assert {"text": "FIRST", "final": True, "agent": True} not in sent
+    assert sent[-2:] == [b"SECOND", {"text": "SECOND", "final": True, "agent": True}]
+
+
+def test_queue_policy_drops_oldest_pending_turn():
+    async def run():
+        stt, tts = ScriptedSTT(), GatedTTS()
+        pipeline, sent = make_pipeline(stt, tts, max_pending_turns=1)
+        task = asyncio.create_task(pipeline.run())
+
+        stt.queue.put_nowait(Transcript("one", is_final=True))
+        await tts.started.wait()
+        stt.queue.put_nowait(Transcript("two", is_final=True))
+        stt.queue.put_nowait(Transcript("three", is_final=True))
+        stt.queue.put_nowait(None)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        tts.release.set()
+        await task
+        return pipeline, tts
+
+    pipeline, tts = asyncio.run(run())
+
+    assert tts.spoken == ["ONE", "THREE"]
+    assert pipeline.dropped_turns == 1
+
+
+def test_barge_in_cancels_reply_and_flushes_client():
+    async def run():
+        stt, tts = ScriptedSTT(), GatedTTS()
+        pipeline, sent = make_pipeline(stt, tts, barge_in=True)
+        task = asyncio.create_task(pipeline.run())
+
+        stt.queue.put_nowait(Transcript("hello", is_final=True))
+        await tts.started.wait()
+        stt.queue.put_nowait(Transcript("wait", is_final=False))
+        stt.queue.put_nowait(Transcript("wait a", is_final=False))
+        stt.queue.put_nowait(None)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        tts.release.set()
+        await task
+        return pipeline, sent
+
+    pipeline, sent = asyncio.run(run())
+
+    assert sent == [
+        {"text": "hello", "final": True},
+        {"event": "barge_in"},
+        {"text": "wait", "final": False},
+        {"text": "wait a", "final": False},
+    ]
+    assert pipeline.barge_ins == 1
+
+
+def test_partials_do_not_barge_in_when_idle():
+    async def run():
+        stt, tts = ScriptedSTT(), GatedTTS()
+        pipeline, sent = make_pipeline(stt, tts, barge_in=True)
+        stt.queue.put_nowait(Transcript("hi", is_final=False))
+        stt.queue.put_nowait(None)
+        await pipeline.run()
+        return pipeline, sent
+
+    pipeline, sent = asyncio.run(run())
+
+    assert sent == [{"text": "hi", "final": False}]
+    assert pipeline.barge_ins == 0
+
+
+def test_completed_turns_are_traced():
+    async def run():
+        stt, tts = ScriptedSTT(), GatedTTS()
+        tracker = LatencyTracker()
+        pipeline, _ = make_pipeline(stt, tts, latency=tracker)
+        task = asyncio.create_task(pipeline.run())
+
+        pipeline.audio_received()
+        stt.queue.put_nowait(Transcript("hel", is_final=False))
+        stt.queue.put_nowait(Transcript("hello", is_final=True))
+        tts.release.set()
+        stt.queue.put_nowait(None)
+        await task
+        return tracker
+
+    tracker = asyncio.run(run())
+
+    [trace] = tracker.traces
+    marks = [
+        trace.first_frame,
+        trace.first_partial,
+        trace.final,
+        trace.agent_start,
+        trace.tts_start,
+        trace.tts_first_byte,
+        trace.last_byte,
+    ]
+    assert None not in marks
+    assert marks == sorted(marks)
+    assert trace.turn == 1
+    assert set(tracker.summary()) == {
+        "stt_first_partial",
+        "stt_final",
+        "agent_queue",
+        "agent",
+        "tts_first_byte",
+        "response",
+        "turn",
+    }
+
+
+def test_throttled_partials_flush_newest_and_finals_pass_at_once():
+    async def run():
+        stt, tts = ScriptedSTT(), GatedTTS()
+        tts.release.set()
+        pipeline, sent = make_pipeline(
+            stt, tts, partial_policy=PartialPolicy(max_rate=20)
+        )
+        task = asyncio.create_task(pipeline.run())
+
+        for text in ("a", "a b", "a b c"):
+            stt.queue.put_nowait(Transcript(text, is_final=False))
+        await asyncio.sleep(0.1)
+        stt.queue.put_nowait(Transcript("a b c d", is_final=False))
+        stt.queue.put_nowait(Transcript("a b c d e", is_final=False))
+        stt.queue.put_nowait(Transcript("a b c d e", is_final=True))
+        stt.queue.put_nowait(None)
+        await task
+        return sent
+
+    sent = asyncio.run(run())
+
+    assert sent[:4] == [
+        {"text": "a", "final": False},
+        {"text": "a b c", "final": False},
+        {"text": "a b c d", "final": False},
+        {"text": "a b c d e", "final": True},
+    ]
+
+
+class FailingTTS(TTS):
+    """Raises for every sentence containing ``bad``."""
+
+    async def speak(self, text: str) -> bytes:
+        raise NotImplementedError
+
+    async def stream(self, text: str):
+        if "BAD" in text:
+            raise OSError("device lost")
+        yield text.encode()
+
+
+class FailingAgent(Agent):
+    async def process(self, text: str) -> str:
+        if text == "boom":
+            raise RuntimeError("agent down")
+        return text.upper()
+
+
+def test_failed_turns_are_reported_and_later_turns_answered():
+    async def run():
+        stt = ScriptedSTT()
+        sent = []
+
+        async def send(payload, *args):
+            sent.append(payload)
+
+        pipeline = TurnPipeline(
+            stt, FailingAgent(), FailingTTS(), send, send, max_pending_turns=3
+        )
+        task = asyncio.create_task(pipeline.run())
+        for text in ["bad. skipped.", "boom", "fine"]:
+            stt.queue.put_nowait(Transcript(text, is_final=True))
+        stt.queue.put_nowait(None)
+        await task
+        return pipeline, sent
+
+    pipeline, sent = asyncio.run(run())
+    errors = [m for m in sent if isinstance(m, dict) and m.get("event") == "error"]
+    assert [(e["turn"], e["stage"]) for e in errors] == [(1, "tts"), (2, "agent")]
+    replies = [m["text"] for m in sent if isinstance(m, dict) and m.get("agent")]
+    # The first reply is finished without the rest of its audio
+    assert replies == ["BAD. SKIPPED.", "FINE"]
+    assert b"SKIPPED." not in sent and b"FINE" in sent
+    assert pipeline.failed_turns == 2
+    assert not pipeline.busy
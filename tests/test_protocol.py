@@ -0,0 +1,107 @@
+import pathlib
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from src.backend import audio
+from src.backend.audio import ulaw_decode, ulaw_encode, wav_to_pcm
+from src.backend.core.protocol import (
+    HEADER,
+    KIND_AUDIO,
+    ClientProtocol,
+    ProtocolError,
+    StreamStats,
+    pack_frame,
+    unpack_frame,
+)
+
+
+def test_frames_round_trip():
+    data = pack_frame(KIND_AUDIO, 3, 7, 20_000, b"pcm")
+    assert len(data) == HEADER.size + 3
+    frame = unpack_frame(data)
+    assert (frame.kind, frame.stream, frame.seq, frame.timestamp_us) == (1, 3, 7, 20_000)
+    assert frame.payload == b"pcm"
+
+
+def test_unpack_rejects_bad_frames():
+    with pytest.raises(ProtocolError):
+        unpack_frame(b"\x01\x01")
+    with pytest.raises(ProtocolError):
+        unpack_frame(b"\x09" + bytes(HEADER.size - 1))
+
+
+def test_ulaw_matches_g711_and_pure_python_fallback(monkeypatch):
+    pcm = struct.pack("<5h", 0, -1, 1000, -32768, 32767)
+    encoded = ulaw_encode(pcm)
+    assert encoded.hex() == "ff7fce0080"
+    assert struct.unpack("<5h", ulaw_decode(encoded)) == (0, 0, 988, -32124, 32124)
+    monkeypatch.setattr(audio, "np", None)
+    assert ulaw_encode(pcm) == encoded
+    assert ulaw_decode(encoded) == struct.pack("<5h", 0, 0, 988, -32124, 32124)
+
+
+def test_stream_stats_count_loss_late_frames_and_jitter():
+    stats = StreamStats()
+    assert stats.observe(0, 0, 0.0)
+    assert stats.observe(1, 20_000, 0.020)
+    assert stats.observe(4, 80_000, 0.100)
+    assert not stats.observe(2, 40_000, 0.101)
+    assert (stats.received, stats.lost, stats.late) == (3, 2, 1)
+    # Only the third frame arrived late relative to its timestamp (by 20 ms)
+    assert stats.jitter_ms == pytest.approx(20 / 16)
+
+
+def test_handshake_negotiates_encoding_and_chunking():
+    protocol = ClientProtocol(chunk_ms=250)
+    welcome = protocol.hello(
+        {"type": "hello", "version": 1, "encodings": ["opus", "ulaw"], "chunk_ms": 5},
+        output_sample_rate=24000,
+        session=2,
+    )
+    assert welcome == {
+        "type": "welcome",
+        "version": 1,
+        "session": 2,
+        "encoding": "ulaw",
+        "sample_rate": 16000,
+        "output_sample_rate": 24000,
+        "chunk_ms": 10,
+    }
+    with pytest.raises(ProtocolError):
+        ClientProtocol().hello({"encodings": ["opus"]}, 16000)
+    with pytest.raises(ProtocolError):
+        ClientProtocol().hello({"version": 2}, 16000)
+    assert ClientProtocol().hello({"sample_rate": 16000}, 16000)["sample_rate"] == 16000
+    with pytest.raises(ProtocolError, match="send 16000 Hz"):
+        ClientProtocol().hello({"sample_rate": 48000}, 16000)
+
+
+def test_legacy_mode_passes_pcm_and_sends_wav_chunks():
+    protocol = ClientProtocol(chunk_ms=10)
+    assert protocol.receive(b"ra") == b"ra"
+    with pytest.raises(ProtocolError, match="odd length"):
+        protocol.receive(b"raw")
+    chunks = list(protocol.audio(bytes(640), 16000))
+    assert [wav_to_pcm(c) for c in chunks] == [(bytes(320), 16000)] * 2
+    assert protocol.message({"text": "hi", "final": True}) == {"text": "hi", "final": True}
+
+
+def test_framed_mode_chunks_and_types_messages():
+    protocol = ClientProtocol(chunk_ms=10)
+    protocol.hello({"encodings": ["pcm16"]}, 16000)
+
+    frames = [unpack_frame(c) for c in protocol.audio(bytes(800), 16000)]
+    assert [f.seq for f in frames] == [0, 1, 2]
+    assert [f.timestamp_us for f in frames] == [0, 10_000, 20_000]
+    assert [len(f.payload) for f in frames] == [320, 320, 160]
+
+    assert protocol.receive(pack_frame(KIND_AUDIO, 0, 0, 0, b"ab")) == b"ab"
+    with pytest.raises(ProtocolError, match="odd length"):
+        protocol.receive(pack_frame(KIND_AUDIO, 0, 1, 0, b"abc"))
+    assert protocol.message({"event": "barge_in"})["type"] == "event"
+    assert protocol.message({"text": "x", "agent": True})["type"] == "reply"
+    assert protocol.message({"text": "x", "final": False})["type"] == "transcript"
@@ -0,0 +1,141 @@
+import asyncio
+import pathlib
+import sys
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from src.backend.core.pipeline import TurnPipeline
+from src.backend.stt import Transcript
+from src.backend.tts.base import TTS
+from src.backend.tts.cache import CachedTTS
+from src.backend.tts.scheduler import JobExpired, TTSScheduler, default_concurrency
+from src.backend.tts.simple import ConsoleTTS
+from test_pipeline import ScriptedSTT, UpperAgent
+
+
+class RecordingTTS(TTS):
+    def __init__(self) -> None:
+        self.spoken = []
+
+    async def speak(self, text: str) -> bytes:
+        raise NotImplementedError
+
+    async def stream(self, text: str):
+        self.spoken.append(text)
+        await asyncio.sleep(0)
+        yield text.encode()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def start_order(scheduler, requests):
+    """Queue ``(name, session, first)`` requests behind a held slot; return the grant order."""
+    order = []
+
+    async def job(name, session, first):
+        await scheduler.acquire(session, first)
+        order.append(name)
+        scheduler.release(session)
+
+    await scheduler.acquire(1)
+    tasks = []
+    for name, session, first in requests:
+        tasks.append(asyncio.create_task(job(name, session, first)))
+        await settle()
+    scheduler.release(1)
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_first_sentences_jump_the_queue():
+    scheduler = TTSScheduler(max_concurrent=1)
+    order = asyncio.run(
+        start_order(scheduler, [("a-rest", 1, False), ("b-rest", 2, False), ("c-first", 3, True)])
+    )
+    # Session 2 was never served, session 1 just was
+    assert order == ["c-first", "b-rest", "a-rest"]
+
+
+def test_sessions_take_turns():
+    scheduler = TTSScheduler(max_concurrent=1)
+    order = asyncio.run(
+        start_order(scheduler, [("a2", 1, False), ("a3", 1, False), ("b1", 2, False)])
+    )
+    assert order == ["b1", "a2", "a3"]
+
+
+def test_stale_jobs_are_dropped_and_waits_measured():
+    waits = []
+    scheduler = TTSScheduler(max_concurrent=1, deadline=0.05, on_wait=lambda s, f: waits.append(f))
+
+    async def run():
+        await scheduler.acquire(1, first=True)
+        with pytest.raises(JobExpired):
+            await scheduler.acquire(2)
+        waiter = asyncio.create_task(scheduler.acquire(3))
+        await settle()
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        scheduler.release(1)
+
+    asyncio.run(run())
+    assert scheduler.dropped == 1
+    assert scheduler.stats()["waiting"] == 0
+    assert scheduler.running == 0
+    assert waits == [True]
+
+
+def test_session_tts_releases_slot_and_skips_queue_for_cached_audio():
+    scheduler = TTSScheduler(max_concurrent=1)
+    cached = CachedTTS(ConsoleTTS())
+
+    async def run():
+        tts = scheduler.session(cached, 1)
+        first = [pcm async for pcm in tts.stream("Hello.", first=True)]
+        assert scheduler.running == 0
+        # Another session holds the only slot; the cached sentence is not queued
+        await scheduler.acquire(2)
+        again = [pcm async for pcm in tts.stream("Hello.")]
+        scheduler.release(2)
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert first == again
+    assert scheduler.started == 2
+
+
+def test_default_concurrency_uses_backend_pool_size():
+    from src.backend.tts.worker import CommandTTS
+
+    assert default_concurrency(CachedTTS(CommandTTS(["cat"], max_concurrency=5))) == 5
+    assert default_concurrency(ConsoleTTS()) == 0
+
+
+def test_pipeline_marks_first_sentence_of_each_reply():
+    firsts = []
+    scheduler = TTSScheduler(on_wait=lambda seconds, first: firsts.append(first))
+
+    async def run():
+        stt, backend = ScriptedSTT(), RecordingTTS()
+        sent = []
+
+        async def send(payload, *args):
+            sent.append(payload)
+
+        pipeline = TurnPipeline(
+            stt, UpperAgent(), scheduler.session(backend, 1), send, send
+        )
+        task = asyncio.create_task(pipeline.run())
+        stt.queue.put_nowait(Transcript("one. two.", is_final=True))
+        stt.queue.put_nowait(None)
+        await task
+        return backend.spoken
+
+    assert asyncio.run(run()) == ["ONE.", "TWO."]
+    assert firsts == [True, False]
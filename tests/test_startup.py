@@ -0,0 +1,23 @@
+import pathlib
+import sys
+from unittest import mock
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from src.backend.core import startup
+from src.backend.core.startup import StartupTimer
+
+
+def test_startup_timer_records_phases_and_marks():
+    with mock.patch.object(startup.time, "perf_counter", side_effect=[10.0, 10.5, 10.6, 12.0]):
+        timer = StartupTimer()
+        with timer.phase("config"):
+            pass
+        timer.add("stt_model", 1.25)
+        timer.mark("ready")
+
+    assert timer.to_dict() == {
+        "phases_ms": {"config": 100.0, "stt_model": 1250.0},
+        "marks_ms": {"ready": 2000.0},
+    }
+    assert timer.report() == "config 100 ms, stt_model 1250 ms | ready 2.00 s"
@@ -1,12 +1,15 @@
 import asyncio
 import pathlib
 import sys
+import threading
+import time
 from unittest import mock
 
 # Allow importing the src package
 sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
 
-from src.backend.stt import VoskStream, Transcript
+from src.backend.audio import ByteRing
+from src.backend.stt import AudioIngestBuffer, DecodePool, VoskStream, Transcript
 
 
 def test_vosk_stream_yields_partial_and_final():
@@ -36,3 +39,198 @@ def test_vosk_stream_yields_partial_and_final():
 
         asyncio.run(run_test())
 
+
+
+def test_decode_pool_pins_streams_to_least_busy_worker():
+    pool = DecodePool(workers=2)
+    try:
+        a = pool.acquire()
+        b = pool.acquire()
+        assert a is not b
+        pool.release(a)
+        assert pool.acquire() is a
+    finally:
+        pool.shutdown()
+
+
+def test_vosk_stream_decodes_off_the_event_loop():
+    with mock.patch("src.backend.stt.streaming.vosk") as m_vosk:
+        rec_instance = mock.Mock()
+        m_vosk.KaldiRecognizer.return_value = rec_instance
+
+        threads = []
+
+        def slow_accept(data):
+            threads.append(threading.get_ident())
+            time.sleep(0.05)
+            return True
+
+        rec_instance.AcceptWaveform.side_effect = slow_accept
+        rec_instance.Result.return_value = "{\"text\": \"hello\"}"
+
+        pool = DecodePool(workers=1)
+        stream = VoskStream("model", decoder=pool)
+
+        async def run_test():
+            lags = []
+
+            async def ticker():
+                loop = asyncio.get_running_loop()
+                while True:
+                    start = loop.time()
+                    await asyncio.sleep(0.005)
+                    lags.append(loop.time() - start - 0.005)
+
+            tick = asyncio.create_task(ticker())
+            for _ in range(3):
+                stream.feed_audio(b"data")
+            gen = stream.stream()
+            results = [await anext(gen) for _ in range(3)]
+            tick.cancel()
+            return results, lags
+
+        try:
+            results, lags = asyncio.run(run_test())
+        finally:
+            stream.close()
+            pool.shutdown()
+
+        assert [t.text for t in results] == ["hello"] * 3
+        assert threading.get_ident() not in threads
+        assert len(set(threads)) == 1
+        assert max(lags) < 0.04
+
+
+def test_ingest_buffer_drops_oldest_when_full():
+    async def run_test():
+        buf = AudioIngestBuffer(max_bytes=4, overflow="drop_oldest")
+        buf.put_nowait(b"aa")
+        buf.put_nowait(b"bb")
+        buf.put_nowait(b"cc")
+        assert buf.depth == 4
+        assert buf.dropped_bytes == 2
+        return [await buf.get(), await buf.get()]
+
+    assert asyncio.run(run_test()) == [b"bb", b"cc"]
+
+
+def test_ingest_buffer_blocks_reader_until_drained():
+    async def run_test():
+        buf = AudioIngestBuffer(max_bytes=4, overflow="block")
+        await buf.put(b"aaaa")
+        put = asyncio.create_task(buf.put(b"bb"))
+        await asyncio.sleep(0)
+        assert not put.done()
+        assert await buf.get() == b"aaaa"
+        await put
+        assert buf.depth == 2
+        assert buf.dropped_bytes == 0
+
+    asyncio.run(run_test())
+
+
+def test_byte_ring_wraps_and_never_overwrites_held_views():
+    ring = ByteRing(8)
+    ring.write(b"abcdef")
+    first = ring.read(4)
+    assert isinstance(first, memoryview) and first == b"abcd"
+    ring.release()
+    ring.write(b"ghij")
+    # Only a read across the end of the ring copies
+    wrapped = ring.read(6)
+    assert isinstance(wrapped, bytes) and wrapped == b"efghij"
+
+    ring.write(b"klmn")
+    held = ring.read(2)
+    ring.write(b"opqrst")
+    # "kl" is still held, so the unread bytes moved to a new buffer
+    assert held == b"kl"
+    assert ring.read(8) == b"mnopqrst"
+    assert len(ring) == 0 and ring.capacity == 8
+
+
+def test_byte_ring_discard_keeps_held_view():
+    ring = ByteRing(8)
+    ring.write(b"abcd")
+    held = ring.read(2)
+    ring.discard(1)
+    ring.write(b"efgh")
+    assert held == b"ab"
+    assert ring.read(5) == b"defgh"
+
+
+def test_ingest_buffer_returns_views_into_its_ring():
+    async def run_test():
+        buf = AudioIngestBuffer(chunk_bytes=4, max_wait=1.0)
+        for frame in (b"ab", b"cd"):
+            buf.put_nowait(bytearray(frame))
+        chunk = await buf.get()
+        assert isinstance(chunk, memoryview)
+        assert chunk == b"abcd"
+        assert buf.chunks_out == 1
+
+    asyncio.run(run_test())
+
+
+def test_vosk_stream_coalesces_small_frames():
+    with mock.patch("src.backend.stt.streaming.vosk") as m_vosk:
+        rec_instance = mock.Mock()
+        m_vosk.KaldiRecognizer.return_value = rec_instance
+        rec_instance.AcceptWaveform.return_value = False
+        rec_instance.PartialResult.return_value = "{\"partial\": \"hel\"}"
+
+        # 10 ms chunks at 16 kHz are 320 bytes
+        stream = VoskStream("model", coalesce_ms=10)
+
+        async def run_test():
+            for _ in range(4):
+                stream.feed_audio(b"\x00" * 80)
+            gen = stream.stream()
+            await anext(gen)
+
+        asyncio.run(run_test())
+
+        rec_instance.AcceptWaveform.assert_called_once_with(b"\x00" * 320)
+        assert stream.buffer.frames_in == 4
+        assert stream.buffer.chunks_out == 1
+
+
+def test_vosk_stream_accepts_custom_recognizer_without_vosk():
+    rec = mock.Mock()
+    rec.AcceptWaveform.return_value = True
+    rec.Result.return_value = '{"text": "hi"}'
+
+    with mock.patch("src.backend.stt.streaming.vosk", None):
+        stream = VoskStream("unused", recognizer=rec)
+
+    async def run_test():
+        stream.feed_audio(b"\0\0")
+        return await anext(stream.stream())
+
+    assert asyncio.run(run_test()) == Transcript(text="hi", is_final=True)
+    assert stream.model is None
+
+
+def test_vosk_stream_skips_repeated_partials():
+    rec = mock.Mock()
+    rec.AcceptWaveform.side_effect = [False, False, False, True, False]
+    rec.PartialResult.side_effect = [
+        '{"partial": "he"}',
+        '{"partial": "he"}',
+        '{"partial": "hello"}',
+        '{"partial": "he"}',
+    ]
+    rec.Result.return_value = '{"text": "hello"}'
+    stream = VoskStream("unused", recognizer=rec)
+
+    results = [stream._decode(b"\0\0") for _ in range(5)]
+
+    assert results == [
+        Transcript("he"),
+        None,
+        Transcript("hello"),
+        Transcript("hello", is_final=True),
+        # The same words after a final start a new utterance
+        Transcript("he"),
+    ]
+    assert stream.partials_skipped == 1
@@ -0,0 +1,101 @@
+import asyncio
+import datetime
+import pathlib
+import sys
+import threading
+from unittest import mock
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from src.backend.core.transcript_log import TranscriptLog
+
+
+def test_lines_are_batched_and_drained_on_close(tmp_path):
+    path = tmp_path / "t.log"
+    log = TranscriptLog(str(path), flush_interval=10)
+
+    async def run():
+        for i in range(5):
+            assert log.write(f"line {i}\n")
+        # Nothing touches the disk from the caller's side
+        assert not path.exists()
+        await log.close()
+
+    asyncio.run(run())
+    assert path.read_text() == "".join(f"line {i}\n" for i in range(5))
+    assert log.written == 5
+    assert log.batches == 1
+
+
+def test_full_queue_drops_lines(tmp_path):
+    log = TranscriptLog(str(tmp_path / "t.log"), max_queue=2)
+
+    async def run():
+        results = [log.write("x\n") for _ in range(3)]
+        await log.close()
+        return results
+
+    assert asyncio.run(run()) == [True, True, False]
+    assert log.dropped == 1
+
+
+def test_close_does_not_wait_for_a_dead_writer(tmp_path, capsys):
+    log = TranscriptLog(str(tmp_path / "t.log"), max_queue=1, batch_size=1)
+    release = threading.Event()
+
+    def fail(lines):
+        release.wait(5)
+        raise RuntimeError("disk on fire")
+
+    log._write_batch = fail
+
+    async def run():
+        log.write("a\n")
+        await asyncio.sleep(0.05)  # The writer is stuck in fail()
+        assert log.write("b\n")  # Fills the queue
+        closing = asyncio.create_task(log.close())
+        await asyncio.sleep(0.05)
+        release.set()
+        await asyncio.wait_for(closing, 5)
+
+    asyncio.run(run())
+    assert "disk on fire" in capsys.readouterr().err
+    assert log.dropped == 1
+
+
+def test_rotates_by_size(tmp_path):
+    path = tmp_path / "t.log"
+    log = TranscriptLog(str(path), max_bytes=10, batch_size=1, backup_count=2)
+
+    async def run():
+        for text in ("aaaaaa\n", "bbbbbb\n", "cccccc\n", "dddddd\n"):
+            log.write(text)
+        await log.close()
+
+    asyncio.run(run())
+    assert path.read_text() == "dddddd\n"
+    assert (tmp_path / "t.log.1").read_text() == "cccccc\n"
+    assert (tmp_path / "t.log.2").read_text() == "bbbbbb\n"
+    assert not (tmp_path / "t.log.3").exists()
+
+
+def test_rotates_daily(tmp_path):
+    path = tmp_path / "t.log"
+    log = TranscriptLog(str(path), daily=True, batch_size=1)
+    days = [datetime.date(2024, 1, 1), datetime.date(2024, 1, 1), datetime.date(2024, 1, 2)]
+
+    class FakeDate(datetime.date):
+        @classmethod
+        def today(cls):
+            return days.pop(0) if len(days) > 1 else days[0]
+
+    async def run():
+        log.write("old\n")
+        await asyncio.sleep(0.05)
+        log.write("new\n")
+        await log.close()
+
+    with mock.patch("src.backend.core.transcript_log.datetime.date", FakeDate):
+        asyncio.run(run())
+    assert (tmp_path / "t.log.2024-01-01").read_text() == "old\n"
+    assert path.read_text() == "new\n"
@@ -0,0 +1,471 @@
+import asyncio
+import functools
+import math
+import os
+import pathlib
+import stat
+import sys
+import time
+import types
+from unittest import mock
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.backend.tts import simple
+from src.backend.audio import wav_bytes, wav_to_pcm
+from src.backend.tts.base import TTS
+from src.backend.tts.cache import CachedTTS
+from src.backend.tts.service import ProcessPoolTTS
+from src.backend.tts.simple import ConsoleTTS, tone
+from src.backend.tts.text import split_sentences
+from src.backend.tts.worker import CommandTTS
+
+
+async def collect(agen):
+    return [chunk async for chunk in agen]
+
+
+def test_split_sentences_on_punctuation():
+    assert split_sentences("Hi there. How are you? Great!") == [
+        "Hi there.",
+        "How are you?",
+        "Great!",
+    ]
+
+
+def test_split_sentences_breaks_long_sentences_at_clauses():
+    text = "one two three, four five six, seven eight nine."
+    assert split_sentences(text, max_chars=20) == [
+        "one two three,",
+        "four five six,",
+        "seven eight nine.",
+    ]
+
+
+def test_default_stream_speaks_each_sentence():
+    class WavTTS(TTS):
+        def __init__(self) -> None:
+            self.spoken = []
+
+        async def speak(self, text: str) -> bytes:
+            self.spoken.append(text)
+            return wav_bytes(text.encode() * 2, 16000)
+
+    tts = WavTTS()
+    chunks = asyncio.run(collect(tts.stream("First one. Second one.")))
+
+    assert tts.spoken == ["First one.", "Second one."]
+    assert chunks == [b"First one." * 2, b"Second one." * 2]
+
+
+def test_console_tts_streams_pcm_per_sentence():
+    tts = ConsoleTTS()
+    chunks = asyncio.run(collect(tts.stream("One. Two.")))
+    pcm, sr = wav_to_pcm(asyncio.run(tts.speak("One.")))
+
+    assert sr == tts.sample_rate
+    assert chunks == [pcm, pcm]
+
+
+def test_console_tts_duration_scales_with_text():
+    tts = ConsoleTTS(seconds_per_char=0.1, min_seconds=0.0)
+    short, _ = wav_to_pcm(asyncio.run(tts.speak("Hi")))
+    long, _ = wav_to_pcm(asyncio.run(tts.speak("Hi" * 10)))
+    assert len(short) == 2 * 3200
+    assert len(long) == 10 * len(short)
+
+
+def test_tone_matches_sine_and_is_memoized():
+    pcm = tone(16000, 440, 1000)
+    assert len(pcm) == 2000
+    assert tone(16000, 440, 1000) is pcm
+    sample = int.from_bytes(pcm[2 * 417 : 2 * 418], "little", signed=True)
+    assert sample == int(math.sin(2 * math.pi * 440 * 417 / 16000) * 32767)
+
+
+def test_tone_cache_is_bounded_by_bytes(monkeypatch):
+    monkeypatch.setattr(simple, "TONE_CACHE_BYTES", 5000)
+    monkeypatch.setattr(simple, "_tones", simple.OrderedDict())
+    monkeypatch.setattr(simple, "_tones_size", 0)
+    first = tone(16000, 440, 1000)
+    tone(16000, 440, 1001)
+    assert tone(16000, 440, 1000) is first
+    tone(16000, 440, 1002)  # 6006 bytes in all: the least recent goes
+    assert list(simple._tones) == [(16000, 440, 1000), (16000, 440, 1002)]
+    assert simple._tones_size == 4004
+    # Too big to keep at all
+    assert len(tone(16000, 440, 3000)) == 6000
+    assert simple._tones_size == 4004
+
+
+def test_console_tts_streams_fixed_size_chunks_at_simulated_speed():
+    tts = ConsoleTTS(seconds_per_char=0.0, min_seconds=0.1, chunk_ms=40, speed=2.0)
+    start = time.monotonic()
+    chunks = asyncio.run(collect(tts.stream("Hello.")))
+    elapsed = time.monotonic() - start
+
+    assert [len(c) for c in chunks] == [1280, 1280, 640]
+    assert elapsed >= 0.05
+
+
+def test_orpheus_streams_each_sentence_as_pcm():
+    synth = mock.Mock()
+    synth.sample_rate = 22050
+    synth.tts.side_effect = lambda text: wav_bytes(b"\1\0" * len(text), 22050)
+    fake = types.SimpleNamespace(Synthesizer=mock.Mock(return_value=synth))
+    with mock.patch.dict(sys.modules, {"orpheus_speech": fake}):
+        from src.backend.tts.orpheus import OrpheusStyleTTS
+
+        tts = OrpheusStyleTTS("m")
+        chunks = asyncio.run(collect(tts.stream("Hi. Bye now.")))
+
+    assert tts.sample_rate == 22050
+    assert [c.count(b"\1\0") for c in chunks] == [3, 8]
+
+
+class CountingTTS(TTS):
+    voice = "v"
+
+    def __init__(self) -> None:
+        self.calls = []
+
+    async def speak(self, text: str) -> bytes:
+        self.calls.append(text)
+        return wav_bytes(text.encode() * 2, 16000)
+
+    async def stream(self, text: str):
+        self.calls.append(text)
+        yield text.encode() * 2
+
+
+def test_cached_tts_reuses_audio_for_normalized_text():
+    inner = CountingTTS()
+    tts = CachedTTS(inner)
+
+    async def run():
+        first = await tts.speak("Hello  there")
+        second = await tts.speak("hello there ")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second
+    assert inner.calls == ["Hello  there"]
+    assert tts.stats()["hits"] == 1
+    assert tts.stats()["misses"] == 1
+
+
+def test_cached_tts_streams_cached_sentences():
+    inner = CountingTTS()
+    tts = CachedTTS(inner)
+
+    asyncio.run(collect(tts.stream("Sure. One.")))
+    chunks = asyncio.run(collect(tts.stream("Sure. Two.")))
+
+    assert inner.calls == ["Sure.", "One.", "Two."]
+    assert chunks == [b"Sure." * 2, b"Two." * 2]
+
+
+def test_cached_tts_warms_engine_and_preloads_phrases():
+    inner = CountingTTS()
+    tts = CachedTTS(inner)
+
+    asyncio.run(tts.preload(["One moment. Sure."]))
+    asyncio.run(tts.warm_up(["Sure."]))
+
+    # Warm-up reaches the engine even for cached text
+    assert inner.calls == ["One moment.", "Sure.", "Sure."]
+    assert tts.cached("Sure. One moment.")
+
+
+def test_cached_tts_evicts_least_recently_used():
+    inner = CountingTTS()
+    tts = CachedTTS(inner, max_bytes=25)
+
+    async def run():
+        for text in ["aaaa.", "bbbb.", "aaaa.", "cccc."]:
+            await collect(tts.stream(text))
+
+    asyncio.run(run())
+
+    assert tts.evictions == 1
+    assert tts.size == 20
+    assert inner.calls == ["aaaa.", "bbbb.", "cccc."]
+    # "bbbb." was the least recently used entry
+    asyncio.run(collect(tts.stream("aaaa.")))
+    asyncio.run(collect(tts.stream("bbbb.")))
+    assert inner.calls[-1] == "bbbb."
+    assert tts.hits == 2
+
+
+def test_cached_tts_persists_to_disk(tmp_path):
+    asyncio.run(CachedTTS(CountingTTS(), cache_dir=str(tmp_path)).speak("Hi"))
+
+    inner = CountingTTS()
+    tts = CachedTTS(inner, cache_dir=str(tmp_path))
+    audio = asyncio.run(tts.speak("Hi"))
+
+    assert inner.calls == []
+    assert tts.disk_hits == 1
+    assert wav_to_pcm(audio)[0] == b"HiHi"
+
+
+def test_cached_tts_concurrent_misses_write_once(tmp_path):
+    tts = CachedTTS(CountingTTS(), cache_dir=str(tmp_path))
+
+    async def run():
+        return await asyncio.gather(*(collect(tts.stream("One. Two.")) for _ in range(8)))
+
+    results = asyncio.run(run())
+    assert all(chunks == [b"One." * 2, b"Two." * 2] for chunks in results)
+    assert tts.disk_errors == 0
+    files = sorted(p.name for p in tmp_path.rglob("*") if p.is_file())
+    assert len(files) == 2 and not any(name.endswith(".tmp") for name in files)
+
+
+def test_cached_tts_survives_disk_errors(tmp_path):
+    blocked = tmp_path / "not-a-dir"
+    blocked.write_bytes(b"")
+    tts = CachedTTS(CountingTTS(), cache_dir=str(blocked))
+
+    chunks = asyncio.run(collect(tts.stream("Hello.")))
+
+    assert chunks == [b"Hello." * 2]
+    # The lookup and the write both fail
+    assert tts.disk_errors == 2
+    assert tts.cached("Hello.")
+
+
+def test_cache_key_depends_on_voice():
+    inner = CountingTTS()
+    tts = CachedTTS(inner)
+    key = tts.key("hi", "pcm")
+    inner.voice = "other"
+    assert tts.key("hi", "pcm") != key
+
+
+def test_cache_key_depends_on_command_line():
+    from src.backend.tts.worker import CommandTTS
+
+    def key(argv):
+        return CachedTTS(CommandTTS(argv, 22050)).key("hi", "pcm")
+
+    assert key(["piper", "--model", "a.onnx"]) != key(["piper", "--model", "b.onnx"])
+    assert key(["piper", "--model", "a.onnx"]) == key(["piper", "--model", "a.onnx"])
+
+
+def fake_engine(tmp_path, body):
+    script = tmp_path / "engine"
+    script.write_text(f"#!{sys.executable}\nimport sys\n{body}\n")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return [str(script)]
+
+
+ECHO = "sys.stdout.buffer.write(sys.stdin.buffer.read())"
+
+
+FAKE_SAY = """
+args = sys.argv[1:]
+assert args[args.index("-f") + 1] == "-"
+assert args[args.index("-v") + 1] == "Alex"
+text = sys.stdin.buffer.read()
+with open(args[args.index("-o") + 1], "wb") as fh:
+    fh.write(b"RIFF\\0\\0\\0\\0WAVEdata\\0\\0\\0\\0" + text)
+"""
+
+
+def test_macsay_renders_to_a_file_and_streams_it(tmp_path, monkeypatch):
+    from src.backend.tts.macsay import MacSayTTS
+
+    (tmp_path / "say").symlink_to(fake_engine(tmp_path, FAKE_SAY)[0])
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    async def run():
+        tts = MacSayTTS(voice="Alex", warm=0)
+        try:
+            chunks = await collect(tts.stream("Hello."))
+            assert os.listdir(tts.tmpdir) == []
+            return chunks
+        finally:
+            await tts.close()
+            assert not os.path.exists(tts.tmpdir)
+
+    assert b"".join(asyncio.run(run())) == b"Hello."
+
+
+def test_macsay_workers_stop_with_their_say_process(tmp_path, monkeypatch):
+    from src.backend.tts.macsay import MacSayTTS
+
+    # Idle workers block on stdin; this one also renders slowly
+    slow_say = "import time\ntime.sleep(30 if sys.stdin.buffer.read() else 0)"
+    (tmp_path / "say").symlink_to(fake_engine(tmp_path, slow_say)[0])
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    async def run():
+        tts = MacSayTTS(voice="Alex", warm=1)
+        await tts.pool.start()
+        start = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(collect(tts.stream("Hello.")), 0.5)
+        cancelled = time.monotonic() - start
+        await asyncio.wait_for(tts.close(), 5)
+        return cancelled, tts.tmpdir
+
+    cancelled, tmpdir = asyncio.run(run())
+    assert cancelled < 3
+    assert not os.path.exists(tmpdir)
+
+
+def test_command_tts_streams_engine_output(tmp_path):
+    async def run():
+        tts = CommandTTS(fake_engine(tmp_path, ECHO), warm=0)
+        chunks = await collect(tts.stream("Hi. Yo."))
+        audio = await tts.speak("Hey!")
+        await tts.close()
+        return chunks, audio
+
+    chunks, audio = asyncio.run(run())
+    assert chunks == [b"Hi", b"Yo"]
+    assert wav_to_pcm(audio) == (b"Hey!", 16000)
+
+
+def test_command_tts_strips_wav_header(tmp_path):
+    body = (
+        "from src.backend.audio import wav_bytes\n"
+        "sys.stdout.buffer.write(wav_bytes(sys.stdin.buffer.read(), 16000))"
+    )
+    engine = fake_engine(tmp_path, f"sys.path.insert(0, {str(ROOT)!r})\n{body}")
+
+    async def run():
+        tts = CommandTTS(engine, warm=0)
+        pcm = b"".join(await collect(tts.stream("abcd")))
+        await tts.close()
+        return pcm
+
+    assert asyncio.run(run()) == b"abcd"
+
+
+def test_command_tts_reuses_warm_workers(tmp_path):
+    async def run():
+        tts = CommandTTS(fake_engine(tmp_path, ECHO), warm=1)
+        await tts.pool.start()
+        assert tts.pool.spawned == 1
+        await tts.speak("one")
+        await asyncio.sleep(0)
+        spawned = tts.pool.spawned
+        await tts.close()
+        return spawned
+
+    # The first request used the pre-spawned worker; one refill replaced it
+    assert asyncio.run(run()) == 2
+
+
+def test_command_tts_raises_on_engine_failure(tmp_path):
+    async def run():
+        tts = CommandTTS(fake_engine(tmp_path, "sys.exit(3)"), warm=0)
+        try:
+            await tts.speak("hi")
+        finally:
+            await tts.close()
+
+    with pytest.raises(RuntimeError, match="status 3"):
+        asyncio.run(run())
+
+
+def failing_engine():
+    raise RuntimeError("no model")
+
+
+def test_process_pool_tts_streams_from_workers():
+    pool = ProcessPoolTTS(functools.partial(ConsoleTTS, 22050), processes=1)
+    assert pool.sample_rate == 22050
+    assert pool.engine == "ConsoleTTS"
+
+    async def run():
+        try:
+            await pool.warm_up(["Warm up."])
+            return await collect(pool.stream("Hello. Bye.")), await pool.speak("Hi")
+        finally:
+            await pool.close()
+
+    chunks, wav = asyncio.run(run())
+    local = ConsoleTTS(22050)
+    assert chunks == [local._render("Hello."), local._render("Bye.")]
+    assert wav_to_pcm(wav) == (local._render("Hi"), 22050)
+
+
+def test_process_pool_tts_batches_concurrent_sentences():
+    pool = ProcessPoolTTS(
+        functools.partial(ConsoleTTS, speed=20.0), processes=1, max_batch=8, max_wait_ms=20
+    )
+
+    async def run():
+        try:
+            return await asyncio.gather(*(pool.synthesize(f"reply {i}") for i in range(8)))
+        finally:
+            await pool.close()
+
+    results = asyncio.run(run())
+    assert all(results)
+    assert pool.requests == 8
+    assert pool.batches < 8
+    assert pool.batched_requests >= 2
+
+
+def test_process_pool_tts_reports_engine_errors():
+    with pytest.raises(RuntimeError, match="no model"):
+        ProcessPoolTTS(failing_engine)
+
+
+class CrashingTTS(ConsoleTTS):
+    """Kills its worker process when asked to say ``crash``."""
+
+    def synthesize_batch(self, texts):
+        if "crash" in texts:
+            os._exit(1)
+        return super().synthesize_batch(texts)
+
+
+def test_process_pool_tts_replaces_dead_worker_and_retries():
+    pool = ProcessPoolTTS(CrashingTTS, processes=1)
+
+    async def run():
+        try:
+            await pool.synthesize("warm")
+            pool._workers[0].process.kill()
+            pool._workers[0].process.join()
+            # Sent again to the replacement
+            assert await pool.synthesize("resent")
+            # Kills the replacement too, so it fails, once
+            with pytest.raises(RuntimeError, match="exited"):
+                await pool.synthesize("crash")
+            return await pool.synthesize("back")
+        finally:
+            await pool.close()
+
+    assert asyncio.run(run())
+    assert pool.restarts == 3
+
+
+def test_process_pool_tts_fails_fast_without_workers():
+    pool = ProcessPoolTTS(ConsoleTTS, processes=1)
+
+    async def run():
+        try:
+            await pool.synthesize("warm")
+            pool.factory = failing_engine
+            pool._workers[0].process.kill()
+            pool._workers[0].process.join()
+            results = await asyncio.gather(
+                *(pool.synthesize(f"lost {i}") for i in range(3)), return_exceptions=True
+            )
+            assert all(isinstance(r, RuntimeError) for r in results)
+            with pytest.raises(RuntimeError, match="No TTS workers"):
+                await pool.synthesize("later")
+        finally:
+            await pool.close()
+
+    asyncio.run(asyncio.wait_for(run(), 60))
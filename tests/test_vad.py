@@ -0,0 +1,107 @@
+import asyncio
+import math
+import pathlib
+import struct
+import sys
+from unittest import mock
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from src.backend.stt import Transcript, VoiceActivityDetector, VoskStream
+from src.backend.stt.vad import frame_stats
+
+FRAME = 320  # samples in 20 ms at 16 kHz
+
+
+def tone(frames: int, amplitude: int = 8000) -> bytes:
+    n = frames * FRAME
+    return b"".join(
+        struct.pack("<h", int(amplitude * math.sin(2 * math.pi * 200 * i / 16000)))
+        for i in range(n)
+    )
+
+
+def silence(frames: int) -> bytes:
+    return b"\0\0" * frames * FRAME
+
+
+def make_vad(**kwargs):
+    opts = dict(frame_ms=20, hangover_ms=40, preroll_ms=40, endpoint_ms=100)
+    opts.update(kwargs)
+    return VoiceActivityDetector(16000, **opts)
+
+
+def test_frame_stats_measures_level_and_crossings():
+    levels, rates = frame_stats(tone(2) + silence(2), 640)
+    assert levels[0] > 5000 and levels[2] == 0
+    assert 0 < rates[0] < 0.05 and rates[2] == 0
+
+
+def test_vad_drops_silence_and_keeps_preroll_and_hangover():
+    vad = make_vad()
+    speech = tone(4)
+    out, endpoint = vad.process(silence(20) + speech + silence(20))
+
+    # 40 ms pre-roll + speech + 40 ms hangover
+    assert out == silence(2) + speech + silence(2)
+    assert endpoint
+    assert vad.frames_total == 44
+    assert vad.frames_skipped > 0
+
+
+def test_vad_keeps_partial_frames_for_the_next_call():
+    vad = make_vad(preroll_ms=0)
+    speech = tone(4)
+    first, _ = vad.process(speech[:500])
+    second, _ = vad.process(speech[500:])
+    assert first + second == speech
+
+
+def test_frame_stats_counts_every_sign_change():
+    samples = [1000, -1000, -5, 7, 0, -1] * 53 + [3, 4]
+    pcm = struct.pack(f"<{len(samples)}h", *samples)
+    _, rates = frame_stats(pcm, 640)
+    changes = sum((a < 0) != (b < 0) for a, b in zip(samples, samples[1:]))
+    assert rates == [changes / 319]
+
+
+def test_vad_passes_speech_through_without_copying():
+    vad = make_vad()
+    speech = tone(4)
+    out, _ = vad.process(speech)
+    assert isinstance(out, memoryview) and out == speech
+
+    # Pre-roll frames outlive the buffer they came from
+    buf = bytearray(silence(2))
+    vad = make_vad()
+    vad.process(memoryview(buf))
+    buf[:] = tone(2)
+    out, _ = vad.process(speech)
+    assert out == silence(2) + speech
+
+
+def test_vosk_stream_skips_silence_and_forces_final_on_endpoint():
+    with mock.patch("src.backend.stt.streaming.vosk") as m_vosk:
+        rec = mock.Mock()
+        m_vosk.KaldiRecognizer.return_value = rec
+        rec.AcceptWaveform.return_value = False
+        rec.PartialResult.return_value = "{\"partial\": \"hi\"}"
+        rec.FinalResult.return_value = "{\"text\": \"hi\"}"
+
+        stream = VoskStream("model", vad=make_vad(preroll_ms=0, hangover_ms=0))
+
+        async def run_test():
+            stream.feed_audio(silence(20))
+            stream.feed_audio(tone(4))
+            stream.feed_audio(silence(20))
+            gen = stream.stream()
+            return [await anext(gen), await anext(gen)]
+
+        results = asyncio.run(run_test())
+
+        assert results == [
+            Transcript(text="hi", is_final=False),
+            Transcript(text="hi", is_final=True),
+        ]
+        rec.AcceptWaveform.assert_called_once_with(tone(4))
+        assert stream.stats()["vad_frames_skipped"] == 40
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import os
+import pathlib
+import signal
+import sys
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from src.backend.core import workers
+from src.backend.core.workers import (
+    WorkerSupervisor,
+    aggregate_metrics,
+    listen_socket,
+    worker_log_path,
+)
+
+websockets = pytest.importorskip("websockets")
+
+
+def test_aggregate_metrics_labels_and_groups_samples():
+    text = (
+        "# HELP sessions_active Open sessions\n"
+        "# TYPE sessions_active gauge\n"
+        "sessions_active {n}\n"
+        "# HELP span_seconds Spans\n"
+        "# TYPE span_seconds histogram\n"
+        'span_seconds_bucket{{span="stt",le="+Inf"}} {n}\n'
+    )
+    merged = aggregate_metrics({"0": text.format(n=1), "1": text.format(n=2)})
+
+    assert merged.splitlines() == [
+        "# HELP sessions_active Open sessions",
+        "# TYPE sessions_active gauge",
+        'sessions_active{worker="0"} 1',
+        'sessions_active{worker="1"} 2',
+        "# HELP span_seconds Spans",
+        "# TYPE span_seconds histogram",
+        'span_seconds_bucket{span="stt",le="+Inf",worker="0"} 1',
+        'span_seconds_bucket{span="stt",le="+Inf",worker="1"} 2',
+    ]
+
+
+def test_worker_log_path():
+    assert worker_log_path("logs/transcript.log", 2) == "logs/transcript-2.log"
+    assert worker_log_path(None, 0) is None
+
+
+@pytest.mark.skipif(not workers.REUSE_PORT, reason="needs SO_REUSEPORT")
+def test_listen_sockets_share_a_port():
+    first = listen_socket("127.0.0.1", 0)
+    port = first.getsockname()[1]
+    second = listen_socket("127.0.0.1", port)
+    assert second.getsockname()[1] == port
+    first.close()
+    second.close()
+
+
+class FakeServer:
+    """Stands in for ``AudioWebSocketServer.run`` with a status endpoint."""
+
+    def __init__(self, metrics_socket):
+        from src.backend.core.metrics import MetricsRegistry, MetricsServer
+
+        self.registry = MetricsRegistry()
+        self.registry.gauge("pid", "Worker pid").set(os.getpid())
+        self.metrics = MetricsServer(self.registry, path=metrics_socket)
+
+    async def _handler(self, websocket):
+        async for _ in websocket:
+            await websocket.send(json.dumps({"pid": os.getpid()}))
+
+    async def run(self, sock, on_ready, drain_timeout):
+        await self.metrics.start()
+        async with websockets.serve(self._handler, sock=sock):
+            on_ready()
+            await asyncio.Future()
+
+
+async def worker_pid(port):
+    async with websockets.connect(f"ws://127.0.0.1:{port}") as ws:
+        await ws.send("status")
+        return json.loads(await ws.recv())["pid"]
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="needs fork and signals")
+def test_supervisor_serves_replaces_and_restarts_workers(tmp_path):
+    async def scenario():
+        supervisor = WorkerSupervisor(
+            lambda index, path: FakeServer(path),
+            2,
+            host="127.0.0.1",
+            port=0,
+            metrics_socket=str(tmp_path / "metrics.sock"),
+            drain_timeout=1,
+        )
+        task = asyncio.create_task(supervisor.run())
+        while len(supervisor.slots) < 2 or not all(
+            w.ready.is_set() for w in supervisor.slots.values()
+        ):
+            await asyncio.sleep(0.05)
+        pids = {w.process.pid for w in supervisor.slots.values()}
+        assert await worker_pid(supervisor.port) in pids
+
+        text = await supervisor.render()
+        assert "workers_alive 2\n" in text
+        assert 'worker="0"' in text and 'worker="1"' in text
+
+        os.kill(supervisor.slots[0].process.pid, signal.SIGKILL)
+        while supervisor.slots[0].process.pid in pids or not supervisor.slots[0].ready.is_set():
+            await asyncio.sleep(0.05)
+        assert 'worker_restarts_total{reason="exit"} 1' in await supervisor.render()
+
+        before = {w.process.pid for w in supervisor.slots.values()}
+        await supervisor.restart()
+        after = {w.process.pid for w in supervisor.slots.values()}
+        assert not before & after
+        assert await worker_pid(supervisor.port) in after
+
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.wait_for(task, 10)
+        assert not any(w.alive for w in supervisor.slots.values())
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGHUP"), reason="needs fork and signals")
+def test_supervisor_retries_a_crashing_replacement_and_keeps_serving(tmp_path):
+    crash = tmp_path / "crash"
+
+    def build(index, path):
+        if index == 0 and crash.exists():
+            os._exit(3)
+        return FakeServer(path)
+
+    async def scenario():
+        supervisor = WorkerSupervisor(
+            build, 2, host="127.0.0.1", port=0, drain_timeout=1, restart_backoff=0.1
+        )
+        task = asyncio.create_task(supervisor.run())
+        while len(supervisor.slots) < 2 or not all(
+            w.ready.is_set() for w in supervisor.slots.values()
+        ):
+            await asyncio.sleep(0.05)
+        survivor = supervisor.slots[1].process.pid
+
+        crash.touch()
+        os.kill(supervisor.slots[0].process.pid, signal.SIGKILL)
+        while supervisor._failures.get(0, 0) < 2:
+            assert not task.done()
+            await asyncio.sleep(0.05)
+        assert supervisor.slots[1].process.pid == survivor
+        assert await worker_pid(supervisor.port) == survivor
+
+        crash.unlink()
+        while 0 in supervisor._failures:
+            await asyncio.sleep(0.05)
+        assert supervisor.slots[0].ready.is_set()
+
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.wait_for(task, 10)
+
+    asyncio.run(scenario())
@@ -9,9 +9,15 @@ import pytest
 sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
 
 from src.backend.core import websocket_server
+from src.backend.core.partials import PartialPolicy
+from src.backend.core.protocol import KIND_AUDIO, ClientProtocol, pack_frame
 from src.backend.core.websocket_server import AudioWebSocketServer
 from src.backend.config import BackendConfig, ServerConfig
 from src.backend.stt import Transcript
+from src.backend.tts.base import TTS
+from src.backend.tts.cache import CachedTTS
+from src.backend.agent.base import Agent
+from src.backend.audio import ulaw_decode, ulaw_encode, wav_bytes
 
 
 class DummyWebSocket:
@@ -31,12 +37,12 @@ class DummyWebSocket:
         self.sent.append(data)
 
 
-class DummyAgent:
+class DummyAgent(Agent):
     async def process(self, text: str) -> str:
         return text.upper()
 
 
-class DummyTTS:
+class DummyTTS(TTS):
     def __init__(self) -> None:
         self.spoken = []
 
@@ -44,83 +50,192 @@ class DummyTTS:
         self.spoken.append(text)
         return b"audio"
 
+    async def stream(self, text: str):
+        self.spoken.append(text)
+        yield b"au"
+        yield b"dio"
+
+
+def patch_stt():
+    """Patch model loading and recognizer creation used by the sessions."""
+    return mock.patch(
+        "src.backend.core.sessions.load_model"
+    ), mock.patch("src.backend.core.sessions.VoskStream")
+
+
+def make_stream():
+    stream = mock.Mock()
+    stream.put_audio = mock.AsyncMock()
+    stream.stats.return_value = {"vad_frames_skipped": 1}
+    return stream
+
 
 def test_handler_feeds_audio():
-    dummy_ws = DummyWebSocket([b"a", b"b"])
+    dummy_ws = DummyWebSocket([b"aa", b"bb"])
 
-    async def dummy_send(self, ws):
+    async def dummy_run(self):
         return None
 
+    p_model, p_stream = patch_stt()
     with mock.patch(
         "src.backend.core.websocket_server.websockets", mock.Mock()
-    ), mock.patch(
-        "src.backend.core.websocket_server.VoskStream"
-    ) as m_vosk, mock.patch.object(
-        AudioWebSocketServer, "_send_transcripts", dummy_send
+    ), p_model, p_stream as m_vosk, mock.patch.object(
+        websocket_server.TurnPipeline, "run", dummy_run
     ):
-        stt_instance = mock.Mock()
+        stt_instance = make_stream()
         m_vosk.return_value = stt_instance
 
         server = AudioWebSocketServer("model", transcript_log=None, tts=DummyTTS())
         asyncio.run(server._handler(dummy_ws))
 
-        assert stt_instance.feed_audio.call_count == 2
-        assert server.bytes_received == 2
+        # The model loads when the first client needs it
+        assert [json.loads(m) for m in dummy_ws.sent] == [
+            {"event": "loading"},
+            {"event": "ready"},
+        ]
+        assert server.sessions.ready
+        assert stt_instance.put_audio.await_count == 2
+        assert server.bytes_received == 4
+        assert len(server.sessions) == 0
+
+
+def test_handler_gives_each_connection_its_own_stream():
+    async def dummy_run(self):
+        return None
+
+    p_model, p_stream = patch_stt()
+    with mock.patch(
+        "src.backend.core.websocket_server.websockets", mock.Mock()
+    ), p_model as m_load, p_stream as m_vosk, mock.patch.object(
+        websocket_server.TurnPipeline, "run", dummy_run
+    ):
+        streams = [make_stream(), make_stream()]
+        m_vosk.side_effect = streams
+
+        server = AudioWebSocketServer("model", transcript_log=None, tts=DummyTTS())
+
+        async def run():
+            await asyncio.gather(
+                server._handler(DummyWebSocket([b"aa"])),
+                server._handler(DummyWebSocket([b"bb", b"cc"])),
+            )
+
+        asyncio.run(run())
+
+        m_load.assert_called_once_with("model")
+        assert streams[0].put_audio.await_args_list == [mock.call(b"aa")]
+        assert streams[1].put_audio.await_args_list == [
+            mock.call(b"bb"),
+            mock.call(b"cc"),
+        ]
+        for call in m_vosk.call_args_list:
+            assert call.kwargs["model"] is m_load.return_value
+        assert server.sessions.stats()["vad_frames_skipped"] == 2
+
+
+def test_handler_closes_session_when_pipeline_fails():
+    async def failing_run(self):
+        raise RuntimeError("stage crashed")
+
+    class EndlessWebSocket(DummyWebSocket):
+        async def __anext__(self):
+            await asyncio.sleep(0.01)
+            return b"a"
+
+    ws = EndlessWebSocket()
+    ws.close = mock.AsyncMock()
+    p_model, p_stream = patch_stt()
+    with mock.patch(
+        "src.backend.core.websocket_server.websockets", mock.Mock()
+    ), p_model, p_stream as m_vosk, mock.patch.object(
+        websocket_server.TurnPipeline, "run", failing_run
+    ):
+        m_vosk.return_value = make_stream()
+        server = AudioWebSocketServer("model", transcript_log=None, tts=DummyTTS())
+        asyncio.run(asyncio.wait_for(server._handler(ws), 5))
 
+    assert ws.close.await_args.args[0] == 1011
+    assert len(server.sessions) == 0
 
-def test_send_transcripts_sends_messages():
+
+def test_handler_rejects_connections_over_limit():
+    p_model, p_stream = patch_stt()
+    with mock.patch(
+        "src.backend.core.websocket_server.websockets", mock.Mock()
+    ), p_model, p_stream:
+        server = AudioWebSocketServer(
+            "model", transcript_log=None, tts=DummyTTS(), max_sessions=1
+        )
+        server.sessions.load()
+        server.sessions.open()
+        ws = DummyWebSocket([b"a"])
+        ws.close = mock.AsyncMock()
+
+        asyncio.run(server._handler(ws))
+
+        ws.close.assert_awaited_once()
+        assert ws.close.await_args.args[0] == 1013
+        assert ws.messages == [b"a"]
+
+
+def test_pipeline_sends_messages():
     async def gen():
         yield Transcript(text="hi", is_final=False)
         yield Transcript(text="bye", is_final=True)
 
     dummy_ws = DummyWebSocket()
 
+    p_model, p_stream = patch_stt()
     with mock.patch(
         "src.backend.core.websocket_server.websockets", mock.Mock()
-    ), mock.patch("src.backend.core.websocket_server.VoskStream") as m_vosk:
+    ), p_model, p_stream:
         stt_instance = mock.Mock()
         stt_instance.stream.return_value = gen()
-        m_vosk.return_value = stt_instance
 
         server = AudioWebSocketServer("model", transcript_log=None)
         server.agent = DummyAgent()
         server.tts = DummyTTS()
-        asyncio.run(server._send_transcripts(dummy_ws))
+        asyncio.run(server._make_pipeline(dummy_ws, stt_instance).run())
 
         assert dummy_ws.sent == [
             json.dumps({"text": "hi", "final": False}),
             json.dumps({"text": "bye", "final": True}),
-            b"audio",
+            wav_bytes(b"au", 16000),
+            wav_bytes(b"dio", 16000),
             json.dumps({"text": "BYE", "final": True, "agent": True}),
         ]
         assert server.tts.spoken == ["BYE"]
 
 
-def test_send_transcripts_logs_transcripts(tmp_path):
+def test_pipeline_logs_transcripts(tmp_path):
     async def gen():
         yield Transcript(text="hello", is_final=True)
 
     dummy_ws = DummyWebSocket()
 
+    p_model, p_stream = patch_stt()
     with mock.patch(
         "src.backend.core.websocket_server.websockets", mock.Mock()
-    ), mock.patch("src.backend.core.websocket_server.VoskStream") as m_vosk:
+    ), p_model, p_stream:
         stt_instance = mock.Mock()
         stt_instance.stream.return_value = gen()
-        m_vosk.return_value = stt_instance
 
         log_file = tmp_path / "t.log"
         server = AudioWebSocketServer("model", transcript_log=str(log_file))
         server.agent = DummyAgent()
         server.tts = DummyTTS()
+        async def run():
+            await server._make_pipeline(dummy_ws, stt_instance).run()
+            await server.transcript_log.close()
+
         with mock.patch.object(server, "_timestamp", return_value="2021-01-01 00:00:00.000"):
-            asyncio.run(server._send_transcripts(dummy_ws))
+            asyncio.run(run())
 
         assert log_file.read_text() == (
             "2021-01-01 00:00:00.000 < hello\n"
             "2021-01-01 00:00:00.000 > HELLO\n"
         )
-        assert dummy_ws.sent[1] == b"audio"
+        assert dummy_ws.sent[1] == wav_bytes(b"au", 16000)
         assert server.tts.spoken == ["HELLO"]
 
 
@@ -143,6 +258,23 @@ def test_main_starts_server():
             transcript_log="transcript.log",
             agent=mock.ANY,
             tts=mock.ANY,
+            max_sessions=0,
+            stt_config=mock.ANY,
+            turn_policy="queue",
+            max_pending_turns=2,
+            barge_in=True,
+            transcript_log_max_mb=0,
+            transcript_log_daily=False,
+            latency_log=None,
+            metrics_port=0,
+            metrics_socket=None,
+            partial_policy=PartialPolicy(),
+            audio_chunk_ms=250,
+            tts_max_concurrent=0,
+            tts_deadline_ms=0,
+            tts_warmup=[],
+            tts_preload=[],
+            startup=mock.ANY,
         )
         run.assert_called_once_with(inst.run())
 
@@ -169,14 +301,110 @@ def test_main_uses_config_file(tmp_path):
             transcript_log="transcript.log",
             agent=mock.ANY,
             tts=mock.ANY,
+            max_sessions=0,
+            stt_config=mock.ANY,
+            turn_policy="queue",
+            max_pending_turns=2,
+            barge_in=True,
+            transcript_log_max_mb=0,
+            transcript_log_daily=False,
+            latency_log=None,
+            metrics_port=0,
+            metrics_socket=None,
+            partial_policy=PartialPolicy(),
+            audio_chunk_ms=250,
+            tts_max_concurrent=0,
+            tts_deadline_ms=0,
+            tts_warmup=[],
+            tts_preload=[],
+            startup=mock.ANY,
         )
         run.assert_called_once_with(cls.return_value.run())
 
 
+def test_main_with_workers_runs_supervisor():
+    with mock.patch(
+        "src.backend.core.websocket_server.AudioWebSocketServer"
+    ) as cls, mock.patch(
+        "src.backend.core.websocket_server._run_workers"
+    ) as run_workers:
+        websocket_server.main(["model", "--workers", "4"])
+
+    cls.assert_not_called()
+    cfg = run_workers.call_args.args[0]
+    assert cfg.server.workers == 4
+    assert cfg.stt.model_path == "model"
+
+
+def test_preloaded_model_is_ready_at_once():
+    with mock.patch(
+        "src.backend.core.websocket_server.websockets", mock.Mock()
+    ), mock.patch("src.backend.core.sessions.load_model") as load:
+        model = object()
+        server = AudioWebSocketServer("model", transcript_log=None, model=model)
+
+    assert server.sessions.ready
+    assert server.sessions.model is model
+    load.assert_not_called()
+
+
+class FakeRecognizer:
+    def __init__(self, samplerate):
+        self.received = 0
+        recognizers.append(self)
+
+    def AcceptWaveform(self, data):
+        self.received += len(data)
+        return False
+
+    def PartialResult(self):
+        return '{"partial": ""}'
+
+    def FinalResult(self):
+        return '{"text": ""}'
+
+
+recognizers = []
+
+
+def test_server_warms_backends_before_reporting_ready():
+    from src.backend.config import STTConfig
+    from src.backend.tts.cache import CachedTTS
+
+    recognizers.clear()
+    engine = DummyTTS()
+    tts = CachedTTS(engine)
+    with mock.patch("src.backend.core.websocket_server.websockets", mock.Mock()):
+        server = AudioWebSocketServer(
+            "model",
+            transcript_log=None,
+            tts=tts,
+            stt_config=STTConfig(decode_workers=2, warmup_ms=300),
+            recognizer_factory=FakeRecognizer,
+            tts_warmup=["Warm up."],
+            tts_preload=["One moment."],
+        )
+    assert server.status()["state"] == "warming"
+
+    try:
+        assert asyncio.run(server._wait_for_model())
+    finally:
+        server.sessions.shutdown()
+
+    # One throwaway stream per decode worker, each fed the whole tone
+    assert [r.received for r in recognizers] == [9600, 9600]
+    assert engine.spoken == ["Warm up.", "One moment."]
+    assert tts.cached("One moment.")
+    status = server.status()
+    assert status["state"] == "ready"
+    assert {"stt_warmup", "tts_warmup", "tts_preload"} <= set(status["startup"]["phases_ms"])
+
+
 def test_log_bytes_only_when_changed():
+    p_model, p_stream = patch_stt()
     with mock.patch(
         "src.backend.core.websocket_server.websockets", mock.Mock()
-    ), mock.patch("src.backend.core.websocket_server.VoskStream"):
+    ), p_model, p_stream:
         server = AudioWebSocketServer("model", transcript_log=None)
 
         async def fake_sleep(_: float):
@@ -200,3 +428,149 @@ def test_log_bytes_only_when_changed():
             with pytest.raises(asyncio.CancelledError):
                 asyncio.run(server._log_bytes())
             m_print.assert_called_once()
+
+
+def test_metrics_expose_server_state():
+    p_model, p_stream = patch_stt()
+    with mock.patch(
+        "src.backend.core.websocket_server.websockets", mock.Mock()
+    ), p_model, p_stream as m_vosk:
+        m_vosk.return_value = make_stream()
+        m_vosk.return_value.stats.return_value = {
+            "decode_seconds": 1.0,
+            "decoded_audio_seconds": 4.0,
+            "vad_frames_skipped": 50,
+            "vad_cpu_saved_seconds": 0.5,
+        }
+        server = AudioWebSocketServer("model", transcript_log=None, tts=DummyTTS())
+        assert "server_ready 0\n" in server.metrics.render()
+        server.sessions.load()
+        server.sessions.open()
+        server.bytes_sent = 10
+
+        text = server.metrics.render()
+
+    assert "sessions_active 1\n" in text
+    assert "server_ready 1\n" in text
+    assert "audio_sent_bytes_total 10\n" in text
+    assert "stt_real_time_factor 0.25\n" in text
+    assert "stt_vad_frames_skipped_total 50\n" in text
+    assert "stt_vad_cpu_saved_seconds_total 0.5\n" in text
+    assert "# TYPE tts_synthesis_seconds histogram\n" in text
+
+
+def test_cache_counters_are_only_exported_for_a_cache():
+    class PoolTTS(DummyTTS):
+        def stats(self):
+            return {"requests": 3}
+
+    with mock.patch("src.backend.core.websocket_server.websockets", mock.Mock()):
+        plain = AudioWebSocketServer("model", transcript_log=None, tts=PoolTTS())
+        cached = AudioWebSocketServer(
+            "model", transcript_log=None, tts=CachedTTS(PoolTTS())
+        )
+        cached.tts.hits = 2
+
+    assert "tts_cache_" not in plain.metrics.render()
+    assert "tts_cache_hits_total 2\n" in cached.metrics.render()
+
+
+def test_client_can_change_partial_policy():
+    p_model, p_stream = patch_stt()
+    with mock.patch(
+        "src.backend.core.websocket_server.websockets", mock.Mock()
+    ), p_model, p_stream:
+        server = AudioWebSocketServer(
+            "model", transcript_log=None, tts=DummyTTS(),
+            partial_policy=PartialPolicy(max_rate=5),
+        )
+        ws = DummyWebSocket()
+        pipeline = server._make_pipeline(ws, make_stream())
+        conn = websocket_server.Connection(ws, pipeline, ClientProtocol())
+
+        async def run():
+            for message in (
+                '{"partials": {"delta": true}}',
+                '{"partials": {"max_rate": "fast"}}',
+                "not json",
+            ):
+                await server._handle_control(conn, 1, message)
+
+        asyncio.run(run())
+
+    assert pipeline.partials.policy == PartialPolicy(max_rate=5, delta=True)
+    assert server.partial_policy == PartialPolicy(max_rate=5)
+
+
+def test_handler_negotiates_framed_audio():
+    frames = [
+        pack_frame(KIND_AUDIO, 0, 0, 0, ulaw_encode(b"\x10\x00")),
+        pack_frame(KIND_AUDIO, 0, 2, 40_000, ulaw_encode(b"\x20\x00")),
+        b"short",
+    ]
+    dummy_ws = DummyWebSocket(
+        ['{"type": "hello", "version": 1, "encodings": ["ulaw"]}', *frames]
+    )
+
+    async def dummy_run(self):
+        return None
+
+    p_model, p_stream = patch_stt()
+    with mock.patch(
+        "src.backend.core.websocket_server.websockets", mock.Mock()
+    ), p_model, p_stream as m_vosk, mock.patch.object(
+        websocket_server.TurnPipeline, "run", dummy_run
+    ):
+        stt_instance = make_stream()
+        m_vosk.return_value = stt_instance
+
+        server = AudioWebSocketServer("model", transcript_log=None, tts=DummyTTS())
+        server.sessions.load()
+        asyncio.run(server._handler(dummy_ws))
+
+    welcome = json.loads(dummy_ws.sent[0])
+    assert welcome["type"] == "welcome"
+    assert welcome["encoding"] == "ulaw"
+    assert stt_instance.put_audio.await_args_list == [
+        mock.call(ulaw_decode(ulaw_encode(b"\x10\x00"))),
+        mock.call(ulaw_decode(ulaw_encode(b"\x20\x00"))),
+    ]
+    assert server._closed_frames_lost == 1
+
+
+def test_handler_closes_connection_when_model_fails_to_load():
+    ws = DummyWebSocket([b"a"])
+    ws.close = mock.AsyncMock()
+    with mock.patch(
+        "src.backend.core.websocket_server.websockets", mock.Mock()
+    ), mock.patch(
+        "src.backend.core.sessions.load_model", side_effect=RuntimeError("no model")
+    ):
+        server = AudioWebSocketServer("model", transcript_log=None, tts=DummyTTS())
+        asyncio.run(server._handler(ws))
+
+    assert ws.close.await_args.args[0] == 1011
+    assert server.status()["state"] == "failed"
+    assert server.status()["error"] == "no model"
+
+
+def test_status_reports_readiness_and_startup_timings():
+    p_model, p_stream = patch_stt()
+    with mock.patch(
+        "src.backend.core.websocket_server.websockets", mock.Mock()
+    ), p_model, p_stream:
+        server = AudioWebSocketServer("model", transcript_log=None, tts=DummyTTS())
+        server.startup.add("tts", 0.25)
+        ws = DummyWebSocket()
+        conn = websocket_server.Connection(
+            ws, server._make_pipeline(ws, make_stream()), ClientProtocol()
+        )
+
+        asyncio.run(server._handle_control(conn, 1, '{"type": "status"}'))
+        server.sessions.load()
+        asyncio.run(server._handle_control(conn, 1, '{"type": "status"}'))
+
+    loading, ready = (json.loads(m) for m in ws.sent)
+    assert loading["state"] == "loading"
+    assert ready["state"] == "ready"
+    assert ready["startup"]["phases_ms"] == {"tts": 250.0}